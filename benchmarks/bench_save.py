@@ -0,0 +1,46 @@
+#! /usr/bin/env python
+"""
+Compare the time to parse a GEDCOM file with the time to serialise it again.
+
+Usage: python benchmarks/bench_save.py [number of individuals]
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import gedcom  # noqa
+from gedcom import synth  # noqa
+
+
+def generate(individuals):
+    """Return the text of a made up GEDCOM file with this many individuals, see :py:mod:`gedcom.synth`."""
+    output = io.BytesIO()
+    synth.generate(output, seed=1, individuals=individuals)
+    return output.getvalue().decode("utf8")
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(individuals):
+    text = generate(individuals)
+    print("{0} individuals, {1:.1f} MB".format(individuals, len(text) / 1e6))
+
+    parse_time, gedcomfile = timed(lambda: gedcom.parse_string(text))
+    lines_time, _ = timed(lambda: sum(1 for _ in gedcomfile.gedcom_lines()))
+    string_time, _ = timed(gedcomfile.gedcom_lines_as_string)
+    save_time, _ = timed(lambda: gedcomfile.save(io.BytesIO()))
+
+    for name, seconds in (("parse_string", parse_time), ("gedcom_lines", lines_time),
+                          ("gedcom_lines_as_string", string_time), ("save", save_time)):
+        print("{0:>24}: {1:8.3f}s  {2:10.0f} individuals/s".format(name, seconds, individuals / seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,268 @@
+#! /usr/bin/env python
+"""
+Benchmark the hot paths of gedcompy on generated files of increasing size.
+
+For every benchmark and file size this reports the time (best of a few
+runs), the throughput, and the peak memory allocated during a run (from
+tracemalloc, in a separate run). Every benchmark does an amount of work
+that grows with the file (e.g. looks up the parents of every individual),
+so the scaling exponent, the slope of log(time) against log(size), is 1 for
+code that scales linearly and more for code that gets slower per item as
+files grow.
+
+Results can be saved as JSON, and compared against a saved baseline; the
+exit status is 1 if anything got slower than the tolerance allows.
+
+Usage: python benchmarks/bench_suite.py [--sizes 1000,4000,16000] [--only parents,name]
+                                        [--output results.json] [--baseline baseline.json]
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import gedcom  # noqa
+from gedcom import synth  # noqa
+from gedcom.individual import ancestor, connection  # noqa
+
+
+class Context(object):
+    """A generated file, parsed, and the samples the benchmarks work on."""
+
+    def __init__(self, size, directory, seed=0):
+        self.size = size
+        self.filename = os.path.join(directory, "synth{0}.ged".format(size))
+        synth.generate(self.filename, overwrite=True, seed=seed, individuals=size)
+        with open(self.filename, "rb") as fp:
+            self.text = fp.read().decode("utf8")
+        self.gedcomfile = gedcom.parse_string(self.text)
+        self.individuals = list(self.gedcomfile.individuals)
+        self.ids = [record.id for record in self.gedcomfile.root_elements if record.id]
+        self.notes = [note for individual in self.individuals for note in individual.get_list("NOTE")]
+        # people with a paternal grandfather, 1 for every 100 individuals
+        lines = []
+        for individual in self.individuals:
+            father = individual.father
+            grandfather = father.father if father is not None else None
+            if grandfather is not None:
+                lines.append([individual, father, grandfather])
+        self.lines = [lines[i % len(lines)] for i in range(max(1, size // 100))] if lines else []
+
+
+def _parse_filename(context):
+    gedcom.parse_filename(context.filename)
+    return context.size
+
+
+def _parse_string(context):
+    gedcom.parse_string(context.text)
+    return context.size
+
+
+def _gedcom_lines(context):
+    for _ in context.gedcomfile.gedcom_lines():
+        pass
+    return context.size
+
+
+def _save(context):
+    context.gedcomfile.save(io.BytesIO())
+    return context.size
+
+
+def _getitem(context):
+    gedcomfile = context.gedcomfile
+    for xref in context.ids:
+        gedcomfile[xref]
+    return len(context.ids)
+
+
+def _parents(context):
+    for individual in context.individuals:
+        individual.parents
+    return len(context.individuals)
+
+
+def _father_mother(context):
+    for individual in context.individuals:
+        individual.father
+        individual.mother
+    return len(context.individuals)
+
+
+def _name(context):
+    for individual in context.individuals:
+        individual.name
+    return len(context.individuals)
+
+
+def _connection(context):
+    for individual, _, grandfather in context.lines:
+        connection(individual, grandfather)
+    return len(context.lines)
+
+
+def _ancestor(context):
+    for line in context.lines:
+        ancestor(line)
+    return len(context.lines)
+
+
+def _full_text(context):
+    for note in context.notes:
+        note.full_text
+    return len(context.notes)
+
+
+# name -> function running the benchmark once on a Context, returning the number of items it did
+benchmarks = [
+    ('parse_filename', _parse_filename),
+    ('parse_string', _parse_string),
+    ('gedcom_lines', _gedcom_lines),
+    ('save', _save),
+    ('GedcomFile.__getitem__', _getitem),
+    ('Individual.parents', _parents),
+    ('Individual.father/mother', _father_mother),
+    ('Individual.name', _name),
+    ('connection', _connection),
+    ('ancestor', _ancestor),
+    ('Note.full_text', _full_text),
+]
+
+
+def measure(function, context, repeat):
+    """Return (seconds, items, peak bytes) of running `function` on `context`: the best time of `repeat` runs, and the peak of another run."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = function(context)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    tracemalloc.start()
+    try:
+        function(context)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, items, peak
+
+
+def exponent(sizes, seconds):
+    """Least squares slope of log(seconds) against log(size), None with fewer than 2 sizes."""
+    points = [(math.log(size), math.log(max(time, 1e-9))) for size, time in zip(sizes, seconds)]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+def run(sizes, names=None, repeat=3, seed=0, report=print):
+    """
+    Run the benchmarks on generated files of these sizes.
+
+    :returns: dict, as saved to JSON
+    """
+    chosen = [(name, function) for name, function in benchmarks if names is None or name in names]
+    results = dict((name, {'sizes': {}}) for name, _ in chosen)
+    directory = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            context = Context(size, directory, seed=seed)
+            report("{0} individuals, {1:.1f} MB".format(size, len(context.text) / 1e6))
+            for name, function in chosen:
+                seconds, items, peak = measure(function, context, repeat)
+                results[name]['sizes'][str(size)] = {'seconds': seconds, 'items': items,
+                                                     'items_per_second': items / seconds if seconds else None,
+                                                     'peak_bytes': peak}
+                report("{0:>26}: {1:9.4f}s {2:12.0f} items/s {3:9.1f} MB peak".format(
+                    name, seconds, items / seconds if seconds else float('inf'), peak / 1e6))
+            del context
+    finally:
+        shutil.rmtree(directory)
+
+    for name, _ in chosen:
+        timings = results[name]['sizes']
+        results[name]['exponent'] = exponent(sizes, [timings[str(size)]['seconds'] for size in sizes])
+    return {'python': platform.python_version(), 'gedcompy': gedcom.__version__, 'sizes': sizes,
+            'repeat': repeat, 'seed': seed, 'results': results}
+
+
+def compare(results, baseline, tolerance=0.25, report=print):
+    """
+    Compare results with a baseline, for the benchmarks and sizes in both.
+
+    A benchmark has regressed if it takes more than (1 + `tolerance`) times
+    as long, or (if the baseline was run with the same sizes) its scaling
+    exponent went up by more than `tolerance`.
+
+    :returns: list of regressions, as strings
+    """
+    regressions = []
+    for name, result in sorted(results['results'].items()):
+        old = baseline.get('results', {}).get(name)
+        if old is None:
+            continue
+        for size, timing in sorted(result['sizes'].items(), key=lambda item: int(item[0])):
+            old_timing = old['sizes'].get(size)
+            if old_timing is None:
+                continue
+            ratio = timing['seconds'] / old_timing['seconds'] if old_timing['seconds'] else float('inf')
+            line = "{0:>26} {1:>8}: {2:6.2f}x time, {3:6.2f}x peak memory".format(
+                name, size, ratio, timing['peak_bytes'] / old_timing['peak_bytes'] if old_timing['peak_bytes'] else float('inf'))
+            if ratio > 1 + tolerance:
+                regressions.append(line)
+                line += "  REGRESSION"
+            report(line)
+        if results['sizes'] == baseline.get('sizes') and result.get('exponent') is not None and old.get('exponent') is not None:
+            if result['exponent'] > old['exponent'] + tolerance:
+                regressions.append("{0:>26}: scaling exponent {1:.2f} -> {2:.2f}".format(name, old['exponent'], result['exponent']))
+                report(regressions[-1] + "  REGRESSION")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark gedcompy on generated files of increasing size.")
+    parser.add_argument("--sizes", default="1000,4000,16000", help="comma separated numbers of individuals")
+    parser.add_argument("--only", help="comma separated names of the benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the best time is kept")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated files")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 is 25%%")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    names = set(name.strip() for name in args.only.split(",")) if args.only else None
+    results = run(sizes, names=names, repeat=args.repeat, seed=args.seed)
+    print("scaling exponents (1 is linear):")
+    for name, result in results['results'].items():
+        if result['exponent'] is not None:
+            print("{0:>26}: {1:.2f}".format(name, result['exponent']))
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        print("compared with {0}:".format(args.baseline))
+        if compare(results, baseline, tolerance=args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,3 +22,4 @@ from .individual import *
 from .event import *
 from .gedcomfile import *
 from .family import *
+from .writer import *
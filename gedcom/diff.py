@@ -0,0 +1,188 @@
+import six
+
+from .records import iter_records
+
+
+def record_hash(record):
+    """
+    Return a hash of the content of this record and everything below it.
+
+    Two records have the same hash if they'd be written out as the same lines.
+    This is the (cached) :py:attr:`Element.content_hash`.
+
+    :param Element record: level 0 record
+    :rtype: str
+    """
+    return record.content_hash
+
+
+def _keyed(records):
+    """Yield (key, record): the id of the record, or its tag (and how many of that tag came before) if it has no id."""
+    counts = {}
+    for record in records:
+        if record.id:
+            yield record.id, record
+        else:
+            number = counts.get(record.tag, 0)
+            counts[record.tag] = number + 1
+            yield (record.tag if number == 0 else "{0}#{1}".format(record.tag, number)), record
+
+
+def _indexed(elements):
+    """Yield ((tag, n), element), n being the number of elements of the same tag before it."""
+    counts = {}
+    for element in elements:
+        number = counts.get(element.tag, 0)
+        counts[element.tag] = number + 1
+        yield (element.tag, number), element
+
+
+class ElementChange(object):
+    """A change to one element inside a record."""
+
+    def __init__(self, kind, path, old, new):
+        """
+        Create a change to an element.
+
+        :param str kind: 'added', 'removed' or 'changed' (a different value or id)
+        :param tuple path: (tag, n) for each element from the record down to this one, n counting elements of that tag under the same parent
+        :param Element old: element in the old record, None if added
+        :param Element new: element in the new record, None if removed
+        """
+        self.kind = kind
+        self.path = path
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        """Short summary, for debugging purposes."""
+        return "ElementChange({0!r}, {1!r}, {2!r}, {3!r})".format(
+            self.kind, "/".join("{0}[{1}]".format(tag, n) for tag, n in self.path),
+            self.old.value if self.old is not None else None, self.new.value if self.new is not None else None)
+
+
+def element_changes(old, new):
+    """
+    Return the changes between two versions of a record, element by element.
+
+    Children are matched by tag and position among the children with the
+    same tag, so e.g. the second NAME is compared with the second NAME.
+
+    :param Element old: old version
+    :param Element new: new version
+    :rtype: list of :py:class:`ElementChange`
+    """
+    changes = []
+    stack = [((), old, new)]
+    while stack:
+        path, old, new = stack.pop()
+        if old._value != new._value or old._id != new._id:
+            changes.append(ElementChange('changed', path, old, new))
+        new_children = dict(_indexed(new.child_elements))
+        below = []
+        for key, child in _indexed(old.child_elements):
+            other = new_children.pop(key, None)
+            if other is None:
+                changes.append(ElementChange('removed', path + (key,), child, None))
+            elif child.content_hash != other.content_hash:
+                below.append((path + (key,), child, other))
+        for key, child in _indexed(new.child_elements):
+            if key in new_children:
+                changes.append(ElementChange('added', path + (key,), None, child))
+        stack.extend(reversed(below))
+    return changes
+
+
+class RecordChange(object):
+    """A record that is in both files, with different content."""
+
+    def __init__(self, key, old, new):
+        """
+        Create a change to a record.
+
+        :param str key: id of the record (or its tag, for records without an id)
+        :param Element old: old version
+        :param Element new: new version
+        """
+        self.key = key
+        self.old = old
+        self.new = new
+
+    @property
+    def changes(self):
+        """The changes inside the record, see :py:func:`element_changes`."""
+        return element_changes(self.old, self.new)
+
+    def __repr__(self):
+        """Short summary, for debugging purposes."""
+        return "RecordChange({0!r})".format(self.key)
+
+
+class Diff(object):
+    """Records that were added, removed and changed between two versions of a file."""
+
+    def __init__(self, added, removed, changed):
+        """
+        Create a diff.
+
+        :param list added: records only in the new file, in its order
+        :param list removed: records only in the old file, in its order
+        :param list changed: :py:class:`RecordChange` for records in both files that are different, in the order of the new file
+        """
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self):
+        """Return True if the files are different."""
+        return bool(self.added or self.removed or self.changed)
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        """Short summary, for debugging purposes."""
+        return "Diff(added={0}, removed={1}, changed={2})".format(
+            [key for key, _ in _keyed(self.added)], [key for key, _ in _keyed(self.removed)], [c.key for c in self.changed])
+
+
+def diff(old, new):
+    """
+    Compare two versions of a GEDCOM file, record by record.
+
+    Records are matched by id (or tag, for records like HEAD without one)
+    and compared by :py:func:`record_hash`, so records that moved are not
+    changes. This takes linear time. If `old` is a filename or string, it's
+    parsed twice with :py:func:`iterparse` rather than kept in memory: once
+    to hash the records, and once to get the removed and changed ones.
+
+    :param old: old version: :py:class:`GedcomFile`, iterable of records, or filename/file-like object/string of a GEDCOM file
+    :param new: new version, the same kinds as `old`
+    :rtype: :py:class:`Diff`
+    """
+    reread = isinstance(old, six.string_types)
+    old_hashes = {}
+    old_records = {}
+    for key, record in _keyed(iter_records(old)):
+        old_hashes[key] = record_hash(record)
+        if not reread:
+            old_records[key] = record
+
+    added = []
+    changed = []
+    for key, record in _keyed(iter_records(new)):
+        old_hash = old_hashes.pop(key, None)
+        if old_hash is None:
+            added.append(record)
+        elif old_hash != record_hash(record):
+            changed.append(RecordChange(key, None, record))
+    # whatever wasn't matched is gone
+    removed_keys = old_hashes
+
+    if reread:
+        wanted = set(change.key for change in changed)
+        wanted.update(removed_keys)
+        old_records = dict((key, record) for key, record in _keyed(iter_records(old)) if key in wanted)
+    for change in changed:
+        change.old = old_records[change.key]
+    removed = [old_records[key] for key in removed_keys]
+    return Diff(added, removed, changed)
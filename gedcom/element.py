@@ -1,16 +1,50 @@
-import re
+import hashlib
 import numbers
 
+from .ids import pointer_format
+
 tags_to_classes = {}
 
 
+class Pointer(str):
+    """
+    A pointer value (e.g. '@F1@') that also holds the record it points to.
+
+    It's a string, so it is written out, compared and looked up like any
+    other value. See :py:meth:`GedcomFile.link`.
+    """
+
+    def __new__(cls, value, target=None):
+        """Create a pointer with this text, pointing to `target`."""
+        pointer = str.__new__(cls, value)
+        pointer.target = target
+        return pointer
+
+
 class Element(object):
     """
     Generic represetation for a GEDCOM element.
 
     Can be used as is, or subclassed for specific functionality.
+
+    Changes made through :py:attr:`value`, :py:attr:`id` and
+    :py:meth:`add_child_element` mark the element and all its ancestors as
+    :py:attr:`dirty`. Code that changes :py:attr:`child_elements` directly
+    should call :py:meth:`mark_dirty` itself.
     """
 
+    #: True if this element, or anything below it, was changed since it was parsed/saved.
+    dirty = False
+
+    #: cached :py:attr:`content_hash`, reset by :py:meth:`mark_dirty`
+    _hash = None
+
+    #: token of the :py:meth:`GedcomFile.clone` this element belongs to, see :py:meth:`GedcomFile.mutable`
+    _owner = None
+
+    #: tag -> tuple of child elements, made by :py:meth:`GedcomFile.freeze`
+    _tags = None
+
     def __init__(self, level=None,
                  tag=None, value=None,
                  id=None, parent_id=None,
@@ -33,16 +67,160 @@ class Element(object):
             self.tag = tag
         else:
             self.tag = self.default_tag
-        self.value = value
+        self._value = value
         self.child_elements = []
         self.parent_element = parent
-        self.id = id
+        self._id = id
         self.parent_id = parent_id
         self.gedcom_file = gedcom_file
+        token = getattr(gedcom_file, '_token', None)
+        if token is not None:
+            self._owner = token
 
         if parent is not None:
             self.parent_element.add_child_element(self)
 
+    @property
+    def value(self):
+        """Value of this element (the text after the tag), or None."""
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._before_change('_value')
+        self._value = value
+        self.mark_dirty()
+
+    @property
+    def id(self):
+        """ID/Pointer of this element (e.g. '@I1@'), or None."""
+        return self._id
+
+    @id.setter
+    def id(self, id):
+        self._before_change('_id')
+        self._id = id
+        self.mark_dirty()
+
+    @property
+    def parent(self):
+        """Parent element of this element, same as :py:attr:`parent_element`."""
+        return self.parent_element
+
+    @parent.setter
+    def parent(self, parent):
+        self.parent_element = parent
+
+    def _before_change(self, attribute):
+        """Prepare for `attribute` of this element to be changed through the API (e.g. the :py:attr:`value` setter)."""
+        gedcom_file = self.gedcom_file
+        if getattr(gedcom_file, '_frozen', False):
+            raise TypeError("This element is in a frozen file, change a clone() of the file instead")
+        if getattr(gedcom_file, '_cow', False) and self._owner is not gedcom_file._token:
+            # shared with a clone of the file, which keeps a copy of it as it was
+            gedcom_file._take(self)
+        batch = getattr(gedcom_file, '_batch', None)
+        if batch is not None:
+            batch.changed(self, attribute)
+
+    def _claim(self, owner):
+        """Make this element, and the elements below it that don't have an owner, belong to `owner` (see :py:meth:`GedcomFile.clone`)."""
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            if element._owner is None:
+                element._owner = owner
+                stack.extend(element.child_elements)
+
+    def mark_dirty(self):
+        """
+        Mark this element, and all the elements above it, as changed, and forget their :py:attr:`content_hash`.
+
+        Inside a :py:meth:`GedcomFile.batch` this is done when the batch ends.
+        """
+        batch = getattr(self.gedcom_file, '_batch', None)
+        if batch is not None:
+            batch.touched.append(self)
+            return
+        element = self
+        while element is not None and (not element.dirty or element._hash is not None):
+            element.dirty = True
+            element._hash = None
+            element = element.parent_element
+
+    def mark_clean(self):
+        """Mark this element and everything below it as unchanged (e.g. after it has been saved)."""
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            if element.dirty:
+                element.dirty = False
+                stack.extend(element.child_elements)
+
+    @property
+    def content_hash(self):
+        """
+        Hash (hex SHA-1) of the tag, id and value of this element and the content hashes of its children, in order.
+
+        Elements that would be written out as the same lines have the same
+        hash, across runs. Hashes are cached on every element and worked out
+        bottom up, so after a change only the changed element and the ones
+        above it are hashed again. Changes made directly to
+        :py:attr:`child_elements` need a :py:meth:`mark_dirty` call, like
+        for :py:attr:`dirty`.
+
+        :rtype: str
+        """
+        if self._hash is not None:
+            return self._hash
+        stack = [(self, False)]
+        while stack:
+            element, children_done = stack.pop()
+            if element._hash is not None:
+                continue
+            if children_done:
+                content = hashlib.sha1("{0}\0{1}\0{2}".format(element.tag, element._id or '', element._value or '').encode("utf8"))
+                for child in element.child_elements:
+                    content.update(b"\0" + child._hash.encode("ascii"))
+                element._hash = content.hexdigest()
+            else:
+                stack.append((element, True))
+                stack.extend((child, False) for child in element.child_elements if child._hash is None)
+        return self._hash
+
+    def linked_hash(self, depth=1):
+        """
+        Return a hash of the content of this element and of the records it points to.
+
+        With `depth` 1 for an individual, that's its families (FAMS/FAMC); with
+        2, also the spouses, parents and children in those families, etc.
+
+        :param int depth: how many pointers to follow from this element
+        :returns: hex SHA-1
+        :rtype: str
+        """
+        content = hashlib.sha1(self.content_hash.encode("ascii"))
+        seen = set([self._id]) if self._id else set()
+        current = [self]
+        for _ in range(depth):
+            found = []
+            for element in current:
+                stack = [element]
+                while stack:
+                    element = stack.pop()
+                    value = element._value
+                    if value and value[0] == '@' and value not in seen and pointer_format.match(value):
+                        seen.add(value)
+                        target = getattr(value, 'target', None)
+                        if target is None and element.gedcom_file is not None:
+                            target = element.gedcom_file[value]
+                        if target is not None:
+                            found.append(target)
+                            content.update("\0{0}\0{1}".format(value, target.content_hash).encode("utf8"))
+                    stack.extend(reversed(element.child_elements))
+            current = found
+        return content.hexdigest()
+
     def __repr__(self):
         """Interal string represation of this object, for debugging purposes."""
         return "{classname}({level}, {tag!r}{id}{value}{children})".format(
@@ -71,7 +249,10 @@ class Element(object):
         :returns: Element
         :rtype: Element (or subclass)
         """
-        children = [c for c in self.child_elements if c.tag == key]
+        if self._tags is not None:
+            children = list(self._tags.get(key, ()))
+        else:
+            children = [c for c in self.child_elements if c.tag == key]
         if len(children) == 0:
             pass
         elif len(children) == 1:
@@ -85,6 +266,8 @@ class Element(object):
 
         :param str key: Tag to look for.
         """
+        if self._tags is not None:
+            return key in self._tags
         return any(c.tag == key for c in self.child_elements)
 
     def add_child_element(self, child_element):
@@ -92,15 +275,28 @@ class Element(object):
         Add `child_element` as a child of this.
 
         It sets the :py:attr:`parent` and :py:attr:`parent_id` of `child_element` to this
-        element, but does not set the :py:meth:`level`. See
-        :py:meth:`set_levels_downward` to correct that.
+        element. If this element has a :py:attr:`level`, the levels (and file)
+        of `child_element` and everything below it are set to match.
+
+        Inside a :py:meth:`GedcomFile.batch`, the levels are set when the batch ends.
 
         :param Element child_element: The Element you want to add as a child.
         """
-        child_element.parent = self
+        self._before_change('child_elements')
+        batch = getattr(self.gedcom_file, '_batch', None)
+        if batch is not None:
+            batch.appended(self, child_element)
+        child_element.parent_element = self
         child_element.parent_id = self.id
         child_element.gedcom_file = self.gedcom_file
+        if self._owner is not None and child_element._owner is None:
+            child_element._claim(self._owner)
         self.child_elements.append(child_element)
+        if batch is None and isinstance(self.level, numbers.Integral):
+            child_element.level = self.level + 1
+            if child_element.child_elements:
+                child_element.set_levels_downward()
+        self.mark_dirty()
 
     def get_by_id(self, other_id):
         """
@@ -111,6 +307,9 @@ class Element(object):
         :rtype: Element
         :raises KeyError: If this id/pointer doesn't exist in the file
         """
+        target = getattr(other_id, 'target', None)
+        if target is not None:
+            return target
         return self.gedcom_file[other_id]
 
     def get_list(self, tag):
@@ -121,29 +320,70 @@ class Element(object):
         :returns: list of any child nodes that have this tag
         :rtype: list
         """
+        if self._tags is not None:
+            return list(self._tags.get(tag, ()))
         return [c for c in self.child_elements if c.tag == tag]
 
     def set_levels_downward(self):
         """Set all :py:attr:`level` attributes for all child elements recursively, based on the :py:attr:`level` for this object."""
         if not isinstance(self.level, numbers.Integral):
             raise TypeError(self.level)
-        for c in self.child_elements:
-            c.level = self.level + 1
-            c.gedcom_file = self.gedcom_file
-            c.set_levels_downward()
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            level = element.level + 1
+            for c in element.child_elements:
+                c.level = level
+                c.gedcom_file = element.gedcom_file
+                if c.child_elements:
+                    stack.append(c)
+
+    def wrong_levels(self, level=None):
+        """
+        Return this element and all elements below it whose stored :py:attr:`level` doesn't match their depth in the tree.
 
-    def gedcom_lines(self):
+        :param int level: level this element should have, defaults to :py:attr:`level` (or 0 if that's unset)
+        :rtype: list of Element, in file order
+        """
+        if level is None:
+            level = self.level if isinstance(self.level, numbers.Integral) else 0
+        wrong = []
+        stack = [(self, level)]
+        while stack:
+            element, level = stack.pop()
+            if element.level != level:
+                wrong.append(element)
+            stack.extend((c, level + 1) for c in reversed(element.child_elements))
+        return wrong
+
+    def gedcom_lines(self, level=None):
         """
         Iterator over the encoded lines for this element.
 
+        Levels are worked out from the depth in the tree, starting at `level`,
+        so the stored :py:attr:`level` of the child elements doesn't need to
+        be correct. Walks the tree iteratively (depth first), so deep trees
+        don't nest generators.
+
+        :param int level: level of this element, defaults to :py:attr:`level` (or 0 if that's unset)
         :rtype: iterator over string
         """
-        line_format = re.compile("^(?P<level>[0-9]+) ((?P<id>@[a-zA-Z0-9]+@) )?(?P<tag>[A-Z]+)( (?P<value>.*))?$")
-        line = u"{level}{id} {tag}{value}".format(level=self.level, id=(" " + self.id if self.id else ""), tag=self.tag, value=(" " + self.value if self.value else ""))
-        yield line
-        for child in self.child_elements:
-            for line in child.gedcom_lines():
-                yield line
+        if level is None:
+            level = self.level if isinstance(self.level, numbers.Integral) else 0
+        stack = [(self, level)]
+        pop = stack.pop
+        append = stack.append
+        while stack:
+            element, level = pop()
+            # the value (and id) may have been set to a number, not a string
+            value = element._value
+            yield "{0}{1} {2}{3}".format(level, " {0}".format(element._id) if element._id else "", element.tag,
+                                         " {0}".format(value) if value is not None and value != "" else "")
+            children = element.child_elements
+            if children:
+                level += 1
+                for child in reversed(children):
+                    append((child, level))
 
     @property
     def note(self):
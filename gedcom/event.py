@@ -1,6 +1,33 @@
+import re
+
 from . import register_tag
 from .element import Element
 
+# Tags of the elements that are events (rather than parts of one, like DATE and PLAC)
+event_tags = frozenset(['EVEN', 'RESI', 'BIRT', 'DEAT', 'BURI', 'MARR', 'DIV', 'BAPL', 'BAPM', 'BARM', 'BASM', 'BLES', 'CHR',
+                        'CHRA', 'CONF', 'CONL', 'CREM', 'EMIG', 'ENDL', 'ENGA', 'GRAD', 'IMMI', 'NATU', 'WILL'])
+
+year_format = re.compile(r"(?<![0-9])([0-9]{3,4})(?![0-9])")
+
+
+def date_year(value):
+    """
+    Return the (first) year mentioned in a GEDCOM date value.
+
+    Handles plain dates ('01 JAN 1850'), approximations ('ABT 1850') and
+    ranges ('BET 1850 AND 1860'), in the last case the first year is used.
+
+    :param str value: GEDCOM date value
+    :returns: the year, or None if no year can be found
+    :rtype: int
+    """
+    if not value:
+        return None
+    match = year_format.search(value)
+    if match is None:
+        return None
+    return int(match.group(1))
+
 
 @register_tag("EVEN")
 class Event(Element):
@@ -18,6 +45,16 @@ class Event(Element):
         if self['DATE']:
             return self['DATE'].value
 
+    @property
+    def year(self):
+        """
+        Get the year of this event, from the 'DATE' tagged child element.
+
+        :returns: year, or None if there is no (parsable) date
+        :rtype: int
+        """
+        return date_year(self.date)
+
     @property
     def place(self):
         """
@@ -0,0 +1,154 @@
+from .element import class_for_tag
+from .gedcomfile import GedcomFile
+from .ids import pointer_format
+
+# Which family pointers of an individual lead to the next generation, and
+# which pointers of those families lead to the individuals in it
+_directions = {
+    'ancestors': ('FAMC', ('HUSB', 'WIFE')),
+    'descendants': ('FAMS', ('CHIL',)),
+}
+
+
+def _pointers(record):
+    """Yield (element, value) for every element below `record` whose value is a pointer."""
+    stack = list(record.child_elements)
+    while stack:
+        element = stack.pop()
+        value = element._value
+        if value and value[0] == '@' and pointer_format.match(value):
+            yield element, value
+        if element.child_elements:
+            stack.extend(element.child_elements)
+
+
+def _relatives(gedcom_file, start, direction, depth, individuals, families):
+    """Add the individuals (and the families joining them) up to `depth` generations from `start`, in one direction."""
+    family_tag, member_tags = _directions[direction]
+    generation = list(start)
+    # the individuals whose families in this direction have been followed, or will be
+    visited = set(individual.id for individual in generation)
+    level = 0
+    while generation and (depth is None or level < depth):
+        level += 1
+        found = []
+        for individual in generation:
+            for pointer in individual.get_list(family_tag):
+                family = gedcom_file[pointer.value]
+                if family is None:
+                    continue
+                families.setdefault(family.id, family)
+                for member_tag in member_tags + (('HUSB', 'WIFE') if direction == 'descendants' else ()):
+                    for member in family.get_list(member_tag):
+                        relative = gedcom_file[member.value]
+                        if relative is None:
+                            continue
+                        individuals.setdefault(relative.id, relative)
+                        # a spouse can also be a descendant (pedigree collapse), so is followed when reached as one
+                        if member_tag in member_tags and relative.id not in visited:
+                            visited.add(relative.id)
+                            found.append(relative)
+        generation = found
+
+
+def _copy(record, gedcom_file, keep):
+    """Return a copy of `record` in `gedcom_file`, leaving out the elements (and everything below them) that `keep` rejects."""
+    copy = class_for_tag(record.tag)(level=0, tag=record.tag, value=record._value, id=record._id, gedcom_file=gedcom_file)
+    stack = [(record, copy)]
+    while stack:
+        element, parent = stack.pop()
+        for child in element.child_elements:
+            if not keep(child):
+                continue
+            new = class_for_tag(child.tag)(level=parent.level + 1, tag=child.tag, value=child._value, id=child._id,
+                                           gedcom_file=gedcom_file)
+            new.parent_element = parent
+            new.parent_id = parent._id
+            parent.child_elements.append(new)
+            if child.child_elements:
+                stack.append((child, new))
+    return copy
+
+
+def extract(gedcom_file, individuals, include='ancestors', depth=None):
+    """
+    Return a new file with these individuals and their ancestors and/or descendants.
+
+    Ancestors are the parents (from FAMC families), their parents and so
+    on; descendants are the children (from FAMS families), their children
+    and so on, along with the spouses in those families. The families joining
+    them are included, along with every source, note, repository, media
+    object and submitter that any of the included records points to.
+
+    Pointers to records that aren't included (e.g. the siblings of an
+    ancestor) are left out. Only the records that lose pointers like that
+    are copied; all the others (and the HEAD) are shared with
+    `gedcom_file` and copied on write, like for a
+    :py:meth:`GedcomFile.clone`, so the new file is cheap to make.
+
+    :param GedcomFile gedcom_file: file to extract from
+    :param individuals: :py:class:`Individual`'s (or their ids) to start from
+    :param str include: 'ancestors', 'descendants' or 'both'
+    :param int depth: *optional* number of generations to go up/down, no limit if None
+    :rtype: GedcomFile
+    :raises ValueError: for an unknown `include`
+    :raises KeyError: if an individual isn't in `gedcom_file`
+    """
+    if include == 'both':
+        directions = ('ancestors', 'descendants')
+    elif include in _directions:
+        directions = (include,)
+    else:
+        raise ValueError("include must be 'ancestors', 'descendants' or 'both', not {0!r}".format(include))
+
+    start = []
+    for individual in individuals:
+        if not hasattr(individual, 'tag'):
+            found = gedcom_file[individual]
+            if found is None:
+                raise KeyError(individual)
+            individual = found
+        start.append(individual)
+
+    people = dict((individual.id, individual) for individual in start)
+    families = {}
+    for direction in directions:
+        _relatives(gedcom_file, start, direction, depth, people, families)
+
+    records = dict(people)
+    records.update(families)
+    # sources, notes etc. pointed to from anything included, and from those in turn
+    others = []
+    stack = list(records.values())
+    head = next((record for record in gedcom_file.root_elements[:1] if record.tag == 'HEAD'), None)
+    if head is not None:
+        stack.append(head)
+    while stack:
+        for element, value in _pointers(stack.pop()):
+            if value in records:
+                continue
+            target = gedcom_file[value]
+            if target is not None and target.tag not in ('INDI', 'FAM'):
+                records[value] = target
+                others.append(target)
+                stack.append(target)
+
+    excerpt = GedcomFile()
+    # before the copies are made, so that they belong to the excerpt alone
+    gedcom_file._share(excerpt)
+
+    def keep(element):
+        value = element._value
+        return not (value and value[0] == '@' and value not in records and pointer_format.match(value))
+
+    output = [head] if head is not None else []
+    for record in list(people.values()) + list(families.values()) + others:
+        if not all(keep(element) for element, value in _pointers(record)):
+            record = _copy(record, excerpt, keep)
+        output.append(record)
+        if record.id:
+            excerpt.pointers[record.id] = record
+            excerpt.ids.seen(record.id)
+    excerpt.root_elements = output
+    excerpt.ensure_header_trailer()
+    return excerpt
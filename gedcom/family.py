@@ -91,7 +91,7 @@ class Spouse(Element):
         :rtype: :py:class:`Individual`
         :raises KeyError: if id/pointer not found in the file.
         """
-        return self.gedcom_file[self.value]
+        return self.get_by_id(self.value)
 
 
 @register_tag("FAMC")
@@ -107,7 +107,7 @@ class Children(Element):
         :raises KeyError: if id/pointer not found in the file.
         """
 
-        return self.gedcom_file[self.value]
+        return self.get_by_id(self.value)
 
     @property
     def father_relation(self):
@@ -1,25 +1,169 @@
+import contextlib
+import errno
+import numbers
 import os
 import re
 import six
+import sys
+import tempfile
+import types
+import weakref
 
 
 from ._version import __version__
-from .individual import Individual
+from .individual import Individual, _kinship
 from .family import Family
-from .element import tags_to_classes, class_for_tag, line_to_element
+from .element import tags_to_classes, class_for_tag, Pointer
+from .ids import IdAllocator, record_prefixes, pointer_format
+
+# Number of lines that are joined, encoded and written out in one go
+write_chunk_size = 10000
+
+# Number of bytes that are buffered/copied at a time when saving
+copy_buffer_size = 1 << 20
+
+# Elements with more children than this get an index of them by tag when frozen (looking through fewer is as quick)
+frozen_index_children = 8
 
 line_format = re.compile("^(?P<level>[0-9]+) ((?P<id>@[-a-zA-Z0-9]+@) )" +
                          "?(?P<tag>[_A-Z0-9]+)( (?P<value>.*))?$")
 
 
+class LinkReport(object):
+    """
+    Result of :py:meth:`GedcomFile.link`.
+
+    :ivar list dangling: elements whose pointer value isn't the id of anything in the file
+    :ivar list unused: records with an id that nothing points to
+    :ivar int linked: number of pointer values that were linked
+    """
+
+    def __init__(self, dangling, unused, linked):
+        """Create a report."""
+        self.dangling = dangling
+        self.unused = unused
+        self.linked = linked
+
+    def __repr__(self):
+        """Short summary, for debugging purposes."""
+        return "LinkReport(linked={0}, dangling={1!r}, unused={2!r})".format(
+            self.linked, [(el.tag, el.value) for el in self.dangling], [el.id for el in self.unused])
+
+
+def _undo_append(parent, child, parent_element, parent_id, gedcom_file, level):
+    parent.child_elements.pop()
+    child.parent_element = parent_element
+    child.parent_id = parent_id
+    child.gedcom_file = gedcom_file
+    child.level = level
+
+
+class Batch(object):
+    """
+    Changes made to a file inside :py:meth:`GedcomFile.batch`.
+
+    Records added with :py:meth:`GedcomFile.add_element`, and the levels,
+    :py:attr:`Element.dirty` flags and :py:attr:`Element.content_hash`'es of
+    changed elements, are brought up to date once, when the batch ends. An
+    undo log of every change made through the API is kept, so the batch can
+    be rolled back.
+    """
+
+    def __init__(self, gedcom_file):
+        """Start a batch on `gedcom_file`, see :py:meth:`GedcomFile.batch`."""
+        self.gedcom_file = gedcom_file
+        #: records to add to the file
+        self.pending = []
+        self.pending_ids = {}
+        #: elements to mark dirty
+        self.touched = []
+        #: (parent, child) for every add_child_element call
+        self.added = []
+        self.undo = []
+        self.counters = dict(gedcom_file.ids.counters)
+
+    def changed(self, element, attribute):
+        """Remember the value of `attribute`, before it is changed."""
+        if attribute != 'child_elements':
+            # new children are logged by appended
+            self.undo.append((setattr, (element, attribute, getattr(element, attribute))))
+
+    def appended(self, parent, child):
+        """Remember that `child` is about to be added to `parent`."""
+        self.added.append((parent, child))
+        self.undo.append((_undo_append, (parent, child, child.parent_element, child.parent_id, child.gedcom_file, child.level)))
+
+    def add(self, elements):
+        """Queue these (prepared) elements to be added to the file's indexes."""
+        self.pending.extend(elements)
+        for element in elements:
+            if element.id:
+                self.pending_ids[element.id] = element
+
+    def commit(self):
+        """Bring the file and the changed elements up to date."""
+        self.gedcom_file._batch = None
+        if self.pending:
+            self.gedcom_file._index_elements(self.pending)
+        for parent, child in self.added:
+            if child.parent_element is parent and isinstance(parent.level, numbers.Integral):
+                child.level = parent.level + 1
+                if child.child_elements:
+                    child.set_levels_downward()
+        for element in self.touched:
+            element.mark_dirty()
+
+    def rollback(self):
+        """Undo every change made in the batch."""
+        self.gedcom_file._batch = None
+        for function, args in reversed(self.undo):
+            function(*args)
+        self.gedcom_file.ids.counters = self.counters
+        for element in self.touched:
+            # hashes might have been worked out from the undone changes
+            while element is not None and element._hash is not None:
+                element._hash = None
+                element = element.parent_element
+
+
 class GedcomFile(object):
     """Represents a GEDCOM file."""
 
+    #: the :py:class:`Batch` that is in progress, if any
+    _batch = None
+
+    #: set once this file has been cloned (or is a clone), see :py:meth:`clone`
+    _cow = False
+    #: owner token of the elements that belong to this file alone
+    _token = None
+    #: root_elements and pointers are shared with a clone
+    _shared = False
+    #: the files that (may) share elements with this one, this one included
+    _family = None
+    #: record of another file -> the copy of it that replaced it in this file
+    _copies = None
+    #: id(record) -> index in root_elements, and the number of records when it was made
+    _positions = None
+    _positions_length = 0
+
+    #: record -> (start, end) byte offsets of the record in :py:attr:`source_filename`, see :py:meth:`source_span`
+    _spans = None
+
+    #: set by :py:meth:`freeze`
+    _frozen = False
+    #: tag -> tuple of records, and id -> :py:class:`Kinship` of every individual, made by :py:meth:`freeze`
+    _tag_index = None
+    _kinship = None
+
     def __init__(self):
         """Instanciate a GEDCOM object."""
         self.root_elements = []
         self.pointers = {}
-        self.next_free_id = 1
+        self.ids = IdAllocator()
+        self.source_filename = None
+        self.source_newline = "\n"
+        self._source_stat = None
+        self._spans = {}
 
     def __repr__(self):
         """String represenation of GEDCOM.
@@ -37,8 +181,12 @@ class GedcomFile(object):
         :raises KeyError: If key is not in this file
         """
         if key in self.pointers:
-            return self.pointers[key]
-        
+            element = self.pointers[key]
+            if self._cow and element.gedcom_file is not self:
+                element = self.mutable(element)
+            return element
+        if self._batch is not None:
+            return self._batch.pending_ids.get(key)
         return None
 
     def add_element(self, element):
@@ -46,48 +194,407 @@ class GedcomFile(object):
         Add an Element to this file.
 
         If element.level is unset, it'll presume it's a top level element,
-        and set the level and id appropriately.
+        and set the level and id appropriately. Ids are numbered per prefix
+        (see :py:const:`gedcom.ids.record_prefixes`), after the highest id
+        with that prefix that is already in the file.
 
         :param :py:class:`Element` element: Element to add
+        :raises TypeError: if element.level is unset, and it's not a kind of record that can be given an id
+        """
+        self._prepare_element(element)
+        if self._batch is not None:
+            self._batch.add((element,))
+        else:
+            self._index_elements((element,))
+
+    def add_elements(self, elements):
+        """
+        Add many Elements to this file, like :py:meth:`add_element`.
+
+        The indexes of the file are updated once for the whole batch.
+
+        :param elements: iterable of :py:class:`Element`
+        :returns: list of the added elements
+        :rtype: list
+        """
+        elements = list(elements)
+        for element in elements:
+            self._prepare_element(element)
+        if self._batch is not None:
+            self._batch.add(elements)
+        else:
+            self._index_elements(elements)
+        return elements
+
+    def clone(self):
+        """
+        Return a copy of this file that shares all its elements with this one, until they are changed.
+
+        Making a clone takes constant time. :py:attr:`root_elements` and
+        :py:attr:`pointers` are copied the first time either file changes
+        them. A record is copied, for one of the files, when that file
+        changes it or hands it out:
+
+        * Getting a record from the clone (``clone[id]``, :py:attr:`individuals`,
+          :py:attr:`families`, :py:meth:`mutable`) gives the clone its own copy,
+          so that pointers from it are looked up in the clone.
+        * Changing an element of a record through the API (e.g. the
+          :py:attr:`Element.value` setter) first gives every other file that
+          shares the record a copy of it as it was, so the change is seen by the
+          file the element belongs to (its :py:attr:`Element.gedcom_file`) only.
+
+        So either file can be changed as usual::
+
+            what_if = gedcom_file.clone()
+            what_if['@I1@']['SEX'].value = 'F'
+
+        Records in :py:attr:`root_elements` may still be shared, and belong
+        to the file they came from; get the clone's version of one from
+        :py:meth:`mutable`. Records added later belong to one file only.
+
+        :rtype: GedcomFile
+        """
+        clone = GedcomFile()
+        clone.root_elements = self.root_elements
+        clone.pointers = self.pointers
+        clone.ids.counters = dict(self.ids.counters)
+        clone.source_filename = self.source_filename
+        clone.source_newline = self.source_newline
+        clone._source_stat = self._source_stat
+        # only ever added to, for records that are in one of the files alone
+        clone._spans = self._spans
+        self._share(clone)
+        self._shared = clone._shared = True
+        return clone
+
+    def _share(self, other):
+        """Start sharing elements with `other`, a new file, copying them on write like for a :py:meth:`clone`."""
+        if self._family is None:
+            self._family = weakref.WeakSet([self])
+        self._family.add(other)
+        other._family = self._family
+        for gedcom_file in (self, other):
+            gedcom_file._cow = True
+            # what this file had to itself is now shared too
+            gedcom_file._token = object()
+            if gedcom_file._copies is None:
+                gedcom_file._copies = weakref.WeakKeyDictionary()
+
+    def freeze(self):
+        """
+        Make this file read only, so that one tree can be shared by many threads without locks.
+
+        Freezing adds the HEAD and TRLR if they're missing (see
+        :py:meth:`ensure_header_trailer`), links the pointers (see
+        :py:meth:`link`), turns :py:attr:`root_elements` and every
+        :py:attr:`Element.child_elements` into tuples, and interns the tags,
+        ids and (non pointer) values. It also works out everything that would
+        otherwise be worked out, and cached, when it's first read:
+        :py:attr:`Element.content_hash`, the records by tag, the
+        :py:attr:`Individual.kinship` of every individual, and the children
+        by tag of elements with more than :py:data:`frozen_index_children`
+        of them (for :py:meth:`Element.get_list` and ``element[tag]``). After that,
+        reading the file doesn't change anything in it.
+
+        Changing the file, or its elements, through the API raises TypeError,
+        and the tuples can't be changed directly. To make changes, take a
+        :py:meth:`clone` of the frozen file; the clone isn't frozen::
+
+            tree = gedcom.parse_filename("tree.ged").freeze()
+            draft = tree.clone()
+
+        :returns: this file
+        :rtype: GedcomFile
+        :raises RuntimeError: in the middle of a :py:meth:`batch`
         """
+        if self._frozen:
+            return self
+        if self._batch is not None:
+            raise RuntimeError("Cannot freeze a file in the middle of a batch")
+        if self._cow:
+            # nothing frozen can be shared with a file that isn't
+            for record in list(self.root_elements):
+                self._own(record)
+        # writing the file out would add them otherwise
+        self.ensure_header_trailer()
+        self.link()
+        intern = sys.intern
+        tag_index = {}
+        for record in self.root_elements:
+            record.tag = intern(record.tag)
+            tag_index.setdefault(record.tag, []).append(record)
+        stack = list(self.root_elements)
+        while stack:
+            element = stack.pop()
+            if element._id is not None:
+                element._id = intern(element._id)
+            if element.parent_id is not None:
+                element.parent_id = intern(element.parent_id)
+            if type(element._value) is str:
+                element._value = intern(element._value)
+            children = element.child_elements
+            if not children:
+                element.child_elements = ()
+                continue
+            for child in children:
+                child.tag = intern(child.tag)
+            if len(children) > frozen_index_children:
+                tags = {}
+                for child in children:
+                    tags.setdefault(child.tag, []).append(child)
+                element._tags = dict((tag, tuple(elements)) for tag, elements in tags.items())
+            element.child_elements = tuple(children)
+            stack.extend(children)
+        for record in self.root_elements:
+            # hashed now, so that reading it later doesn't write it
+            record.content_hash
+        self._tag_index = dict((tag, tuple(records)) for tag, records in tag_index.items())
+        self._kinship = dict((individual.id, _kinship(individual)) for individual in self.individuals if individual.id)
+        self.root_elements = tuple(self.root_elements)
+        self.pointers = types.MappingProxyType(dict(self.pointers))
+        self._shared = False
+        self._positions = None
+        self._frozen = True
+        return self
+
+    def _before_change(self):
+        """Check that the records or indexes of this file can be changed, before they are."""
+        if self._frozen:
+            raise TypeError("This file is frozen, change a clone() of it instead")
+
+    def _unshare(self):
+        """Take a copy of root_elements and pointers, if they are shared with a clone."""
+        if self._shared:
+            self.root_elements = list(self.root_elements)
+            self.pointers = dict(self.pointers)
+            self._shared = False
+
+    def _position(self, record):
+        """Return the index of `record` in root_elements, or None if it isn't there."""
+        if self._positions is not None:
+            position = self._positions.get(id(record))
+            if position is not None and position < len(self.root_elements) and self.root_elements[position] is record:
+                return position
+            if position is None and len(self.root_elements) == self._positions_length:
+                return None
+        # records have been added or moved since the index was made
+        self._positions = dict((id(element), i) for i, element in enumerate(self.root_elements))
+        self._positions_length = len(self.root_elements)
+        position = self._positions.get(id(record))
+        return position if position is not None and self.root_elements[position] is record else None
+
+    def mutable(self, element):
+        """
+        Return the version of `element` in this file, which can be changed without changing any clones.
+
+        If `element` belongs to another file that this one shares it with
+        (see :py:meth:`clone`), this file is given its own copy of the record
+        `element` is in, and the copy of `element` is returned. Elements that
+        belong to this file are returned as they are; changing them gives the
+        other files copies first.
+
+        :param Element element: element in this file
+        :returns: `element`, or the copy of it in this file
+        :rtype: Element
+        :raises ValueError: if `element` isn't in this file
+        """
+        self._before_change()
+        if not self._cow or element.gedcom_file is self:
+            return element
+        path = []
+        record = element
+        while record.parent_element is not None:
+            parent = record.parent_element
+            path.append(next(i for i, child in enumerate(parent.child_elements) if child is record))
+            record = parent
+        copy = self._copies.get(record)
+        if copy is None:
+            copy = self._rehome(record)
+        for index in reversed(path):
+            copy = copy.child_elements[index]
+        return copy
+
+    def _rehome(self, record):
+        """Replace `record`, which belongs to another file, by a copy of it that belongs to this one, and return the copy."""
+        position = self._position(record)
+        if position is None:
+            raise ValueError("{0!r} is not in this file".format(record))
+        self._unshare()
+        pointers = self.pointers
+        copy = None
+        stack = [(record, None)]
+        while stack:
+            original, parent = stack.pop()
+            element = object.__new__(type(original))
+            element.__dict__.update(original.__dict__)
+            element.__dict__.pop('_tags', None)
+            if isinstance(original._value, Pointer):
+                # it points to a record of the other file
+                element._value = str(original._value)
+            element.gedcom_file = self
+            element._owner = self._token
+            element.parent_element = parent
+            element.child_elements = []
+            if original._id and pointers.get(original._id) is original:
+                pointers[original._id] = element
+            if parent is None:
+                copy = element
+            else:
+                parent.child_elements.append(element)
+            stack.extend((child, element) for child in reversed(original.child_elements))
+        self.root_elements[position] = copy
+        self._positions[id(copy)] = position
+        self._copies[record] = copy
+        span = self._spans.get(record)
+        if span is not None:
+            self._spans[copy] = span
+        return copy
+
+    def _take(self, element):
+        """Make the record `element` is in belong to this file alone, giving the other files that share it copies of it first."""
+        record = element
+        while record.parent_element is not None:
+            record = record.parent_element
+        for other in list(self._family or ()):
+            if other is not self and other._position(record) is not None:
+                other._rehome(record)
+        token = self._token
+        stack = [record]
+        while stack:
+            element = stack.pop()
+            element._owner = token
+            stack.extend(element.child_elements)
+
+    def _own(self, record):
+        """Return this file's version of `record`, shared with no other file."""
+        if record.gedcom_file is not self:
+            return self._rehome(record)
+        if record._owner is not self._token:
+            self._take(record)
+        return record
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Context manager to make many changes, with the upkeep done once at the end.
+
+        Records added inside the batch are added to :py:attr:`root_elements`
+        (they can be looked up by id straight away), and the levels,
+        :py:attr:`Element.dirty` and :py:attr:`Element.content_hash` of the
+        changed elements are updated, when the batch ends (until then they
+        show the state before the batch). If an exception
+        escapes, everything changed through :py:meth:`add_element`,
+        :py:meth:`Element.add_child_element`, and the :py:attr:`Element.value`
+        and :py:attr:`Element.id` setters is undone instead::
+
+            with gedcom_file.batch():
+                for individual in gedcom_file.individuals:
+                    individual.add_child_element(gedcom_file.element("NOTE", value="checked"))
+
+        Changes made directly to :py:attr:`Element.child_elements` aren't
+        undone. A batch inside another one is part of the outer one.
+
+        :returns: context manager giving the :py:class:`Batch`
+        """
+        if self._batch is not None:
+            yield self._batch
+            return
+        batch = self._batch = Batch(self)
+        try:
+            yield batch
+        except BaseException:
+            batch.rollback()
+            raise
+        batch.commit()
+
+    def _prepare_element(self, element):
+        """Set the level, id and file of an element that is about to be added."""
+        self._before_change()
+        if self._token is not None and element._owner is None:
+            element._claim(self._token)
         if element.level is None:
             # Need to figure out an element
-            if not (isinstance(element, Individual) or
-                    isinstance(element, Family) or
-                    element.tag in ['INDI', 'FAM']):
-                raise TypeError()
+            if element.tag not in record_prefixes:
+                raise TypeError("Cannot add a {0} element as a record".format(element.tag))
             element.level = 0
+            element.gedcom_file = self
             element.set_levels_downward()
+            if not element.id:
+                element.id = self.ids.allocate(record_prefixes[element.tag], taken=self.pointers)
+        element.gedcom_file = self
+        if element.id:
+            self.ids.seen(element.id)
 
-            # create pointer
-            if isinstance(element, Individual) or element.tag == 'INDI':
-                prefix = 'I'
-            elif isinstance(element, Family) or element.tag == 'FAM':
-                prefix = 'F'
+    def _index_elements(self, elements):
+        """Add these (prepared) elements to the pointer and record indexes."""
+        self._before_change()
+        self._unshare()
+        self._positions = None
+        pointers = self.pointers
+        records = []
+        for element in elements:
+            if element.id:
+                pointers[element.id] = element
+            if element.level == 0:
+                records.append(element)
+        if records:
+            if self.root_elements and self.root_elements[-1].tag == 'TRLR':
+                # keep the trailer last
+                self.root_elements[-1:-1] = records
             else:
-                raise NotImplementedError()
-
-            for step in range(1, 1000000):
-                potential_id = "@{prefix}{num}@".format(prefix=prefix,
-                                                        num=self.next_free_id)
-                if potential_id in self.pointers:
-                    # this number is taken, increase
-                    self.next_free_id += 1
-                else:
-                    # Found a free id
-                    element.id = potential_id
-                    self.next_free_id += 1
-                    break
-            else:
-                # Tried 1,000,000 times and didn't have a free id? weird!
-                # prevents an infinite loop
-                raise Exception("Ran out of ids?")
+                self.root_elements.extend(records)
 
-        element.gedcom_file = self
-        if element.id:
-            self.pointers[element.id] = element
-        if element.level == 0:
-            self.root_elements.append(element)
+    def record(self, tag, **kwargs):
+        """
+        Create and return a new level 0 element of this tag in this file, with a new id.
+
+        :param str tag: tag of the record (e.g. 'SOUR')
+        :param **kwargs: Passed to Element constructor
+        :rtype: Element or subclass based on `tag`
+        """
+        new_element = self.element(tag, **kwargs)
+        self.add_element(new_element)
+        return new_element
+
+    def link(self):
+        """
+        Replace every pointer value in this file with a :py:class:`Pointer` to the record it points to.
+
+        Pointers are still strings with the same text, so nothing changes when
+        saving, but :py:meth:`Element.get_by_id` (and so
+        :py:attr:`Individual.parents`, :py:meth:`Spouse.as_individual` etc.)
+        follow them directly rather than looking them up. Linking doesn't mark
+        anything as changed. Values set later are plain strings again, so call
+        this again after editing pointers.
+
+        :returns: which pointers point to nothing, and which records nothing points to
+        :rtype: :py:class:`LinkReport`
+        """
+        pointers = self.pointers
+        dangling = []
+        referenced = set()
+        linked = 0
+        for record in self.root_elements:
+            # records shared with a clone are left as they are, the targets would be in this file only
+            shared = self._cow and record._owner is not self._token
+            stack = [record]
+            while stack:
+                element = stack.pop()
+                value = element._value
+                if value and value[0] == '@' and pointer_format.match(value):
+                    target = pointers.get(value)
+                    if target is None:
+                        dangling.append(element)
+                    else:
+                        if not shared:
+                            element._value = Pointer(value, target)
+                        referenced.add(value)
+                        linked += 1
+                if element.child_elements:
+                    stack.extend(reversed(element.child_elements))
+
+        unused = [record for record in self.root_elements if record.id and record.id not in referenced]
+        return LinkReport(dangling, unused, linked)
 
     @property
     def individuals(self):
@@ -97,6 +604,10 @@ class GedcomFile(object):
         :returns: iterator of Individual's
         :rtype: iterator
         """
+        if self._tag_index is not None:
+            return iter(self._tag_index.get('INDI', ()))
+        if self._cow:
+            return self._records(Individual)
         return (i for i in self.root_elements if isinstance(i, Individual))
 
     @property
@@ -107,8 +618,23 @@ class GedcomFile(object):
         :returns: iterator of Families's
         :rtype: iterator
         """
+        if self._tag_index is not None:
+            return iter(self._tag_index.get('FAM', ()))
+        if self._cow:
+            return self._records(Family)
         return (i for i in self.root_elements if isinstance(i, Family))
 
+    def _records(self, klass):
+        """Yield the records of this class, giving this file its own copy of the ones that belong to another file."""
+        i = 0
+        while i < len(self.root_elements):
+            record = self.root_elements[i]
+            if isinstance(record, klass):
+                if record.gedcom_file is not self:
+                    record = self._rehome(record)
+                yield record
+            i += 1
+
     def gedcom_lines(self):
         """
         Iterator that returns the lines in this file.
@@ -117,10 +643,8 @@ class GedcomFile(object):
         :rtype: iterator
         """
         self.ensure_header_trailer()
-        self.ensure_levels()
         for el in self.root_elements:
-            for line in el.gedcom_lines():
-                yield line
+            yield from el.gedcom_lines(level=0)
 
     def gedcom_lines_as_string(self):
         """
@@ -135,20 +659,201 @@ class GedcomFile(object):
         """
         Save the contents of this GEDCOM file to specified filename or file-like object.
 
+        If this file was parsed from a file on disk (with :py:func:`parse_filename`)
+        which hasn't changed since, records that aren't :py:attr:`Element.dirty`
+        are copied byte for byte from that file, and only changed records are
+        serialised. After saving to a filename, that file becomes the source
+        for the next save.
+
         :param fileout: Filename or open file-like object to save this to.
-        :raises Exception: if the filename exists
+        :raises FileExistsError: if the filename exists and `overwrite` isn't set
         """
         if isinstance(fileout, six.string_types):
-            if os.path.exists(fileout) and not overwrite:
-                # TODO better exception
-                raise Exception("File exists")
+            check_output(fileout, overwrite)
+            source = self._source_file()
+            if source is not None and os.path.exists(fileout) and os.path.samefile(fileout, self.source_filename):
+                # Can't write over the file we're copying from, so write next to it and move into place
+                with source:
+                    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(fileout)), delete=False) as fp:
+                        try:
+                            spans = self._write_records(fp, source)
+                        except BaseException:
+                            fp.close()
+                            os.remove(fp.name)
+                            raise
+                os.replace(fp.name, fileout)
             else:
                 with open(fileout, "wb") as fp:
-                    return self.save(fp)
+                    if source is not None:
+                        with source:
+                            spans = self._write_records(fp, source)
+                    else:
+                        spans = self._write_records(fp, None)
+
+            self._spans = dict(spans)
+            for record, _ in spans:
+                # a record shared with a clone is still changed as far as the clone's next save is concerned
+                if not self._cow or record._owner is self._token:
+                    record.mark_clean()
+            self.source_filename = fileout
+            self._source_stat = self._stat(fileout)
+            return
+
+        source = self._source_file()
+        if source is not None:
+            with source:
+                self._write_records(fileout, source)
+        else:
+            self._write_records(fileout, None)
+
+    def source_span(self, record):
+        """
+        Return where `record` is in :py:attr:`source_filename`, the file this was parsed from or last saved to.
+
+        :param Element record: level 0 element of this file
+        :returns: (start, end) byte offsets, or None if the record isn't in that file (e.g. it was added since)
+        :rtype: tuple
+        """
+        return (self._spans or {}).get(record)
+
+    @staticmethod
+    def _stat(filename):
+        stat = os.stat(filename)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _source_file(self):
+        """Return the file this was parsed from, opened for reading, if it is still unchanged."""
+        if self.source_filename is None:
+            return None
+        try:
+            if self._stat(self.source_filename) != self._source_stat:
+                return None
+            return open(self.source_filename, "rb")
+        except OSError:
+            return None
+
+    def _write_records(self, fileout, source):
+        """
+        Write all records to `fileout`, copying unchanged ones from `source`.
+
+        :returns: list of (record, (start, end)) byte offsets of every record in `fileout`
+        """
+        self.ensure_header_trailer()
+        newline = self.source_newline if source is not None else "\n"
+        encoded_newline = newline.encode("utf8")
+        spans = []
+        buffer = []
+        buffered = 0
+        position = 0
+        # pending run of unchanged records that can be copied in one go
+        copy_start = copy_end = None
+
+        def copy_run():
+            remaining = copy_end - copy_start
+            source.seek(copy_start)
+            data = b""
+            while remaining > 0:
+                data = source.read(min(remaining, copy_buffer_size))
+                if not data:
+                    raise IOError("{0} is shorter than expected".format(self.source_filename))
+                fileout.write(data)
+                remaining -= len(data)
+            if not data.endswith(b"\n"):
+                # last line in the source didn't have a line ending
+                fileout.write(encoded_newline)
+                record, (start, end) = spans[-1]
+                spans[-1] = (record, (start, end + len(encoded_newline)))
+                return len(encoded_newline)
+            return 0
+
+        source_spans = self._spans or {}
+        for record in self.root_elements:
+            span = source_spans.get(record)
+            if source is not None and span is not None and not record.dirty:
+                if buffer:
+                    fileout.write(b"".join(buffer))
+                    del buffer[:]
+                    buffered = 0
+                if copy_start is not None and copy_end != span[0]:
+                    position += copy_run()
+                    copy_start = None
+                if copy_start is None:
+                    copy_start = span[0]
+                copy_end = span[1]
+                spans.append((record, (position, position + span[1] - span[0])))
+                position += span[1] - span[0]
+            else:
+                if copy_start is not None:
+                    position += copy_run()
+                    copy_start = None
+                data = (newline.join(record.gedcom_lines(level=0)) + newline).encode("utf8")
+                spans.append((record, (position, position + len(data))))
+                position += len(data)
+                buffer.append(data)
+                buffered += len(data)
+                if buffered >= copy_buffer_size:
+                    fileout.write(b"".join(buffer))
+                    del buffer[:]
+                    buffered = 0
+
+        if copy_start is not None:
+            copy_run()
+        if buffer:
+            fileout.write(b"".join(buffer))
+        return spans
+
+    def to_sqlite(self, path, overwrite=False):
+        """
+        Write the contents of this file into a new SQLite database.
+
+        See :py:func:`gedcom.sqlite.to_sqlite` for the tables.
+
+        :param str path: filename of the database to create
+        :param bool overwrite: replace `path` if it exists
+        :returns: number of rows written per table
+        :rtype: dict
+        """
+        from .sqlite import to_sqlite
+        return to_sqlite(self, path, overwrite=overwrite)
+
+    def share_graph(self):
+        """
+        Compile the parents, children and spouses of every individual into arrays in shared memory.
+
+        Worker processes can attach to them, and search them, without a
+        copy of the file. See :py:class:`gedcom.graph.SharedGraph`.
+
+        :rtype: :py:class:`gedcom.graph.SharedGraph`
+        """
+        from .graph import share_graph
+        return share_graph(self)
+
+    def memory_report(self, biggest=10):
+        """
+        Work out roughly how much memory the elements of this file use, by tag, by record type and for the biggest records.
+
+        See :py:class:`gedcom.memory.MemoryReport`.
+
+        :param int biggest: number of the biggest records to list
+        :rtype: :py:class:`gedcom.memory.MemoryReport`
+        """
+        from .memory import memory_report
+        return memory_report(self, biggest=biggest)
+
+    def extract(self, individuals, include='ancestors', depth=None):
+        """
+        Return a new file with these individuals and their ancestors and/or descendants.
+
+        Records that don't need changing are shared with this file rather
+        than copied. See :py:func:`gedcom.extract.extract`.
 
-        for line in self.gedcom_lines():
-            fileout.write(line.encode("utf8"))
-            fileout.write("\n".encode("utf8"))
+        :param individuals: :py:class:`Individual`'s (or their ids) to start from
+        :param str include: 'ancestors', 'descendants' or 'both'
+        :param int depth: *optional* number of generations to go up/down, no limit if None
+        :rtype: GedcomFile
+        """
+        from .extract import extract
+        return extract(self, individuals, include=include, depth=depth)
 
     def ensure_header_trailer(self):
         """
@@ -158,22 +863,14 @@ class GedcomFile(object):
         """
         if len(self.root_elements) == 0 or self.root_elements[0].tag != 'HEAD':
             # add header
-            head_element = self.element('HEAD', level=0, value='')
-            source = self.element("SOUR")
-            source.add_child_element(self.element("NAME", value="gedcompy"))
-            source.add_child_element(self.element("VERS", value=__version__))
-            head_element.add_child_element(source)
-            head_element.add_child_element(self.element("CHAR", value="UTF-8"))
-
-            gedcom_format = self.element("GEDC")
-            gedcom_format.add_child_element(self.element("VERS", value="5.5"))
-            gedcom_format.add_child_element(self.element("FORM", value="LINEAGE-LINKED"))
-            head_element.add_child_element(gedcom_format)
-
-            head_element.set_levels_downward()
-            self.root_elements.insert(0, head_element)
+            self._before_change()
+            self._unshare()
+            self._positions = None
+            self.root_elements.insert(0, default_header(self))
         if len(self.root_elements) == 0 or self.root_elements[-1].tag != 'TRLR':
             # add trailer
+            self._before_change()
+            self._unshare()
             self.root_elements.append(self.element('TRLR', level=0, value=''))
 
     def ensure_levels(self):
@@ -182,11 +879,33 @@ class GedcomFile(object):
 
         Sets the :py:attr:`Element.level` of all root elements to 0, and calls
         :py:meth:`Element.set_levels_downward` on each one.
+
+        Saving doesn't need this, the levels that are written out come from
+        the position in the tree, and :py:meth:`Element.add_child_element`
+        keeps the stored levels up to date.
         """
-        for root_el in self.root_elements:
+        self._before_change()
+        for root_el in list(self.root_elements):
+            if self._cow:
+                if not root_el.wrong_levels(level=0):
+                    continue
+                root_el = self._own(root_el)
             root_el.level = 0
             root_el.set_levels_downward()
 
+    def wrong_levels(self):
+        """
+        Return all elements in this file whose stored :py:attr:`Element.level` doesn't match their depth in the tree.
+
+        See :py:meth:`ensure_levels` to correct them.
+
+        :rtype: list of Element
+        """
+        wrong = []
+        for root_el in self.root_elements:
+            wrong.extend(root_el.wrong_levels(level=0))
+        return wrong
+
     def element(self, tag, **kwargs):
         """
         Return a new Element that is in this file.
@@ -200,26 +919,115 @@ class GedcomFile(object):
 
     def individual(self, **kwargs):
         """Create and return an Individual in this file."""
-        new_element = self.element("INDI", **kwargs)
-        self.add_element(new_element)
-        return new_element
+        return self.record("INDI", **kwargs)
 
     def family(self, **kwargs):
         """Create and return a Family that is in this file."""
-        new_element = self.element("FAM", **kwargs)
-        self.add_element(new_element)
-        return new_element
+        return self.record("FAM", **kwargs)
+
+
+def default_header(gedcom_file=None):
+    """
+    Return the HEAD element that gedcompy writes for files that don't have one.
+
+    :param GedcomFile gedcom_file: *optional* file the elements are in
+    :rtype: Element
+    """
+    def element(tag, **kwargs):
+        return class_for_tag(tag)(gedcom_file=gedcom_file, tag=tag, **kwargs)
+
+    head_element = element('HEAD', level=0, value='')
+    source = element("SOUR")
+    source.add_child_element(element("NAME", value="gedcompy"))
+    source.add_child_element(element("VERS", value=__version__))
+    head_element.add_child_element(source)
+    head_element.add_child_element(element("CHAR", value="UTF-8"))
+
+    gedcom_format = element("GEDC")
+    gedcom_format.add_child_element(element("VERS", value="5.5"))
+    gedcom_format.add_child_element(element("FORM", value="LINEAGE-LINKED"))
+    head_element.add_child_element(gedcom_format)
+    return head_element
+
+
+def check_output(filename, overwrite=False):
+    """
+    Check that `filename` can be written to, before anything is written.
+
+    :param str filename: file to write
+    :param bool overwrite: it's fine for the file to exist already
+    :raises FileExistsError: if the file exists and `overwrite` isn't set
+    """
+    if not overwrite and os.path.exists(filename):
+        raise FileExistsError(errno.EEXIST, "File exists", filename)
+
+
+@contextlib.contextmanager
+def output_file(fileout, overwrite=False):
+    """
+    Open `fileout` to write to, if it's a filename; a file-like object is used as it is (and not closed).
+
+    :param fileout: filename or open binary file-like object
+    :param bool overwrite: overwrite `fileout` if it's a filename that exists
+    :raises FileExistsError: if the filename exists and `overwrite` isn't set
+    """
+    if isinstance(fileout, six.string_types):
+        check_output(fileout, overwrite)
+        with open(fileout, "wb") as fp:
+            yield fp
+    else:
+        yield fileout
+
+
+def write_lines(lines, fileout, chunk_size=None):
+    """
+    Write GEDCOM lines to a binary file-like object, each followed by a newline.
+
+    Lines are joined and encoded in chunks of `chunk_size` lines, so there is
+    one encode and one write call per chunk rather than per line.
+
+    :param lines: iterable of lines (without line endings)
+    :param fileout: open binary file-like object
+    :param int chunk_size: lines per write, defaults to :py:const:`write_chunk_size`
+    """
+    chunk_size = chunk_size or write_chunk_size
+    chunk = []
+    append = chunk.append
+    for line in lines:
+        append(line)
+        if len(chunk) >= chunk_size:
+            append('')
+            fileout.write("\n".join(chunk).encode("utf8"))
+            del chunk[:]
+    if chunk:
+        append('')
+        fileout.write("\n".join(chunk).encode("utf8"))
 
 
 def parse_filename(filename):
     """
     Parse filename and return GedcomFile.
 
+    The byte range of every record in the file is remembered, so that
+    :py:meth:`GedcomFile.save` can copy unchanged records from it.
+
     :param string filename: Filename to parse
     :returns: GedcomFile instance
     """
-    with open(filename, 'r', encoding='utf-8') as fp:
-        return __parse(fp.readlines())
+    with open(filename, 'rb') as fp:
+        start = fp.read(65536)
+    if b'\r' in start and b'\n' not in start:
+        # old Mac line endings, which the byte offsets don't support
+        with open(filename, 'r', encoding='utf-8') as fp:
+            return __parse(fp.readlines())
+
+    with open(filename, 'rb') as fp:
+        lines = _SourceLines(fp)
+        gedcom_file = __parse(lines)
+    gedcom_file.source_filename = filename
+    gedcom_file.source_newline = lines.newline
+    gedcom_file._source_stat = GedcomFile._stat(filename)
+    return gedcom_file
 
 
 def parse_string(string):
@@ -261,13 +1069,117 @@ def parse(obj):
         return parse_fp(obj)
 
 
-def __parse(lines_iter):
-    current_level = 0
-    level_to_obj = {}
-    gedcom_file = GedcomFile()
+class _SourceLines(object):
+    """Iterates over the decoded lines of a binary file, keeping track of the byte offset of each line."""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.line_start = 0
+        self.position = 0
+        self.newline = "\n"
+
+    def __iter__(self):
+        for raw in self.fp:
+            if self.position == 0 and raw.endswith(b"\r\n"):
+                self.newline = "\r\n"
+            self.line_start = self.position
+            self.position += len(raw)
+            yield raw.decode('utf-8')
+
+
+def iterparse(obj):
+    """
+    Parse a GEDCOM file one record at a time, without building the whole file in memory.
+
+    Yields each level 0 record (with everything below it) as soon as it has
+    been read. The records aren't in a :py:class:`GedcomFile`, so pointers
+    can't be looked up from them.
+
+    :param obj: filename, open file-like object or string contents of GEDCOM file, like :py:func:`parse`
+    :returns: iterator over level 0 :py:class:`Element`'s
+    """
+    if isinstance(obj, six.string_types):
+        # Sanity check, presumes anything > 1KB could not be a filename
+        if len(obj) <= 1024 and os.path.exists(obj):
+            with open(obj, 'r', encoding='utf-8') as fp:
+                yield from _iter_records(fp)
+        else:
+            yield from _iter_records(obj.split("\n"))
+    else:
+        yield from _iter_records(obj)
+
+
+def split_file(filename, chunks):
+    """
+    Split a GEDCOM file into byte ranges that each start at a level 0 line.
+
+    The ranges are about the same size, so they can be parsed in parallel
+    with :py:func:`iterparse_range`.
+
+    :param str filename: GEDCOM file
+    :param int chunks: number of ranges wanted, fewer are returned for small files
+    :returns: list of (start, end) byte offsets, covering the whole file
+    :rtype: list
+    """
+    size = os.path.getsize(filename)
+    starts = [0]
+    with open(filename, "rb") as fp:
+        for i in range(1, chunks):
+            offset = max(size * i // chunks, starts[-1])
+            fp.seek(offset)
+            if offset > 0:
+                # skip the rest of the line we landed in
+                fp.readline()
+            while True:
+                offset = fp.tell()
+                line = fp.readline()
+                if not line or line.lstrip()[:1] == b"0":
+                    break
+            if starts[-1] < offset < size:
+                starts.append(offset)
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _range_lines(fp, start, end):
+    """Yield the decoded lines of an open binary file between these byte offsets."""
+    fp.seek(start)
+    position = start
+    for raw in fp:
+        if position >= end:
+            break
+        position += len(raw)
+        yield raw.decode('utf-8')
+
+
+def iterparse_range(filename, start, end):
+    """
+    Parse the records in one byte range of a GEDCOM file, like :py:func:`iterparse`.
+
+    :param str filename: GEDCOM file
+    :param int start: offset of a level 0 line (see :py:func:`split_file`)
+    :param int end: offset where the range ends
+    :returns: iterator over level 0 :py:class:`Element`'s
+    """
+    with open(filename, "rb") as fp:
+        yield from _iter_records(_range_lines(fp, start, end), first_line=(start == 0))
+
+
+def _iter_records(lines_iter, gedcom_file=None, first_line=True):
+    """
+    Yield the level 0 records parsed from these lines.
+
+    Elements below level 0 that have an id are added to `gedcom_file` as
+    they are read, the records themselves are left to the caller. If
+    `first_line` is set, the lines start at the beginning of a file.
+    """
+    stack = []
+    # _SourceLines (or a wrapper of one) keeps track of byte offsets
+    offsets = lines_iter if hasattr(lines_iter, 'line_start') else None
+    spans = gedcom_file._spans if offsets is not None and gedcom_file is not None else None
+    record = record_start = None
 
     for linenum, line in enumerate(lines_iter):
-        if linenum == 0 and repr(line).strip()[0] != '0':
+        if first_line and linenum == 0 and repr(line).strip()[0] != '0':
             line = '0 HEAD'
 
         line = line.strip()
@@ -277,22 +1189,39 @@ def __parse(lines_iter):
         if not match:
             raise NotImplementedError(line)
 
-        level = int(match.groupdict()['level'])
+        level, pointer, tag, value = match.group('level', 'id', 'tag', 'value')
+        level = int(level)
+        element = class_for_tag(tag)(level=level, tag=tag, value=value, id=pointer, gedcom_file=gedcom_file)
 
         if level == 0:
-            parent = None
+            if record is not None:
+                if spans is not None:
+                    spans[record] = (record_start, offsets.line_start)
+                yield record
+            if offsets is not None:
+                record_start = offsets.line_start
+            record = element
+            del stack[:]
         else:
-            level_to_obj = dict((l, obj)
-                                for l, obj in level_to_obj.items()
-                                if l < level)
-            parent = level_to_obj[level - 1]
-
-        element = line_to_element(level=level, parent=parent,
-                                  tag=match.groupdict()['tag'],
-                                  value=match.groupdict()['value'],
-                                  id=match.groupdict()['id'])
-        level_to_obj[level] = element
-        element.gedcom_file = gedcom_file
-        gedcom_file.add_element(element)
+            if level > len(stack):
+                raise NotImplementedError(line)
+            del stack[level:]
+            parent = stack[-1]
+            # attached directly rather than with add_child_element, so the new tree isn't marked as changed
+            element.parent_element = parent
+            element.parent_id = parent._id
+            parent.child_elements.append(element)
+            if pointer and gedcom_file is not None:
+                gedcom_file.add_element(element)
+        stack.append(element)
+
+    if record is not None:
+        if spans is not None:
+            spans[record] = (record_start, offsets.position)
+        yield record
 
+
+def __parse(lines_iter):
+    gedcom_file = GedcomFile()
+    gedcom_file.add_elements(_iter_records(lines_iter, gedcom_file))
     return gedcom_file
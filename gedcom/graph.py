@@ -0,0 +1,350 @@
+import array
+import collections
+from multiprocessing import shared_memory
+
+from .event import date_year
+from .records import iter_records, first_child, first_value
+
+# Arrays in a shared graph, in the order they're laid out in the block, and
+# their array typecodes. Individuals are numbered 0, 1, 2, ... in the order
+# of the file. The relations of individual i are
+# parents[parent_offsets[i]:parent_offsets[i + 1]] etc. (CSR). Sex is 0 if
+# unknown, 1 for M and 2 for F; unknown years are 0. The xref of individual
+# i is ids[id_offsets[i]:id_offsets[i + 1]] (UTF-8), and id_order is the
+# individuals sorted by xref, to look them up.
+graph_arrays = [
+    ('parent_offsets', 'i'), ('parents', 'i'),
+    ('child_offsets', 'i'), ('children', 'i'),
+    ('spouse_offsets', 'i'), ('spouses', 'i'),
+    ('sex', 'B'), ('birth_year', 'i'), ('death_year', 'i'),
+    ('id_offsets', 'i'), ('id_order', 'i'), ('ids', 'B'),
+]
+
+# offsets array of each relation
+_relations = {'parents': 'parent_offsets', 'children': 'child_offsets', 'spouses': 'spouse_offsets'}
+
+_sexes = {'M': 1, 'F': 2}
+
+# format version, then the length of each array
+_header = array.array('q', [0] * (1 + len(graph_arrays)))
+_header_size = len(_header) * _header.itemsize
+_version = 1
+
+
+def _year(record, tag):
+    event = first_child(record, tag)
+    year = date_year(first_value(event, 'DATE')) if event is not None else None
+    return year or 0
+
+
+def _csr(lists):
+    """Return (offsets, values) arrays for a list of lists of integers."""
+    offsets = array.array('i', [0])
+    values = array.array('i')
+    for items in lists:
+        values.extend(items)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def graph_columns(source):
+    """
+    Return the kinship graph and individual columns of a file as arrays, see :py:const:`graph_arrays`.
+
+    Relations come from the HUSB, WIFE and CHIL of the families, in one
+    pass over the records; pointers to individuals that aren't in the file
+    are left out.
+
+    :param source: :py:class:`GedcomFile`, iterable of records, or filename/file-like object/string of a GEDCOM file
+    :returns: dict of name -> array.array
+    :rtype: dict
+    """
+    ids = []
+    sex = array.array('B')
+    birth_year = array.array('i')
+    death_year = array.array('i')
+    families = []
+    for record in iter_records(source):
+        if record.tag == 'INDI' and record.id:
+            ids.append(record.id)
+            sex.append(_sexes.get((first_value(record, 'SEX') or '').upper(), 0))
+            birth_year.append(_year(record, 'BIRT'))
+            death_year.append(_year(record, 'DEAT'))
+        elif record.tag == 'FAM':
+            partners = ([child.value for child in record.child_elements if child.tag == 'HUSB'] +
+                        [child.value for child in record.child_elements if child.tag == 'WIFE'])
+            children = [child.value for child in record.child_elements if child.tag == 'CHIL']
+            if partners or children:
+                families.append((partners, children))
+
+    index = dict((xref, i) for i, xref in enumerate(ids))
+    parents = [[] for _ in ids]
+    children = [[] for _ in ids]
+    spouses = [[] for _ in ids]
+    for partners, kids in families:
+        partners = [index[xref] for xref in partners if xref in index]
+        kids = [index[xref] for xref in kids if xref in index]
+        for partner in partners:
+            children[partner].extend(kid for kid in kids if kid not in children[partner])
+            spouses[partner].extend(other for other in partners if other != partner and other not in spouses[partner])
+        for kid in kids:
+            parents[kid].extend(partner for partner in partners if partner not in parents[kid])
+
+    arrays = {'sex': sex, 'birth_year': birth_year, 'death_year': death_year}
+    arrays['parent_offsets'], arrays['parents'] = _csr(parents)
+    arrays['child_offsets'], arrays['children'] = _csr(children)
+    arrays['spouse_offsets'], arrays['spouses'] = _csr(spouses)
+    encoded = [xref.encode("utf8") for xref in ids]
+    id_offsets = arrays['id_offsets'] = array.array('i', [0])
+    for xref in encoded:
+        id_offsets.append(id_offsets[-1] + len(xref))
+    arrays['id_order'] = array.array('i', sorted(range(len(ids)), key=encoded.__getitem__))
+    arrays['ids'] = array.array('B', b"".join(encoded))
+    return arrays
+
+
+def _layout(lengths):
+    """Yield (name, typecode, offset, length) of every array, each starting at a multiple of 8 bytes."""
+    offset = _header_size
+    for (name, typecode), length in zip(graph_arrays, lengths):
+        yield name, typecode, offset, length
+        offset += (length * array.array(typecode).itemsize + 7) // 8 * 8
+
+
+def _attach(name):
+    try:
+        # Python 3.13+: the process that made the block unlinks it, not every one using it
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedGraph(object):
+    """
+    The kinship graph of a file, and some columns for each individual, in a :py:mod:`multiprocessing.shared_memory` block.
+
+    Processes that attach to the same block (by name, or by pickling a
+    SharedGraph, e.g. as an argument of a :py:class:`ProcessPoolExecutor`
+    task) read the same memory, nothing is copied, and there are no Python
+    objects per individual whose reference counts would copy the pages.
+    The arrays are read only.
+
+    Individuals are passed and returned by their xref (e.g. '@I1@').
+    """
+
+    def __init__(self, name):
+        """
+        Attach to the shared graph in the block with this name.
+
+        :param str name: name of the block, see :py:attr:`name`
+        :raises ValueError: if the block isn't a shared graph of this version
+        """
+        self._memory = _attach(name)
+        self._owner = False
+        self._open(self._memory)
+
+    def _open(self, memory):
+        header = array.array('q')
+        header.frombytes(bytes(memory.buf[:_header_size]))
+        if header[0] != _version:
+            memory.close()
+            raise ValueError("{0} is not a shared graph".format(memory.name))
+        self.arrays = {}
+        for name, typecode, offset, length in _layout(header[1:]):
+            self.arrays[name] = memory.buf[offset:offset + length * array.array(typecode).itemsize].cast(typecode)
+
+    @classmethod
+    def create(cls, source):
+        """
+        Compile the graph of `source` (see :py:func:`graph_columns`) into a new shared memory block.
+
+        The block is removed when the :py:class:`SharedGraph` returned is
+        closed (or its ``with`` block ends); other processes should
+        :py:meth:`close` theirs before that.
+
+        :param source: :py:class:`GedcomFile`, iterable of records, or filename/file-like object/string of a GEDCOM file
+        :rtype: SharedGraph
+        """
+        arrays = graph_columns(source)
+        lengths = [len(arrays[name]) for name, _ in graph_arrays]
+        layout = list(_layout(lengths))
+        size = max(layout[-1][2] + lengths[-1], _header_size + 1)
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        header = array.array('q', [_version] + lengths)
+        memory.buf[:_header_size] = header.tobytes()
+        for name, typecode, offset, length in layout:
+            data = arrays[name].tobytes()
+            memory.buf[offset:offset + len(data)] = data
+        graph = cls.__new__(cls)
+        graph._memory = memory
+        graph._owner = True
+        graph._open(memory)
+        return graph
+
+    @property
+    def name(self):
+        """Name of the shared memory block, to attach to it from other processes."""
+        return self._memory.name
+
+    def __reduce__(self):
+        """Pickle as the name of the shared memory, so other processes attach to it rather than copy it."""
+        return (SharedGraph, (self.name,))
+
+    def __len__(self):
+        """Return the number of individuals."""
+        return len(self.arrays['sex'])
+
+    def __enter__(self):
+        """Use the graph as a context manager, see :py:meth:`__exit__`."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the graph, see :py:meth:`close`."""
+        self.close()
+
+    def close(self):
+        """
+        Stop using the shared memory (and remove it, if this is the graph that :py:meth:`create` made).
+
+        Views of the :py:attr:`arrays` that were kept must be released first.
+        """
+        if self._memory is None:
+            return
+        for view in self.arrays.values():
+            view.release()
+        self.arrays = {}
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+        self._memory = None
+
+    def xref(self, index):
+        """Return the xref of individual number `index`."""
+        offsets = self.arrays['id_offsets']
+        return bytes(self.arrays['ids'][offsets[index]:offsets[index + 1]]).decode("utf8")
+
+    def index(self, xref):
+        """
+        Return the number of the individual with this xref.
+
+        :raises KeyError: if there's no such individual
+        """
+        wanted = xref.encode("utf8")
+        order = self.arrays['id_order']
+        offsets = self.arrays['id_offsets']
+        ids = self.arrays['ids']
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            i = order[middle]
+            if bytes(ids[offsets[i]:offsets[i + 1]]) < wanted:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order):
+            i = order[low]
+            if bytes(ids[offsets[i]:offsets[i + 1]]) == wanted:
+                return i
+        raise KeyError(xref)
+
+    def _edges(self, relation):
+        return self.arrays[_relations[relation]], self.arrays[relation]
+
+    def related(self, xref, relation):
+        """
+        Return the parents, children or spouses of this individual.
+
+        :param str xref: individual
+        :param str relation: 'parents', 'children' or 'spouses'
+        :returns: xrefs
+        :rtype: list
+        :raises KeyError: if there's no such individual
+        """
+        offsets, values = self._edges(relation)
+        index = self.index(xref)
+        return [self.xref(i) for i in values[offsets[index]:offsets[index + 1]].tolist()]
+
+    def ancestors(self, xref, depth=None):
+        """
+        Return the ancestors of this individual, and how many generations up they are (1 for parents).
+
+        Someone who is an ancestor in more than one way (pedigree collapse)
+        is given the nearest generation.
+
+        :param str xref: individual
+        :param int depth: *optional* number of generations to go up, no limit if None
+        :returns: dict of xref -> generation
+        :rtype: dict
+        """
+        return self._reach(xref, 'parents', depth)
+
+    def descendants(self, xref, depth=None):
+        """
+        Return the descendants of this individual, and how many generations down they are (1 for children).
+
+        :param str xref: individual
+        :param int depth: *optional* number of generations to go down, no limit if None
+        :returns: dict of xref -> generation
+        :rtype: dict
+        """
+        return self._reach(xref, 'children', depth)
+
+    def _reach(self, xref, relation, depth):
+        offsets, values = self._edges(relation)
+        start = self.index(xref)
+        found = {start: 0}
+        generation = [start]
+        level = 0
+        while generation and (depth is None or level < depth):
+            level += 1
+            following = []
+            for i in generation:
+                for j in values[offsets[i]:offsets[i + 1]].tolist():
+                    if j not in found:
+                        found[j] = level
+                        following.append(j)
+            generation = following
+        del found[start]
+        return dict((self.xref(i), level) for i, level in found.items())
+
+    def connection(self, xref1, xref2, spouses=False):
+        """
+        Return the shortest chain of parent/child relations from one individual to another.
+
+        :param str xref1: individual to start from
+        :param str xref2: individual to end at
+        :param bool spouses: also go from a person to their spouses
+        :returns: xrefs from `xref1` to `xref2` (both included), or None if they aren't related
+        :rtype: list
+        """
+        start, end = self.index(xref1), self.index(xref2)
+        edges = [self._edges('parents'), self._edges('children')]
+        if spouses:
+            edges.append(self._edges('spouses'))
+        came_from = {start: None}
+        queue = collections.deque([start])
+        while queue and end not in came_from:
+            i = queue.popleft()
+            for offsets, values in edges:
+                for j in values[offsets[i]:offsets[i + 1]].tolist():
+                    if j not in came_from:
+                        came_from[j] = i
+                        queue.append(j)
+        if end not in came_from:
+            return None
+        path = []
+        i = end
+        while i is not None:
+            path.append(self.xref(i))
+            i = came_from[i]
+        return path[::-1]
+
+
+def share_graph(source):
+    """
+    Compile the kinship graph of `source` into shared memory, see :py:meth:`SharedGraph.create`.
+
+    :param source: :py:class:`GedcomFile`, iterable of records, or filename/file-like object/string of a GEDCOM file
+    :rtype: SharedGraph
+    """
+    return SharedGraph.create(source)
@@ -0,0 +1,73 @@
+import re
+
+# Id prefix for each tag of record that gets an id assigned automatically
+record_prefixes = {
+    'INDI': 'I',
+    'FAM': 'F',
+    'SOUR': 'S',
+    'NOTE': 'N',
+    'REPO': 'R',
+    'OBJE': 'O',
+    'SUBM': 'U',
+}
+
+pointer_format = re.compile("^@[-a-zA-Z0-9_]+@$")
+
+id_format = re.compile("^@(?P<prefix>[^@0-9]*)(?P<number>[0-9]*)@$")
+
+
+def split_id(pointer):
+    """
+    Split an id/pointer into its prefix and number.
+
+    e.g. '@I12@' -> ('I', 12), '@SUBM@' -> ('SUBM', None)
+
+    :param str pointer: id/pointer (e.g. '@F3@')
+    :returns: (prefix, number), or (None, None) if this isn't a pointer
+    :rtype: tuple
+    """
+    match = id_format.match(pointer or '')
+    if match is None:
+        return None, None
+    number = match.group('number')
+    return match.group('prefix'), (int(number) if number else None)
+
+
+class IdAllocator(object):
+    """
+    Hands out new ``@<prefix><number>@`` ids.
+
+    Keeps one counter per prefix, holding the highest number seen so far, so
+    allocating a new id is O(1) no matter how many ids exist.
+    """
+
+    def __init__(self):
+        """Create an allocator that hasn't seen any ids."""
+        self.counters = {}
+
+    def seen(self, pointer):
+        """
+        Record that `pointer` is in use, so it will never be allocated.
+
+        :param str pointer: id/pointer (e.g. '@I3@')
+        """
+        prefix, number = split_id(pointer)
+        if number is not None and number > self.counters.get(prefix, 0):
+            self.counters[prefix] = number
+
+    def allocate(self, prefix, taken=()):
+        """
+        Return a new, unused, id for this prefix.
+
+        :param str prefix: id prefix (e.g. 'I' for individuals)
+        :param taken: *optional* container of ids that are in use, but might not have been :py:meth:`seen`
+        :returns: id/pointer (e.g. '@I4@')
+        :rtype: str
+        """
+        number = self.counters.get(prefix, 0) + 1
+        pointer = "@{prefix}{num}@".format(prefix=prefix, num=number)
+        while pointer in taken:
+            number += 1
+            pointer = "@{prefix}{num}@".format(prefix=prefix, num=number)
+        self.counters[prefix] = number
+        return pointer
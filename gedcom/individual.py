@@ -2,6 +2,62 @@ from typing import List
 from .element import Element, register_tag
 from .family import Family
 
+
+class Kinship(object):
+    """The parents, children and spouses of an individual, see :py:attr:`Individual.kinship`."""
+
+    def __init__(self, parents, children, spouses, complete=True):
+        """
+        Create the kinship of an individual.
+
+        :param tuple parents: partners in the families (FAMC) the individual is a child of
+        :param tuple children: children in the families (FAMS) the individual is a partner in
+        :param tuple spouses: the other partners in those families
+        :param bool complete: every FAMC family, and every partner in them, was found in the file
+        """
+        self.parents = parents
+        self.children = children
+        self.spouses = spouses
+        self.complete = complete
+
+    def __repr__(self):
+        """Short summary, for debugging purposes."""
+        return "Kinship(parents={0}, children={1}, spouses={2})".format(
+            [p.id for p in self.parents], [c.id for c in self.children], [s.id for s in self.spouses])
+
+
+def _kinship(individual):
+    """Work out the :py:class:`Kinship` of `individual`, leaving out pointers to records that aren't in the file."""
+    parents = []
+    children = []
+    spouses = []
+    complete = True
+    for famc in individual.get_list("FAMC"):
+        family = individual.get_by_id(famc.value)
+        if family is None:
+            complete = False
+            continue
+        for partner in family.get_list("HUSB") + family.get_list("WIFE"):
+            parent = partner.get_by_id(partner.value)
+            if parent is not None:
+                parents.append(parent)
+            else:
+                complete = False
+    for fams in individual.get_list("FAMS"):
+        family = individual.get_by_id(fams.value)
+        if family is None:
+            continue
+        for partner in family.get_list("HUSB") + family.get_list("WIFE"):
+            spouse = partner.get_by_id(partner.value)
+            if spouse is not None and spouse is not individual:
+                spouses.append(spouse)
+        for chil in family.get_list("CHIL"):
+            child = chil.get_by_id(chil.value)
+            if child is not None:
+                children.append(child)
+    return Kinship(tuple(parents), tuple(children), tuple(spouses), complete)
+
+
 @register_tag("INDI")
 class Individual(Element):
     """Represents and INDI (Individual) element."""
@@ -18,6 +74,10 @@ class Individual(Element):
 
         :returns: List of Individual's
         """
+        index = getattr(self.gedcom_file, '_kinship', None)
+        if index is not None and self.id in index and index[self.id].complete:
+            # otherwise the missing parents are None below
+            return list(index[self.id].parents)
         if 'FAMC' in self:
             famc = []
             if type(self['FAMC']) != list:
@@ -39,6 +99,21 @@ class Individual(Element):
         else:
             return []
 
+    @property
+    def kinship(self):
+        """
+        Return the parents, children and spouses of this person.
+
+        In a file that is :py:meth:`GedcomFile.freeze`'d, these were worked
+        out when it was frozen.
+
+        :rtype: :py:class:`Kinship`
+        """
+        index = getattr(self.gedcom_file, '_kinship', None)
+        if index is not None and self.id in index:
+            return index[self.id]
+        return _kinship(self)
+
     @property
     def name(self):
         """
@@ -0,0 +1,319 @@
+import contextlib
+import functools
+import time
+
+from . import gedcomfile as _gedcomfile
+from . import individual as _individual
+from .element import Element
+from .gedcomfile import GedcomFile
+
+# Lookups that are counted: (class, method)
+lookup_methods = [(Element, '__getitem__'), (Element, 'get_list'), (Element, '__contains__')]
+
+# Functions of gedcom.individual that each expand one node of the relationship search
+search_functions = ['search', 'search_children', 'search_siblings']
+
+_clock = time.perf_counter
+
+# the Instrumentation that is enabled, if any
+_current = None
+# (object, attribute name, original value) of everything that was replaced
+_patched = []
+_hooks = []
+
+
+class Instrumentation(object):
+    """
+    Timings and counters collected while instrumentation is enabled, see :py:func:`enable`.
+
+    Counts from several threads at once are approximate.
+    """
+
+    def __init__(self):
+        """Start with all timings and counters at 0."""
+        self.reset()
+
+    def reset(self):
+        """Set all timings and counters back to 0."""
+        self.parse = {'count': 0, 'lines': 0, 'read': 0.0, 'tokenize': 0.0, 'build': 0.0, 'total': 0.0}
+        self.link = {'count': 0, 'seconds': 0.0}
+        self.lookups = {}
+        self.connection = {'calls': 0, 'expansions': 0, 'seconds': 0.0}
+
+    def lookup(self, name):
+        """Return the counters of the lookups through `name`, adding them if needed."""
+        counts = self.lookups.get(name)
+        if counts is None:
+            counts = self.lookups[name] = {'calls': 0, 'hits': 0, 'misses': 0}
+        return counts
+
+    def results(self):
+        """
+        Return the timings (in seconds) and counters so far.
+
+        ``parse`` has the number of parses and lines, and the time spent
+        reading lines (including decoding), tokenizing them (matching the
+        line format), building the tree (everything else) and in total.
+        ``link`` has the number and time of :py:meth:`GedcomFile.link`
+        calls. ``lookups`` has the calls, hits and misses of
+        :py:meth:`GedcomFile.__getitem__` and the child lookups of
+        :py:class:`Element` (a miss finds nothing). ``connection`` has the
+        number and time of :py:func:`connection` calls, and how many search
+        nodes were expanded.
+
+        :rtype: dict
+        """
+        return {
+            'parse': dict(self.parse),
+            'link': dict(self.link),
+            'lookups': dict((name, dict(counts)) for name, counts in self.lookups.items()),
+            'connection': dict(self.connection),
+        }
+
+
+def add_hook(callback):
+    """
+    Call `callback(event, data)` after every parse, link and connection while instrumentation is enabled.
+
+    `event` is 'parse', 'link' or 'connection'; `data` is a dict with the
+    timings/counts of that one call, with the same keys as in
+    :py:meth:`Instrumentation.results`.
+
+    :param callback: function taking (event, data)
+    """
+    _hooks.append(callback)
+
+
+def remove_hook(callback):
+    """Stop calling a hook added with :py:func:`add_hook`."""
+    _hooks.remove(callback)
+
+
+def _fire(event, data):
+    for hook in list(_hooks):
+        hook(event, data)
+
+
+class _TimedLines(object):
+    """Iterates over lines, adding the time spent getting each one to the read time."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.read = 0.0
+        self.count = 0
+
+    def __getattr__(self, name):
+        # byte offsets of _SourceLines
+        return getattr(self.lines, name)
+
+    def __iter__(self):
+        iterator = iter(self.lines)
+        while True:
+            start = _clock()
+            try:
+                line = next(iterator)
+            except StopIteration:
+                self.read += _clock() - start
+                return
+            self.read += _clock() - start
+            self.count += 1
+            yield line
+
+
+class _TimedPattern(object):
+    """Stands in for the line format regex, adding the time spent matching to the tokenize time."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+
+    def match(self, line):
+        start = _clock()
+        match = self.pattern.match(line)
+        if _current is not None:
+            _current.parse['tokenize'] += _clock() - start
+        return match
+
+    def __getattr__(self, name):
+        return getattr(self.pattern, name)
+
+
+def _timed_parse(original):
+    @functools.wraps(original)
+    def parse(lines_iter):
+        lines = _TimedLines(lines_iter)
+        instrumentation = _current
+        tokenize = instrumentation.parse['tokenize']
+        start = _clock()
+        result = original(lines)
+        total = _clock() - start
+        data = {'count': 1, 'lines': lines.count, 'read': lines.read,
+                'tokenize': instrumentation.parse['tokenize'] - tokenize, 'total': total}
+        data['build'] = total - data['read'] - data['tokenize']
+        for key in ('count', 'lines', 'read', 'build', 'total'):
+            instrumentation.parse[key] += data[key]
+        _fire('parse', data)
+        return result
+    return parse
+
+
+def _timed_link(original):
+    @functools.wraps(original)
+    def link(self):
+        start = _clock()
+        result = original(self)
+        data = {'count': 1, 'seconds': _clock() - start}
+        if _current is not None:
+            _current.link['count'] += 1
+            _current.link['seconds'] += data['seconds']
+        _fire('link', data)
+        return result
+    return link
+
+
+def _counted_lookup(name, original):
+    @functools.wraps(original)
+    def lookup(self, key):
+        result = original(self, key)
+        if _current is not None:
+            counts = _current.lookup(name)
+            counts['calls'] += 1
+            if result is None or result is False or (isinstance(result, list) and not result):
+                counts['misses'] += 1
+            else:
+                counts['hits'] += 1
+        return result
+    return lookup
+
+
+def _counted_search(original):
+    @functools.wraps(original)
+    def search(*args, **kwargs):
+        if _current is not None:
+            _current.connection['expansions'] += 1
+        return original(*args, **kwargs)
+    return search
+
+
+def _timed_connection(original):
+    @functools.wraps(original)
+    def connection(*args, **kwargs):
+        instrumentation = _current
+        expansions = instrumentation.connection['expansions']
+        start = _clock()
+        result = original(*args, **kwargs)
+        data = {'calls': 1, 'expansions': instrumentation.connection['expansions'] - expansions,
+                'seconds': _clock() - start}
+        instrumentation.connection['calls'] += 1
+        instrumentation.connection['seconds'] += data['seconds']
+        _fire('connection', data)
+        return result
+    return connection
+
+
+def _patch(owner, name, replacement):
+    _patched.append((owner, name, owner.__dict__.get(name)))
+    setattr(owner, name, replacement)
+
+
+def _subclasses(klass):
+    found = []
+    stack = [klass]
+    while stack:
+        klass = stack.pop()
+        found.append(klass)
+        stack.extend(klass.__subclasses__())
+    return found
+
+
+def enable():
+    """
+    Start collecting timings and counters.
+
+    Until :py:func:`disable` is called, parsing, :py:meth:`GedcomFile.link`,
+    :py:meth:`GedcomFile.__getitem__`, the child lookups of
+    :py:class:`Element` (``element[tag]``, ``tag in element`` and
+    :py:meth:`Element.get_list`) and :py:func:`connection` go through
+    wrappers that time and count them. When disabled, the wrappers are
+    removed again, so there's no cost at all::
+
+        instrumentation = gedcom.instrument.enable()
+        gedcomfile = gedcom.parse_filename("tree.ged")
+        ...
+        print(gedcom.instrument.disable())
+
+    Enabling it again while it's enabled keeps the same counters.
+
+    :returns: the :py:class:`Instrumentation` the results are collected in
+    :rtype: Instrumentation
+    """
+    global _current
+    if _current is not None:
+        return _current
+    _current = Instrumentation()
+    _patch(_gedcomfile, '__parse', _timed_parse(getattr(_gedcomfile, '__parse')))
+    _patch(_gedcomfile, 'line_format', _TimedPattern(_gedcomfile.line_format))
+    _patch(GedcomFile, 'link', _timed_link(GedcomFile.link))
+    for klass in _subclasses(GedcomFile):
+        if '__getitem__' in klass.__dict__:
+            name = "{0}.__getitem__".format(klass.__name__)
+            _patch(klass, '__getitem__', _counted_lookup(name, klass.__dict__['__getitem__']))
+    for klass, method in lookup_methods:
+        name = "{0}.{1}".format(klass.__name__, method)
+        _patch(klass, method, _counted_lookup(name, klass.__dict__[method]))
+    for name in search_functions:
+        _patch(_individual, name, _counted_search(getattr(_individual, name)))
+    original = _individual.connection
+    connection = _timed_connection(original)
+    import gedcom
+    for module in (_individual, gedcom):
+        if getattr(module, 'connection', None) is original:
+            _patch(module, 'connection', connection)
+    return _current
+
+
+def disable():
+    """
+    Stop collecting timings and counters, and remove the wrappers.
+
+    :returns: the results, see :py:meth:`Instrumentation.results`, or None if it wasn't enabled
+    :rtype: dict
+    """
+    global _current
+    if _current is None:
+        return None
+    while _patched:
+        owner, name, original = _patched.pop()
+        if original is None:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, original)
+    instrumentation = _current
+    _current = None
+    return instrumentation.results()
+
+
+def results():
+    """
+    Return the results so far, see :py:meth:`Instrumentation.results`.
+
+    :returns: dict, or None if instrumentation isn't enabled
+    """
+    return _current.results() if _current is not None else None
+
+
+@contextlib.contextmanager
+def instrumented():
+    """
+    Context manager that enables instrumentation, and disables it at the end.
+
+    If it was already enabled, it's left enabled.
+
+    :returns: context manager giving the :py:class:`Instrumentation`
+    """
+    enabled = _current is not None
+    instrumentation = enable()
+    try:
+        yield instrumentation
+    finally:
+        if not enabled:
+            disable()
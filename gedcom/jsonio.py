@@ -0,0 +1,172 @@
+import json
+import six
+
+from .element import class_for_tag
+from .gedcomfile import GedcomFile, copy_buffer_size, output_file
+from .records import iter_records
+
+
+def record_to_dict(element):
+    """
+    Return this element, and everything below it, as plain dicts and lists.
+
+    Each element becomes ``{"tag": ..., "id": ..., "value": ..., "children": [...]}``,
+    where `id`, `value` and `children` are left out if empty. Children stay
+    in file order, so repeated tags (several NAME's or CHIL's) are all kept.
+    This is also a record format that :py:class:`GedcomWriter` accepts.
+
+    :param Element element: element to convert
+    :rtype: dict
+    """
+    output = {}
+    stack = [(element, output)]
+    while stack:
+        element, data = stack.pop()
+        data['tag'] = element.tag
+        if element.id:
+            data['id'] = element.id
+        if element.value is not None:
+            data['value'] = element.value
+        if element.child_elements:
+            children = data['children'] = []
+            for child in element.child_elements:
+                children.append({})
+                stack.append((child, children[-1]))
+    return output
+
+
+def record_from_dict(data, gedcom_file=None):
+    """
+    Return the :py:class:`Element` (or subclass) tree for a dict made by :py:func:`record_to_dict`.
+
+    :param dict data: dict for a level 0 record
+    :param GedcomFile gedcom_file: *optional* file the elements are in
+    :rtype: Element
+    """
+    record = None
+    stack = [(data, None)]
+    while stack:
+        data, parent = stack.pop()
+        tag = data['tag']
+        element = class_for_tag(tag)(level=(parent.level + 1 if parent is not None else 0), tag=tag,
+                                     value=data.get('value'), id=data.get('id'), gedcom_file=gedcom_file)
+        if parent is None:
+            record = element
+        else:
+            element.parent_element = parent
+            element.parent_id = parent.id
+            parent.child_elements.append(element)
+        for child in reversed(data.get('children', ())):
+            stack.append((child, element))
+    return record
+
+
+def _write(fileout, overwrite, chunks):
+    with output_file(fileout, overwrite) as fp:
+        buffer = []
+        buffered = 0
+        count = 0
+        for chunk in chunks:
+            buffer.append(chunk)
+            buffered += len(chunk)
+            count += 1
+            if buffered >= copy_buffer_size:
+                fp.write("".join(buffer).encode("utf8"))
+                del buffer[:]
+                buffered = 0
+        if buffer:
+            fp.write("".join(buffer).encode("utf8"))
+    return count
+
+
+def dump_ndjson(source, fileout, overwrite=False):
+    """
+    Write every record as one JSON object per line (newline delimited JSON).
+
+    If `source` is a filename or file, it's read with :py:func:`iterparse`,
+    so only one record is in memory at a time. The TRLR isn't written.
+
+    :param source: :py:class:`GedcomFile`, iterable of records, or filename/file-like object/string of a GEDCOM file
+    :param fileout: Filename or open binary file-like object to write to.
+    :raises FileExistsError: if the filename exists and `overwrite` isn't set
+    :returns: number of records written
+    :rtype: int
+    """
+    return _write(fileout, overwrite, (json.dumps(record_to_dict(record), ensure_ascii=False) + "\n"
+                                       for record in iter_records(source) if record.tag != 'TRLR'))
+
+
+def dump_json(source, fileout, overwrite=False):
+    """
+    Write every record as one JSON array, streamed out a record at a time.
+
+    Takes the same arguments as :py:func:`dump_ndjson`.
+
+    :returns: number of records written
+    :rtype: int
+    """
+    def chunks():
+        separator = "[\n"
+        for record in iter_records(source):
+            if record.tag != 'TRLR':
+                yield separator + json.dumps(record_to_dict(record), ensure_ascii=False)
+                separator = ",\n"
+        yield "[]\n" if separator == "[\n" else "\n]\n"
+    return _write(fileout, overwrite, chunks()) - 1
+
+
+def iter_ndjson(obj):
+    """
+    Read records written by :py:func:`dump_ndjson`, one at a time.
+
+    :param obj: filename or open (text or binary) file-like object
+    :returns: iterator over level 0 :py:class:`Element`'s, not in any file
+    """
+    if isinstance(obj, six.string_types):
+        with open(obj, 'r', encoding='utf-8') as fp:
+            yield from iter_ndjson(fp)
+        return
+    for line in obj:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if line.strip():
+            yield record_from_dict(json.loads(line))
+
+
+def _from_records(records):
+    gedcom_file = GedcomFile()
+    records = list(records)
+    stack = list(records)
+    while stack:
+        element = stack.pop()
+        element.gedcom_file = gedcom_file
+        if element.id and element.level != 0:
+            gedcom_file.add_element(element)
+        stack.extend(element.child_elements)
+    gedcom_file.add_elements(records)
+    return gedcom_file
+
+
+def parse_ndjson(obj):
+    """
+    Read a file written by :py:func:`dump_ndjson` back into a :py:class:`GedcomFile`.
+
+    :param obj: filename or open file-like object
+    :rtype: GedcomFile
+    """
+    return _from_records(iter_ndjson(obj))
+
+
+def parse_json(obj):
+    """
+    Read a file written by :py:func:`dump_json` back into a :py:class:`GedcomFile`.
+
+    Unlike :py:func:`parse_ndjson`, this loads the whole JSON document first.
+
+    :param obj: filename or open file-like object
+    :rtype: GedcomFile
+    """
+    if isinstance(obj, six.string_types):
+        with open(obj, 'r', encoding='utf-8') as fp:
+            return parse_json(fp)
+    return _from_records(record_from_dict(data) for data in json.load(obj))
@@ -0,0 +1,234 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+
+from .event import date_year
+
+soundex_codes = {}
+for _letters, _code in (("BFPV", "1"), ("CGJKQSXZ", "2"), ("DT", "3"), ("L", "4"), ("MN", "5"), ("R", "6")):
+    for _letter in _letters:
+        soundex_codes[_letter] = _code
+
+# (field, weight) pairs used by compare_features. Fields that are missing on
+# either side are left out of the score entirely.
+weights = (('given', 3.0), ('surname', 2.0), ('birth_year', 2.0), ('death_year', 1.0),
+           ('birth_place', 1.0), ('death_place', 1.0), ('parents', 2.0), ('spouses', 1.0))
+
+
+def soundex(name):
+    """
+    Return the American Soundex code of `name` (e.g. 'Robert' -> 'R163').
+
+    :param str name: name to encode
+    :returns: 4 character code, or '' if `name` has no letters
+    :rtype: str
+    """
+    letters = [c for c in (name or '').upper() if 'A' <= c <= 'Z']
+    if len(letters) == 0:
+        return ''
+    code = letters[0]
+    last = soundex_codes.get(letters[0], '')
+    for c in letters[1:]:
+        digit = soundex_codes.get(c, '')
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if c not in 'HW':
+            last = digit
+    return (code + '000')[:4]
+
+
+def _normalise(text):
+    if not text:
+        return None
+    return " ".join(text.lower().replace(',', ' ').split()) or None
+
+
+def _full_name(individual):
+    try:
+        first, last = individual.name
+    except Exception:
+        return None
+    return _normalise(" ".join(n for n in (first, last) if n))
+
+
+def _event_features(event):
+    if event is None:
+        return None, None
+    place = event['PLAC']
+    if isinstance(place, list):
+        place = place[0]
+    return date_year(event.date), _normalise(place.value if place is not None else None)
+
+
+def individual_features(individual):
+    """
+    Return the plain (picklable) comparison features of `individual`.
+
+    :param Individual individual: person to describe
+    :returns: dict with id, sex, given, surname, soundex, birth/death year and place, and the names of parents and spouses
+    :rtype: dict
+    """
+    try:
+        given, surname = individual.name
+    except Exception:
+        given, surname = None, None
+    birth_year, birth_place = _event_features(individual.birth)
+    death_year, death_place = _event_features(individual.death)
+
+    parents = set()
+    try:
+        for parent in individual.parents:
+            if parent is not None:
+                parents.add(_full_name(parent))
+    except AttributeError:
+        # FAMC pointing to a family that isn't in the file
+        pass
+
+    spouses = set()
+    for fams in individual.get_list('FAMS'):
+        family = individual.get_by_id(fams.value)
+        if family is None:
+            continue
+        for partner in family.partners:
+            if partner.value != individual.id:
+                spouse = partner.as_individual()
+                if spouse is not None:
+                    spouses.add(_full_name(spouse))
+
+    return {
+        'id': individual.id,
+        'sex': (individual.sex or '').upper() or None,
+        'given': _normalise(given),
+        'surname': _normalise(surname),
+        'soundex': soundex(surname),
+        'birth_year': birth_year,
+        'birth_place': birth_place,
+        'death_year': death_year,
+        'death_place': death_place,
+        'parents': frozenset(p for p in parents if p),
+        'spouses': frozenset(s for s in spouses if s),
+    }
+
+
+def blocking_key(features):
+    """
+    Return the default blocking key for these features: (surname soundex, birth decade, sex).
+
+    Only individuals with the same key are ever compared with each other.
+    """
+    decade = features['birth_year'] // 10 if features['birth_year'] is not None else None
+    return (features['soundex'], decade, features['sex'])
+
+
+def _similarity(field, a, b):
+    if field in ('parents', 'spouses'):
+        return len(a & b) / len(a | b)
+    elif field in ('birth_year', 'death_year'):
+        difference = abs(a - b)
+        if difference == 0:
+            return 1.0
+        elif difference <= 2:
+            return 0.5
+        return 0.0
+    elif field == 'given':
+        return SequenceMatcher(None, a, b).ratio()
+    elif field == 'surname':
+        if a == b:
+            return 1.0
+        elif soundex(a) == soundex(b):
+            return 0.8
+        return SequenceMatcher(None, a, b).ratio()
+    else:
+        return 1.0 if a == b else 0.0
+
+
+def compare_features(a, b):
+    """
+    Score how likely it is that two sets of :py:func:`individual_features` describe the same person.
+
+    :returns: score between 0 (nothing in common) and 1 (everything known matches)
+    :rtype: float
+    """
+    if a['sex'] and b['sex'] and a['sex'] != b['sex']:
+        return 0.0
+    total = 0.0
+    score = 0.0
+    for field, weight in weights:
+        value_a, value_b = a[field], b[field]
+        if value_a is None or value_b is None or value_a == frozenset() or value_b == frozenset():
+            continue
+        total += weight
+        score += weight * _similarity(field, value_a, value_b)
+    if total == 0:
+        return 0.0
+    return score / total
+
+
+def score(individual1, individual2):
+    """
+    Score how likely it is that these two individuals are the same person.
+
+    :param Individual individual1: first person
+    :param Individual individual2: second person
+    :rtype: float
+    """
+    return compare_features(individual_features(individual1), individual_features(individual2))
+
+
+def _compare_block(args):
+    block, threshold, window = args
+    matches = []
+    if window is None:
+        for i, a in enumerate(block):
+            for b in block[i + 1:]:
+                value = compare_features(a, b)
+                if value >= threshold:
+                    matches.append((a['id'], b['id'], value))
+    else:
+        # Sorted neighbourhood, so huge blocks stay linear
+        block = sorted(block, key=lambda f: (f['given'] or '', f['birth_year'] or 0))
+        for i, a in enumerate(block):
+            for b in block[i + 1:i + 1 + window]:
+                value = compare_features(a, b)
+                if value >= threshold:
+                    matches.append((a['id'], b['id'], value))
+    return matches
+
+
+def find_duplicates(gedcom_file, threshold=0.8, key=blocking_key, max_block_size=1000, processes=None, chunksize=64):
+    """
+    Find pairs of individuals in `gedcom_file` that probably describe the same person.
+
+    Individuals are first grouped into blocks with `key` (by default
+    :py:func:`blocking_key`), and are only compared with others in the same
+    block. Blocks bigger than `max_block_size` are compared with a sorted
+    neighbourhood window of that size instead of pairwise.
+
+    :param GedcomFile gedcom_file: file to search
+    :param float threshold: minimum :py:func:`compare_features` score to report
+    :param key: function from :py:func:`individual_features` dict to a hashable blocking key
+    :param int max_block_size: largest block that is compared pairwise
+    :param int processes: if set, compare the blocks in a process pool of this size
+    :param int chunksize: blocks per task sent to the process pool
+    :returns: list of (individual, individual, score), best matches first
+    :rtype: list
+    """
+    blocks = defaultdict(list)
+    for individual in gedcom_file.individuals:
+        features = individual_features(individual)
+        blocks[key(features)].append(features)
+
+    tasks = [(block, threshold, max_block_size if len(block) > max_block_size else None)
+             for block in blocks.values() if len(block) > 1]
+
+    if processes:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_compare_block, tasks, chunksize=chunksize))
+    else:
+        results = [_compare_block(task) for task in tasks]
+
+    duplicates = [(gedcom_file[a], gedcom_file[b], value) for matches in results for a, b, value in matches]
+    duplicates.sort(key=lambda d: -d[2])
+    return duplicates
@@ -0,0 +1,132 @@
+import heapq
+import sys
+
+import six
+
+
+def _counts(elements=0, objects=0, values=0, children=0):
+    return {'elements': elements, 'objects': objects, 'values': values, 'children': children,
+            'total': objects + values + children}
+
+
+class MemoryReport(object):
+    """
+    Result of :py:meth:`GedcomFile.memory_report`, all sizes in bytes.
+
+    Sizes are approximate: they are :py:func:`sys.getsizeof` of the objects
+    an element holds, so things they have in common with other elements (the
+    :py:class:`GedcomFile`, interned tags) aren't counted, and a string that
+    several elements share is counted once. Each size is split into
+    ``objects`` (the element and its attribute dict), ``values`` (its value
+    and id strings) and ``children`` (its list of child elements), with a
+    ``total`` and the number of ``elements``.
+
+    :ivar dict tags: tag -> sizes of the elements with that tag
+    :ivar dict records: tag -> sizes of the level 0 records with that tag and everything below them, and the number of ``records``
+    :ivar list biggest: (total, id or tag, tag) of the biggest records, biggest first
+    :ivar dict totals: sizes of all the records, plus ``index``, the list of records and the id lookup of the file
+    :ivar dict duplicates: ``strings``, the number of value strings that have more than one copy,
+        ``copies``, the number of extra copies, and ``bytes``, how much interning them would save
+    """
+
+    def __init__(self, tags, records, biggest, totals, duplicates):
+        """Create a report."""
+        self.tags = tags
+        self.records = records
+        self.biggest = biggest
+        self.totals = totals
+        self.duplicates = duplicates
+
+    def __repr__(self):
+        """Short summary, for debugging purposes."""
+        return "MemoryReport(total={0}, elements={1}, records={2!r}, duplicates={3!r})".format(
+            self.totals['total'], self.totals['elements'],
+            dict((tag, counts['total']) for tag, counts in self.records.items()), self.duplicates)
+
+
+def memory_report(gedcom_file, biggest=10):
+    """
+    Work out roughly how much memory the elements of a file use, see :py:class:`MemoryReport`.
+
+    This goes over every element once. On Python 3.11+, getting the size
+    of the attribute dict of an element makes the dict if it wasn't there
+    yet, so the file takes a little more memory afterwards.
+
+    :param GedcomFile gedcom_file: file to measure
+    :param int biggest: number of the biggest records to list
+    :rtype: MemoryReport
+    """
+    getsizeof = sys.getsizeof
+    string_types = six.string_types
+    # tag -> [elements, objects, values, children], made into dicts at the end
+    sums = {}
+    records = {}
+    largest = []
+    totals = _counts()
+    # value -> ids of the objects with this text
+    strings = {}
+
+    for record in gedcom_file.root_elements:
+        record_objects = record_values = record_children = elements = 0
+        stack = [record]
+        while stack:
+            element = stack.pop()
+            elements += 1
+            objects = getsizeof(element) + getsizeof(getattr(element, '__dict__', None) or {})
+            values = 0
+            for value in (element._value, element._id):
+                if value is None or not isinstance(value, string_types):
+                    continue
+                seen = strings.get(value)
+                if seen is None:
+                    seen = strings[value] = set()
+                elif id(value) in seen:
+                    # the same object as before, it's shared already
+                    continue
+                seen.add(id(value))
+                values += getsizeof(value)
+            child_elements = element.child_elements
+            if child_elements:
+                children = getsizeof(child_elements)
+                stack.extend(child_elements)
+            else:
+                # () is shared by all the frozen elements without children
+                children = getsizeof(child_elements) if isinstance(child_elements, list) else 0
+            if element._tags is not None:
+                children += getsizeof(element._tags) + sum(getsizeof(group) for group in element._tags.values())
+
+            counts = sums.get(element.tag)
+            if counts is None:
+                counts = sums[element.tag] = [0, 0, 0, 0]
+            counts[0] += 1
+            counts[1] += objects
+            counts[2] += values
+            counts[3] += children
+            record_objects += objects
+            record_values += values
+            record_children += children
+
+        size = _counts(elements, record_objects, record_values, record_children)
+        counts = records.get(record.tag)
+        if counts is None:
+            counts = records[record.tag] = _counts()
+            counts['records'] = 0
+        counts['records'] += 1
+        for key in size:
+            counts[key] += size[key]
+            totals[key] += size[key]
+        entry = (size['total'], record.id or record.tag, record.tag)
+        if len(largest) < biggest:
+            heapq.heappush(largest, entry)
+        elif biggest and entry > largest[0]:
+            heapq.heapreplace(largest, entry)
+
+    tags = dict((tag, _counts(*counts)) for tag, counts in sums.items())
+    totals['index'] = getsizeof(gedcom_file.root_elements) + getsizeof(gedcom_file.pointers)
+    duplicates = {'strings': 0, 'copies': 0, 'bytes': 0}
+    for value, seen in strings.items():
+        if len(seen) > 1:
+            duplicates['strings'] += 1
+            duplicates['copies'] += len(seen) - 1
+            duplicates['bytes'] += (len(seen) - 1) * getsizeof(value)
+    return MemoryReport(tags, records, sorted(largest, reverse=True), totals, duplicates)
@@ -0,0 +1,149 @@
+import re
+
+from .ids import IdAllocator, split_id
+from .gedcomfile import line_format, output_file, write_lines
+
+id_format = re.compile("^[0-9]+ (@[-a-zA-Z0-9]+@) ")
+
+
+def translation_table(existing_ids, incoming_ids):
+    """
+    Work out which of `incoming_ids` need a new id so they don't collide with `existing_ids`.
+
+    New ids keep the prefix of the old id, and are numbered after the highest
+    id with that prefix in either set, so they can never collide.
+
+    :param existing_ids: iterable of ids that will be kept as is
+    :param incoming_ids: iterable of ids that are being added
+    :returns: dict of old id -> new id, only for ids that have to change
+    :rtype: dict
+    """
+    existing_ids = set(existing_ids)
+    incoming_ids = list(incoming_ids)
+    allocator = IdAllocator()
+    for pointer in existing_ids:
+        allocator.seen(pointer)
+    for pointer in incoming_ids:
+        allocator.seen(pointer)
+
+    table = {}
+    for pointer in incoming_ids:
+        if pointer in existing_ids and pointer not in table:
+            prefix, number = split_id(pointer)
+            table[pointer] = allocator.allocate(prefix or '', taken=existing_ids)
+    return table
+
+
+def remap_line(line, table):
+    """
+    Rewrite the id and pointer value of one GEDCOM line with the translation `table`.
+
+    :param str line: GEDCOM line, without line ending
+    :param dict table: old id -> new id
+    :returns: the rewritten line (or `line` itself if nothing changed)
+    :rtype: str
+    """
+    if '@' not in line:
+        return line
+    match = line_format.match(line)
+    if not match:
+        return line
+    pointer, value = match.group('id'), match.group('value')
+    if pointer not in table and value not in table:
+        return line
+    return u"{level}{id} {tag}{value}".format(
+        level=match.group('level'),
+        id=(" " + table.get(pointer, pointer) if pointer else ""),
+        tag=match.group('tag'),
+        value=(" " + table.get(value, value) if value is not None else ""))
+
+
+def merge(gedcom_file, other):
+    """
+    Move all records of `other` into `gedcom_file`, renumbering any colliding ids.
+
+    The HEAD and TRLR of `other` are dropped. The ids of the elements inside
+    the records are renumbered too, like the ids of the records, and every
+    pointer value inside the moved records (FAMC, FAMS, HUSB, WIFE, CHIL, SOUR,
+    NOTE, ...) is rewritten with the same translation table, in one pass over `other`.
+
+    :param GedcomFile gedcom_file: file to merge into, this is modified
+    :param GedcomFile other: file to merge from, its records are moved, not copied
+    :returns: dict of old id -> new id for the elements of `other` that were renumbered
+    :rtype: dict
+    """
+    table = translation_table(gedcom_file.pointers, other.pointers)
+
+    records = []
+    nested = []
+    for record in other.root_elements:
+        if record.tag in ('HEAD', 'TRLR'):
+            continue
+        stack = [record]
+        while stack:
+            element = stack.pop()
+            element.gedcom_file = gedcom_file
+            if element.id in table:
+                element.id = table[element.id]
+                for child in element.child_elements:
+                    child.parent_id = element.id
+            if element.value in table:
+                element.value = table[element.value]
+            if element.id and element is not record:
+                nested.append(element)
+            stack.extend(element.child_elements)
+        records.append(record)
+
+    # the elements with an id inside the records are indexed too, like when parsing
+    gedcom_file.add_elements(records + nested)
+    return table
+
+
+def _ids(filename):
+    with open(filename, 'r', encoding='utf-8-sig') as fp:
+        for line in fp:
+            if '@' in line:
+                match = id_format.match(line)
+                if match:
+                    yield match.group(1)
+
+
+def merge_files(first, second, fileout, overwrite=False):
+    """
+    Merge two GEDCOM files on disk into `fileout`, without parsing either into a tree.
+
+    Reads both files twice: once to collect the ids, of the records and of
+    the elements inside them, and build the translation table, and once to
+    stream the lines out, rewriting the colliding ids and pointers of
+    `second`. The HEAD of `first` is kept, the HEAD of `second` and both
+    TRLRs are dropped and one TRLR is written at the end.
+
+    :param str first: filename of the first file, copied as is
+    :param str second: filename of the second file, renumbered where needed
+    :param fileout: Filename or open binary file-like object to write to.
+    :raises FileExistsError: if the output filename exists and `overwrite` isn't set
+    :returns: dict of old id -> new id for the elements of `second` that were renumbered
+    :rtype: dict
+    """
+    with output_file(fileout, overwrite) as fp:
+        table = translation_table(_ids(first), _ids(second))
+        write_lines(_merged_lines(first, second, table), fp)
+    return table
+
+
+def _merged_lines(first, second, table):
+    for filename, skip_head in ((first, False), (second, True)):
+        skipping = False
+        with open(filename, 'r', encoding='utf-8-sig') as fp:
+            for line in fp:
+                line = line.rstrip("\r\n")
+                if line.strip() == '':
+                    continue
+                if line[0] == '0':
+                    skipping = (skip_head and line.startswith('0 HEAD')) or line.startswith('0 TRLR')
+                if skipping:
+                    continue
+                if skip_head:
+                    line = remap_line(line, table)
+                yield line
+    yield '0 TRLR'
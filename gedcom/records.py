@@ -0,0 +1,65 @@
+"""Helpers for reading records that may come from a parsed file, a stream of records or a database."""
+
+import six
+
+from .gedcomfile import GedcomFile, iterparse
+
+
+def iter_records(source):
+    """
+    Iterate over level 0 records, from any of the sources the export functions take.
+
+    :param source: :py:class:`GedcomFile`, iterable of records, or anything :py:func:`iterparse` takes
+    :rtype: iterator of :py:class:`Element`
+    """
+    if isinstance(source, GedcomFile):
+        return iter(source.root_elements)
+    elif isinstance(source, six.string_types) or hasattr(source, 'read'):
+        return iterparse(source)
+    return iter(source)
+
+
+def first_child(element, tag):
+    """
+    Return the first child element with this tag.
+
+    Unlike ``element[tag]`` this works on records that aren't linked to a
+    file and doesn't build the tag index.
+
+    :param Element element: parent element
+    :param str tag: tag to look for
+    :returns: child element, or None if there isn't one
+    :rtype: :py:class:`Element`
+    """
+    for child in element.child_elements:
+        if child.tag == tag:
+            return child
+    return None
+
+
+def first_value(element, tag):
+    """
+    Return the value of the first child element with this tag.
+
+    :param Element element: parent element
+    :param str tag: tag to look for
+    :returns: value, or None if there isn't a child with this tag
+    :rtype: str
+    """
+    child = first_child(element, tag)
+    return child.value if child is not None else None
+
+
+def name_of(individual):
+    """
+    Return the name of an individual, like :py:attr:`Individual.name`, without failing on a missing or malformed NAME.
+
+    :param Individual individual: person
+    :returns: (given name, surname), (None, None) if there isn't a usable name
+    :rtype: tuple
+    """
+    try:
+        return individual.name
+    except Exception:
+        # no, or malformed, NAME
+        return None, None
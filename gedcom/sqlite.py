@@ -0,0 +1,611 @@
+import collections
+import itertools
+import os
+import sqlite3
+import weakref
+
+from .element import class_for_tag
+from .event import event_tags, date_year
+from .gedcomfile import GedcomFile, check_output, default_header, output_file, parse_string, write_lines
+from .ids import IdAllocator
+from .records import first_child, first_value, name_of
+
+# Rows per executemany call
+batch_size = 10000
+
+schema = """
+CREATE TABLE records (
+    record_key INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    xref TEXT,
+    tag TEXT NOT NULL,
+    value TEXT
+);
+CREATE TABLE elements (
+    element_key INTEGER PRIMARY KEY,
+    record_key INTEGER NOT NULL,
+    parent_key INTEGER,
+    position INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    xref TEXT,
+    tag TEXT NOT NULL,
+    value TEXT
+);
+CREATE TABLE individuals (
+    record_key INTEGER PRIMARY KEY,
+    xref TEXT,
+    given TEXT,
+    surname TEXT,
+    sex TEXT,
+    birth_year INTEGER,
+    death_year INTEGER
+);
+CREATE TABLE families (
+    record_key INTEGER PRIMARY KEY,
+    xref TEXT,
+    husband_key INTEGER,
+    wife_key INTEGER
+);
+CREATE TABLE family_members (
+    family_key INTEGER NOT NULL,
+    individual_key INTEGER NOT NULL,
+    role TEXT NOT NULL
+);
+CREATE TABLE events (
+    element_key INTEGER PRIMARY KEY,
+    record_key INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    date TEXT,
+    year INTEGER,
+    place TEXT
+);
+"""
+
+indexes = """
+CREATE INDEX records_xref ON records (xref);
+CREATE INDEX records_tag ON records (tag);
+CREATE INDEX elements_record ON elements (record_key);
+CREATE INDEX elements_parent ON elements (parent_key);
+CREATE INDEX elements_tag ON elements (tag);
+CREATE INDEX individuals_surname ON individuals (surname);
+CREATE INDEX family_members_family ON family_members (family_key);
+CREATE INDEX family_members_individual ON family_members (individual_key);
+CREATE INDEX events_record ON events (record_key);
+CREATE INDEX events_tag_year ON events (tag, year);
+"""
+
+inserts = {
+    'records': "INSERT INTO records VALUES (?, ?, ?, ?, ?)",
+    'elements': "INSERT INTO elements VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    'individuals': "INSERT INTO individuals VALUES (?, ?, ?, ?, ?, ?, ?)",
+    'families': "INSERT INTO families VALUES (?, ?, ?, ?)",
+    'family_members': "INSERT INTO family_members VALUES (?, ?, ?)",
+    'events': "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)",
+}
+
+
+def _record_keys(gedcom_file):
+    """Return dict of xref -> record key, the record key being the (1 based) position of the record."""
+    return dict((record.id, position) for position, record in enumerate(gedcom_file.root_elements, 1) if record.id)
+
+
+def _record_rows(record, record_key, position, element_keys, keys):
+    """Yield (table, row) for one record, walking its tree once. `element_keys` is an iterator of new element keys."""
+    element_key = next(element_keys)
+    yield 'records', (record_key, position, record.id, record.tag, record.value)
+    yield 'elements', (element_key, record_key, None, 0, 0, record.id, record.tag, record.value)
+
+    if record.tag == 'INDI':
+        given, surname = name_of(record)
+        birth = first_child(record, 'BIRT')
+        death = first_child(record, 'DEAT')
+        yield 'individuals', (record_key, record.id, given, surname, first_value(record, 'SEX'),
+                              date_year(first_value(birth, 'DATE')) if birth is not None else None,
+                              date_year(first_value(death, 'DATE')) if death is not None else None)
+    elif record.tag == 'FAM':
+        yield 'families', (record_key, record.id, keys.get(first_value(record, 'HUSB')), keys.get(first_value(record, 'WIFE')))
+
+    stack = [(child, element_key, position, 1) for position, child in reversed(list(enumerate(record.child_elements)))]
+    while stack:
+        element, parent_key, position, level = stack.pop()
+        element_key = next(element_keys)
+        yield 'elements', (element_key, record_key, parent_key, position, level, element.id, element.tag, element.value)
+        if level == 1:
+            if element.tag in event_tags:
+                date = first_value(element, 'DATE')
+                yield 'events', (element_key, record_key, element.tag, date, date_year(date), first_value(element, 'PLAC'))
+            elif record.tag == 'FAM' and element.tag in ('HUSB', 'WIFE', 'CHIL') and element.value in keys:
+                yield 'family_members', (record_key, keys[element.value], element.tag)
+        if element.child_elements:
+            stack.extend((child, element_key, position, level + 1)
+                         for position, child in reversed(list(enumerate(element.child_elements))))
+
+
+def _rows(gedcom_file, keys):
+    """Yield (table, row) for everything in the file."""
+    element_keys = itertools.count(1)
+    for record_key, record in enumerate(gedcom_file.root_elements, 1):
+        yield from _record_rows(record, record_key, record_key - 1, element_keys, keys)
+
+
+def _execute_script(connection, script):
+    for statement in script.split(";"):
+        if statement.strip():
+            connection.execute(statement)
+
+
+def to_sqlite(gedcom_file, path, overwrite=False):
+    """
+    Write the contents of `gedcom_file` into a new SQLite database.
+
+    Creates the tables in :py:const:`schema`: every record, every element
+    (with the key of its parent, so the tree can be rebuilt), and the
+    individuals, families, family members and events. Records are keyed by
+    integers, their 1 based position in the file. All rows
+    are loaded in one transaction with batched ``executemany`` calls, and the
+    indexes are built afterwards.
+
+    :param GedcomFile gedcom_file: file to export
+    :param str path: filename of the database to create
+    :param bool overwrite: replace `path` if it exists
+    :raises FileExistsError: if the filename exists and `overwrite` isn't set
+    :returns: number of rows written per table
+    :rtype: dict
+    """
+    check_output(path, overwrite)
+    if os.path.exists(path):
+        os.remove(path)
+
+    keys = _record_keys(gedcom_file)
+    counts = dict((table, 0) for table in inserts)
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("BEGIN")
+        _execute_script(connection, schema)
+
+        batches = dict((table, []) for table in inserts)
+        for table, row in _rows(gedcom_file, keys):
+            batch = batches[table]
+            batch.append(row)
+            if len(batch) >= batch_size:
+                connection.executemany(inserts[table], batch)
+                counts[table] += len(batch)
+                del batch[:]
+        for table, batch in batches.items():
+            if batch:
+                connection.executemany(inserts[table], batch)
+                counts[table] += len(batch)
+
+        _execute_script(connection, indexes)
+        connection.execute("COMMIT")
+    finally:
+        connection.close()
+    return counts
+
+
+# Live records kept in memory by a SqliteGedcomFile
+default_cache_size = 10000
+
+# Record keys fetched per query when iterating over records
+page_size = 1000
+
+
+class _Keys(object):
+    """xref -> record key lookups, done in the database."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def get(self, xref, default=None):
+        if not xref:
+            return default
+        row = self.connection.execute("SELECT record_key FROM records WHERE xref = ? LIMIT 1", (xref,)).fetchone()
+        return row[0] if row is not None else default
+
+    def __contains__(self, xref):
+        return self.get(xref) is not None
+
+    def __getitem__(self, xref):
+        key = self.get(xref)
+        if key is None:
+            raise KeyError(xref)
+        return key
+
+
+class _Pointers(object):
+    """Read only view of xref -> record, like :py:attr:`GedcomFile.pointers`, that loads records on demand."""
+
+    def __init__(self, gedcom_file):
+        self.gedcom_file = gedcom_file
+
+    def get(self, xref, default=None):
+        record = self.gedcom_file[xref]
+        return record if record is not None else default
+
+    def __getitem__(self, xref):
+        record = self.gedcom_file[xref]
+        if record is None:
+            raise KeyError(xref)
+        return record
+
+    def __contains__(self, xref):
+        return xref in self.gedcom_file._keys
+
+    def __iter__(self):
+        for (xref,) in self.gedcom_file.connection.execute("SELECT xref FROM records WHERE xref IS NOT NULL"):
+            yield xref
+
+    def keys(self):
+        return iter(self)
+
+    def __len__(self):
+        return self.gedcom_file.connection.execute("SELECT count(*) FROM records WHERE xref IS NOT NULL").fetchone()[0]
+
+
+class _Records(object):
+    """The level 0 records of a :py:class:`SqliteGedcomFile`, in file order, like :py:attr:`GedcomFile.root_elements`."""
+
+    def __init__(self, gedcom_file):
+        self.gedcom_file = gedcom_file
+
+    def __len__(self):
+        return self.gedcom_file.connection.execute("SELECT count(*) FROM records").fetchone()[0]
+
+    def __iter__(self):
+        return self.gedcom_file._iter_records()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        row = None
+        if index >= 0:
+            row = self.gedcom_file.connection.execute(
+                "SELECT record_key FROM records ORDER BY position, record_key LIMIT 1 OFFSET ?", (index,)).fetchone()
+        if row is None:
+            raise IndexError("record index out of range")
+        return self.gedcom_file._get(row[0])
+
+    def insert(self, index, record):
+        """Add a record before the one at `index`, like :py:meth:`list.insert`."""
+        length = len(self)
+        if index < 0:
+            index += length
+        if index <= 0:
+            self.gedcom_file._insert(record, first=True)
+        elif index >= length:
+            self.gedcom_file._insert(record)
+        else:
+            self.gedcom_file._insert(record, index=index)
+
+    def append(self, record):
+        self.gedcom_file._insert(record)
+
+    def extend(self, records):
+        for record in records:
+            self.gedcom_file._insert(record)
+
+
+class SqliteGedcomFile(GedcomFile):
+    """
+    A GEDCOM file that is stored in an SQLite database, rather than in memory.
+
+    Records are loaded from the database when they are looked up (with
+    ``gedcom_file["@I1@"]``, :py:attr:`individuals`, :py:attr:`families`,
+    :py:attr:`root_elements` or a pointer from another record), and at most
+    `cache_size` of them are kept alive, the least recently used ones are
+    dropped. The element API is the same as for an in memory file, so
+    :py:attr:`Individual.parents`, :py:attr:`Individual.father` etc. work
+    unchanged.
+
+    Changed (:py:attr:`Element.dirty`) and added records stay in memory until
+    :py:meth:`flush` writes them all back to the database in one transaction.
+    A record that has been dropped from the cache but is still held
+    elsewhere is the same object when it's looked up again, and is written
+    by :py:meth:`flush` if it's changed after that.
+    :py:meth:`clone` and :py:meth:`freeze` load the whole file into an in
+    memory :py:class:`GedcomFile`.
+
+    The database has the tables of :py:func:`to_sqlite`; use that (or
+    :py:meth:`GedcomFile.to_sqlite`) to convert a GEDCOM file, then open it
+    with this class::
+
+        parse_filename("big.ged").to_sqlite("big.sqlite")
+        with SqliteGedcomFile("big.sqlite") as gedcom_file:
+            print(gedcom_file["@I1@"].father.name)
+    """
+
+    def __init__(self, path, cache_size=None):
+        """
+        Open (or create) a database.
+
+        :param str path: filename of the database; an empty one is created if it doesn't exist
+        :param int cache_size: *optional* maximum number of records to keep in memory
+        """
+        create = not os.path.exists(path)
+        self.path = path
+        self.cache_size = cache_size or default_cache_size
+        self.connection = sqlite3.connect(path)
+        if create:
+            _execute_script(self.connection, schema)
+            _execute_script(self.connection, indexes)
+            self.connection.commit()
+        self._keys = _Keys(self.connection)
+        self._cache = collections.OrderedDict()
+        # record_key -> every record in memory, including the ones dropped from the cache that are still in use
+        self._live = weakref.WeakValueDictionary()
+        self._unsaved = set()
+        self.pointers = _Pointers(self)
+        self.ids = IdAllocator()
+        for (xref,) in self.connection.execute("SELECT xref FROM records WHERE xref IS NOT NULL"):
+            self.ids.seen(xref)
+        self.source_filename = None
+        self.source_newline = "\n"
+        self._source_stat = None
+
+    def __enter__(self):
+        """Use the file as a context manager, see :py:meth:`__exit__`."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Write changes back (unless there was an exception), and close the database."""
+        if exc_type is None:
+            self.flush()
+        self.close()
+
+    @property
+    def root_elements(self):
+        """Sequence of all the records in this file, loaded as they are accessed."""
+        return _Records(self)
+
+    def __getitem__(self, key):
+        """
+        Return the record that has this pointer/id in this file.
+
+        :param string key: Pointer for object (e.g. "@I33@")
+        :returns: Element with this id, or None
+        :rtype: :py:class:`Element`
+        """
+        record_key = self._keys.get(key)
+        if record_key is None:
+            if self._batch is not None:
+                return self._batch.pending_ids.get(key)
+            return None
+        return self._get(record_key)
+
+    @property
+    def individuals(self):
+        """
+        Iterator of all Individual's in this file.
+
+        :returns: iterator of Individual's
+        :rtype: iterator
+        """
+        return self._iter_records("INDI")
+
+    @property
+    def families(self):
+        """
+        Iterator of all Family's in this file.
+
+        :returns: iterator of Families's
+        :rtype: iterator
+        """
+        return self._iter_records("FAM")
+
+    def _iter_records(self, tag=None):
+        """Load the records (with this tag) in file order, fetching a page of keys at a time."""
+        query = "SELECT position, record_key FROM records WHERE (position, record_key) > (?, ?)"
+        if tag is not None:
+            query += " AND tag = ?"
+        query += " ORDER BY position, record_key LIMIT {0}".format(page_size)
+        last = (float('-inf'), 0)
+        while True:
+            rows = self.connection.execute(query, last + ((tag,) if tag is not None else ())).fetchall()
+            for position, record_key in rows:
+                yield self._get(record_key)
+            if len(rows) < page_size:
+                return
+            last = rows[-1]
+
+    def _get(self, record_key):
+        """Return the record with this key, from the cache or the database."""
+        cache = self._cache
+        record = cache.get(record_key)
+        if record is not None:
+            cache.move_to_end(record_key)
+            return record
+        record = self._live.get(record_key)
+        if record is None:
+            record = self._live[record_key] = self._load(record_key)
+        cache[record_key] = record
+        self._evict()
+        return record
+
+    def _load(self, record_key):
+        """Build the element tree of a record from the elements table."""
+        elements = {}
+        record = None
+        rows = self.connection.execute(
+            "SELECT element_key, parent_key, level, xref, tag, value FROM elements WHERE record_key = ? ORDER BY element_key",
+            (record_key,))
+        for element_key, parent_key, level, xref, tag, value in rows:
+            element = class_for_tag(tag)(level=level, tag=tag, value=value, id=xref, gedcom_file=self)
+            elements[element_key] = element
+            if parent_key is None:
+                record = element
+            else:
+                parent = elements[parent_key]
+                element.parent_element = parent
+                element.parent_id = parent.id
+                parent.child_elements.append(element)
+        if record is None:
+            raise KeyError("No elements for record {0}".format(record_key))
+        record._record_key = record_key
+        return record
+
+    def _evict(self):
+        """Drop the least recently used records that haven't been changed, until the cache is small enough."""
+        cache = self._cache
+        excess = len(cache) - self.cache_size
+        if excess <= 0 or self._batch is not None:
+            # records changed in a batch aren't marked dirty until it ends
+            return
+        evict = []
+        for record_key, record in cache.items():
+            if excess <= 0:
+                break
+            if not record.dirty and record_key not in self._unsaved:
+                evict.append(record_key)
+                excess -= 1
+        for record_key in evict:
+            del cache[record_key]
+
+    def _insert(self, record, first=False, before_trailer=False, index=None):
+        """Add a new record at the start, end or before the record at `index`; its elements are written by :py:meth:`flush`."""
+        record.gedcom_file = self
+        connection = self.connection
+        if index is not None:
+            # make room by moving the record that is at `index` now, and the ones after it, one place along
+            position, record_key = connection.execute(
+                "SELECT position, record_key FROM records ORDER BY position, record_key LIMIT 1 OFFSET ?", (index,)).fetchone()
+            connection.execute("UPDATE records SET position = position + 1 WHERE position > ? OR (position = ? AND record_key >= ?)",
+                               (position, position, record_key))
+        else:
+            last = connection.execute(
+                "SELECT record_key, tag, position FROM records ORDER BY position {0}, record_key {0} LIMIT 1".format(
+                    "ASC" if first else "DESC")).fetchone()
+            if last is None:
+                position = 0
+            elif first:
+                position = last[2] - 1
+            elif before_trailer and last[1] == 'TRLR':
+                position = last[2]
+                connection.execute("UPDATE records SET position = ? WHERE record_key = ?", (position + 1, last[0]))
+            else:
+                position = last[2] + 1
+        cursor = connection.execute("INSERT INTO records (position, xref, tag, value) VALUES (?, ?, ?, ?)",
+                                    (position, record.id, record.tag, record.value))
+        record._record_key = cursor.lastrowid
+        self._unsaved.add(record._record_key)
+        self._cache[record._record_key] = record
+        self._live[record._record_key] = record
+        if record.id:
+            self.ids.seen(record.id)
+
+    def _index_elements(self, elements):
+        """Add these (prepared) records to the database, before the trailer."""
+        for element in elements:
+            if element.level == 0:
+                self._insert(element, before_trailer=True)
+
+    def ensure_header_trailer(self):
+        """
+        If GEDCOM file does not have a header (HEAD) or trailing element (TRLR), it will be added. If those exist they won't be added.
+
+        Call this method to ensure the file has these required elements.
+        """
+        first = self.connection.execute("SELECT tag FROM records ORDER BY position, record_key LIMIT 1").fetchone()
+        if first is None or first[0] != 'HEAD':
+            self._insert(default_header(self), first=True)
+        last = self.connection.execute("SELECT tag FROM records ORDER BY position DESC, record_key DESC LIMIT 1").fetchone()
+        if last[0] != 'TRLR':
+            self._insert(self.element('TRLR', level=0, value=''))
+
+    def clone(self):
+        """
+        Return an in memory copy of this file, with the changes that haven't been :py:meth:`flush`'ed.
+
+        Unlike :py:meth:`GedcomFile.clone`, every record is loaded and copied,
+        so the copy takes as much memory as parsing the file would.
+
+        :rtype: GedcomFile
+        """
+        return parse_string("\n".join(line for record in self.root_elements for line in record.gedcom_lines()))
+
+    def freeze(self):
+        """
+        Return a frozen in memory copy of this file, see :py:meth:`GedcomFile.freeze`.
+
+        The database itself can't be frozen, as records are loaded into (and
+        dropped from) the cache as they're read, so this returns a frozen
+        :py:meth:`clone` rather than this file.
+
+        :rtype: GedcomFile
+        """
+        return self.clone().freeze()
+
+    def save(self, fileout, overwrite=False):
+        """
+        Write this file out as GEDCOM, to a filename or file-like object.
+
+        Changes are :py:meth:`flush`'ed to the database first. Records are
+        loaded and written one at a time, so this works for files that don't
+        fit in memory.
+
+        :param fileout: Filename or open binary file-like object to save this to.
+        :raises FileExistsError: if the filename exists and `overwrite` isn't set
+        """
+        with output_file(fileout, overwrite) as fp:
+            self.ensure_header_trailer()
+            self.flush()
+            write_lines(self.gedcom_lines(), fp)
+
+    def flush(self):
+        """
+        Write all changed and added records back to the database, in one transaction.
+
+        :returns: number of records written
+        :rtype: int
+        """
+        records = [record for record_key, record in list(self._live.items())
+                   if record.dirty or record_key in self._unsaved]
+        if not records:
+            return 0
+        connection = self.connection
+        # records added since the last flush are already in the (uncommitted) records table, and need to stay there
+        # if this fails, so only what is done here is rolled back
+        connection.execute("SAVEPOINT flush")
+        try:
+            element_keys = itertools.count(
+                connection.execute("SELECT coalesce(max(element_key), 0) FROM elements").fetchone()[0] + 1)
+            for record in records:
+                record_key = record._record_key
+                position = connection.execute("SELECT position FROM records WHERE record_key = ?",
+                                              (record_key,)).fetchone()[0]
+                for table in ('records', 'elements', 'individuals', 'families', 'events'):
+                    connection.execute("DELETE FROM {0} WHERE record_key = ?".format(table), (record_key,))
+                connection.execute("DELETE FROM family_members WHERE family_key = ?", (record_key,))
+                for table, row in _record_rows(record, record_key, position, element_keys, self._keys):
+                    connection.execute(inserts[table], row)
+            connection.execute("RELEASE flush")
+            connection.commit()
+        except Exception:
+            connection.execute("ROLLBACK TO flush")
+            connection.execute("RELEASE flush")
+            raise
+        for record in records:
+            record.mark_clean()
+        self._unsaved.clear()
+        self._evict()
+        return len(records)
+
+    def close(self):
+        """Close the database. Changes that haven't been :py:meth:`flush`'ed are lost."""
+        self.connection.close()
+        self._cache.clear()
+        self._live.clear()
+
+
+def open_sqlite(path, cache_size=None):
+    """
+    Open a database written by :py:func:`to_sqlite` as a :py:class:`SqliteGedcomFile`.
+
+    :param str path: filename of the database
+    :param int cache_size: *optional* maximum number of records to keep in memory
+    :rtype: SqliteGedcomFile
+    """
+    return SqliteGedcomFile(path, cache_size=cache_size)
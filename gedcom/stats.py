@@ -0,0 +1,293 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .event import event_tags, date_year
+from .gedcomfile import split_file, iterparse_range
+from .records import iter_records, first_child, first_value, name_of
+
+
+def _year(record, tag):
+    event = first_child(record, tag)
+    return date_year(first_value(event, 'DATE')) if event is not None else None
+
+
+class Aggregate(object):
+    """
+    One statistic, computed a record at a time.
+
+    Subclasses keep only counters, so partial results (e.g. from different
+    parts of a file) can be combined with :py:meth:`merge`.
+    """
+
+    #: name in :py:const:`aggregates` and in the results
+    name = None
+
+    def add(self, record):
+        """Count this level 0 record."""
+        raise NotImplementedError()
+
+    def merge(self, other):
+        """Add the counts of another aggregate of the same kind to this one."""
+        raise NotImplementedError()
+
+    def result(self):
+        """
+        Return the statistic.
+
+        :rtype: dict
+        """
+        raise NotImplementedError()
+
+
+class Lifespans(Aggregate):
+    """Age at death (death year - birth year) of the individuals where both are known."""
+
+    name = 'lifespans'
+
+    def __init__(self):
+        """Start with no individuals counted."""
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.years = Counter()
+
+    def add(self, record):
+        """Count the age at death of an individual with known birth and death years."""
+        if record.tag != 'INDI':
+            return
+        birth, death = _year(record, 'BIRT'), _year(record, 'DEAT')
+        if birth is None or death is None or death < birth:
+            return
+        self._count(death - birth, 1)
+
+    def _count(self, age, count):
+        self.count += count
+        self.total += age * count
+        self.years[age] += count
+        self.minimum = age if self.minimum is None else min(self.minimum, age)
+        self.maximum = age if self.maximum is None else max(self.maximum, age)
+
+    def merge(self, other):
+        """Add the ages counted by another :py:class:`Lifespans`."""
+        for age, count in other.years.items():
+            self._count(age, count)
+
+    def result(self):
+        """Return the count, mean, min and max ages and the number of individuals of each age."""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.minimum,
+            'max': self.maximum,
+            'ages': dict(self.years),
+        }
+
+
+class ChildrenPerFamily(Aggregate):
+    """Number of families with 0, 1, 2 ... children."""
+
+    name = 'children_per_family'
+
+    def __init__(self):
+        """Start with no families counted."""
+        self.families = Counter()
+
+    def add(self, record):
+        """Count the children of a family."""
+        if record.tag == 'FAM':
+            self.families[sum(1 for child in record.child_elements if child.tag == 'CHIL')] += 1
+
+    def merge(self, other):
+        """Add the families counted by another :py:class:`ChildrenPerFamily`."""
+        self.families.update(other.families)
+
+    def result(self):
+        """Return the number of families and children, the mean, and the number of families of each size."""
+        families = sum(self.families.values())
+        children = sum(n * count for n, count in self.families.items())
+        return {
+            'families': families,
+            'children': children,
+            'mean': children / families if families else None,
+            'histogram': dict(self.families),
+        }
+
+
+class SurnameFrequencies(Aggregate):
+    """Number of individuals with each surname."""
+
+    name = 'surnames'
+
+    def __init__(self):
+        """Start with no surnames counted."""
+        self.surnames = Counter()
+
+    def add(self, record):
+        """Count the surname of an individual, if they have one."""
+        if record.tag == 'INDI':
+            surname = name_of(record)[1]
+            if surname:
+                self.surnames[surname] += 1
+
+    def merge(self, other):
+        """Add the surnames counted by another :py:class:`SurnameFrequencies`."""
+        self.surnames.update(other.surnames)
+
+    def result(self):
+        """Return surname -> number of individuals."""
+        return dict(self.surnames)
+
+
+class EventsPerDecade(Aggregate):
+    """Number of events of each tag per decade, e.g. ``{'BIRT': {1970: 3}}``."""
+
+    name = 'events_per_decade'
+
+    def __init__(self):
+        """Start with no events counted."""
+        self.events = Counter()
+
+    def add(self, record):
+        """Count the dated events of a record."""
+        for element in record.child_elements:
+            if element.tag in event_tags:
+                year = date_year(first_value(element, 'DATE'))
+                if year is not None:
+                    self.events[element.tag, year // 10 * 10] += 1
+
+    def merge(self, other):
+        """Add the events counted by another :py:class:`EventsPerDecade`."""
+        self.events.update(other.events)
+
+    def result(self):
+        """Return tag -> decade -> number of events."""
+        output = {}
+        for (tag, decade), count in self.events.items():
+            output.setdefault(tag, {})[decade] = count
+        return output
+
+
+class SexRatio(Aggregate):
+    """Number of individuals of each sex, and the number of males per female."""
+
+    name = 'sex_ratio'
+
+    def __init__(self):
+        """Start with no individuals counted."""
+        self.sexes = Counter()
+
+    def add(self, record):
+        """Count the sex of an individual, ``U`` if it is unknown."""
+        if record.tag == 'INDI':
+            self.sexes[first_value(record, 'SEX') or 'U'] += 1
+
+    def merge(self, other):
+        """Add the individuals counted by another :py:class:`SexRatio`."""
+        self.sexes.update(other.sexes)
+
+    def result(self):
+        """Return the number of individuals of each sex and the number of males per female."""
+        return {
+            'counts': dict(self.sexes),
+            'ratio': self.sexes['M'] / self.sexes['F'] if self.sexes['F'] else None,
+        }
+
+
+#: All the statistics that can be computed, by name
+aggregates = dict((klass.name, klass) for klass in (Lifespans, ChildrenPerFamily, SurnameFrequencies, EventsPerDecade, SexRatio))
+
+
+class Statistics(object):
+    """
+    A set of :py:class:`Aggregate`'s, all computed in the same pass over the records.
+
+    ::
+
+        statistics = Statistics(['lifespans', 'surnames'])
+        for record in iterparse("tree.ged"):
+            statistics.add(record)
+        print(statistics.result()['surnames'])
+    """
+
+    def __init__(self, names=None):
+        """
+        Create empty statistics.
+
+        :param names: *optional* names of the statistics to compute (keys of :py:const:`aggregates`), defaults to all of them
+        :raises KeyError: for unknown names
+        """
+        if names is None:
+            names = sorted(aggregates)
+        self.aggregates = [aggregates[name]() for name in names]
+
+    def add(self, record):
+        """Count this level 0 record in every statistic."""
+        for aggregate in self.aggregates:
+            aggregate.add(record)
+
+    def add_records(self, records):
+        """
+        Count all these records.
+
+        :returns: self
+        """
+        for record in records:
+            self.add(record)
+        return self
+
+    def merge(self, other):
+        """
+        Add the counts of `other`, which must compute the same statistics, to this.
+
+        :returns: self
+        """
+        for aggregate, other_aggregate in zip(self.aggregates, other.aggregates):
+            aggregate.merge(other_aggregate)
+        return self
+
+    def result(self):
+        """
+        Return every statistic.
+
+        :returns: dict of name -> result of that statistic
+        :rtype: dict
+        """
+        return dict((aggregate.name, aggregate.result()) for aggregate in self.aggregates)
+
+
+def compute(source, names=None):
+    """
+    Compute statistics in one pass over the records.
+
+    :param source: :py:class:`GedcomFile`, iterable of records, or filename/file-like object/string of a GEDCOM file
+    :param names: *optional* names of the statistics to compute, see :py:class:`Statistics`
+    :returns: dict of name -> result
+    :rtype: dict
+    """
+    return Statistics(names).add_records(iter_records(source)).result()
+
+
+def _compute_range(args):
+    filename, start, end, names = args
+    return Statistics(names).add_records(iterparse_range(filename, start, end))
+
+
+def compute_parallel(filename, names=None, processes=None):
+    """
+    Compute statistics for a GEDCOM file, with a part of the file parsed and counted in each process.
+
+    :param str filename: GEDCOM file
+    :param names: *optional* names of the statistics to compute, see :py:class:`Statistics`
+    :param int processes: *optional* number of processes, defaults to the number of CPUs
+    :returns: dict of name -> result, the same as :py:func:`compute`
+    :rtype: dict
+    """
+    processes = processes or os.cpu_count() or 1
+    ranges = split_file(filename, processes)
+    statistics = Statistics(names)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for partial in executor.map(_compute_range, [(filename, start, end, names) for start, end in ranges]):
+            statistics.merge(partial)
+    return statistics.result()
@@ -0,0 +1,333 @@
+import argparse
+import math
+import random
+import sys
+
+from .writer import GedcomWriter
+
+default_given_names = {
+    'M': ['John', 'William', 'James', 'Thomas', 'George', 'Henry', 'Charles', 'Joseph', 'Robert', 'Edward',
+          'Samuel', 'Peter', 'Richard', 'Daniel', 'Francis', 'Walter', 'Arthur', 'Hugh', 'Patrick', 'Michael'],
+    'F': ['Mary', 'Elizabeth', 'Sarah', 'Ann', 'Margaret', 'Jane', 'Catherine', 'Alice', 'Ellen', 'Martha',
+          'Emma', 'Susan', 'Agnes', 'Eliza', 'Hannah', 'Bridget', 'Isabella', 'Grace', 'Rose', 'Joan'],
+}
+
+default_surnames = ['Smith', 'Jones', 'Taylor', 'Brown', 'Williams', 'Wilson', 'Johnson', 'Davies', 'Robinson',
+                    'Wright', 'Thompson', 'Evans', 'Walker', 'White', 'Roberts', 'Green', 'Hall', 'Wood', 'Jackson',
+                    'Clarke', 'Murphy', 'Kelly', 'Byrne', 'Walsh', 'Ryan', "O'Brien", 'Doyle', 'Lynch', 'Murray',
+                    'Quinn', 'Moore', 'Harris', 'Lewis', 'Cooper', 'King', 'Baker', 'Hill', 'Ward', 'Morris', 'Cox']
+
+default_places = ['Dublin, Ireland', 'Cork, Ireland', 'Galway, Ireland', 'London, England', 'York, England',
+                  'Bristol, England', 'Leeds, England', 'Glasgow, Scotland', 'Edinburgh, Scotland',
+                  'Cardiff, Wales', 'Boston, Massachusetts, USA', 'New York, New York, USA',
+                  'Toronto, Ontario, Canada', 'Sydney, New South Wales, Australia']
+
+_months = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+_words = ['the', 'family', 'lived', 'in', 'a', 'small', 'house', 'near', 'church', 'and', 'worked', 'on', 'farm',
+          'records', 'show', 'that', 'they', 'moved', 'after', 'war', 'parish', 'register', 'entry', 'for', 'year']
+
+
+class _Person(object):
+    """An individual of the generation that is being made."""
+
+    def __init__(self, id, sex, given, surname, lineage, famc, birth_year, death_year):
+        self.id = id
+        self.sex = sex
+        self.given = given
+        self.surname = surname
+        self.lineage = lineage
+        self.famc = famc
+        self.birth_year = birth_year
+        self.death_year = death_year
+        self.fams = []
+
+
+class Synthesizer(object):
+    """
+    Makes up a family tree, generation by generation, from a random seed.
+
+    The same options and seed give the same file, byte for byte. Each
+    branch of the tree starts with founders (people with no parents in the
+    file). Then, generation by generation, some of them marry, either
+    someone from outside the tree (who is added as an individual without
+    parents) or, to get pedigree collapse, someone of the same generation and
+    paternal line who isn't a sibling (e.g. a cousin), and have children. When
+    a branch dies out, or reaches `generations`, a new branch starts, until
+    there are `individuals` individuals.
+
+    Records are written as soon as they are made, and only the current
+    generation is kept in memory, so files of any size can be made::
+
+        Synthesizer(seed=1, individuals=1000000).write("big.ged")
+    """
+
+    def __init__(self, seed=0, individuals=1000, generations=None, founders=None, fertility=2.5,
+                 marriage_rate=0.8, pedigree_collapse=0.05, start_year=1600, present_year=2020,
+                 given_names=None, surnames=None, places=None, sources=10, citations=0.5, citation_depth=3,
+                 notes=0.3, note_lines=2):
+        """
+        Set up a generator; nothing is made until the records are asked for.
+
+        :param seed: seed of the random numbers
+        :param int individuals: number of individuals in the file
+        :param int generations: *optional* maximum number of generations in a branch
+        :param int founders: number of founders of a branch, defaults to 1 for every 50 individuals (at least 2)
+        :param float fertility: average number of children per family
+        :param float marriage_rate: chance that someone marries
+        :param float pedigree_collapse: chance that a marriage is within the same paternal line
+        :param int start_year: year the founders of a branch are born around
+        :param int present_year: no dates after this year; people born within a lifetime of it may still be alive
+        :param dict given_names: 'M' and 'F' -> list of given names
+        :param list surnames: surnames of founders and people who marry in
+        :param list places: places of births and marriages
+        :param int sources: number of SOUR records
+        :param float citations: chance that an individual cites a source
+        :param int citation_depth: number of levels below a source citation (SOUR, DATA, TEXT, then NOTE's)
+        :param float notes: chance that an individual has a NOTE
+        :param int note_lines: number of CONT lines in a NOTE
+        """
+        self.seed = seed
+        self.individuals = individuals
+        self.generations = generations
+        self.founders = founders or max(2, individuals // 50)
+        self.fertility = fertility
+        self.marriage_rate = marriage_rate
+        self.pedigree_collapse = pedigree_collapse
+        self.start_year = start_year
+        self.present_year = present_year
+        self.given_names = given_names or default_given_names
+        self.surnames = surnames or default_surnames
+        self.places = places or default_places
+        self.sources = sources
+        self.citations = citations
+        self.citation_depth = citation_depth
+        self.notes = notes
+        self.note_lines = note_lines
+
+    def records(self):
+        """
+        Make up the records, see :py:class:`Synthesizer`.
+
+        :returns: iterator of records, as dicts that :py:class:`GedcomWriter` can write
+        :rtype: iterator
+        """
+        self._random = random.Random(self.seed)
+        self._counts = {'I': 0, 'F': 0}
+        self._lineages = 0
+        for number in range(1, self.sources + 1):
+            yield self._source(number)
+        while self._counts['I'] < self.individuals:
+            generation = [self._founder() for _ in range(min(self.founders, self.individuals - self._counts['I']))]
+            depth = 1
+            while generation:
+                if self.generations is not None and depth >= self.generations:
+                    families, outsiders, children = [], [], []
+                else:
+                    families, outsiders, children = self._next_generation(generation)
+                for person in generation + outsiders:
+                    yield self._individual(person)
+                for family in families:
+                    yield family
+                generation = children
+                depth += 1
+
+    def write(self, fileout, overwrite=False):
+        """
+        Write the made up file out, with :py:class:`GedcomWriter`.
+
+        :param fileout: filename or open binary file-like object
+        :param bool overwrite: overwrite `fileout` if it's a filename that exists
+        :returns: number of individuals, families and sources written
+        :rtype: dict
+        """
+        with GedcomWriter(fileout, overwrite=overwrite) as writer:
+            for record in self.records():
+                writer.write(record)
+        return {'individuals': self._counts['I'], 'families': self._counts['F'], 'sources': self.sources}
+
+    def _id(self, prefix):
+        self._counts[prefix] += 1
+        return "@{0}{1}@".format(prefix, self._counts[prefix])
+
+    def _person(self, sex, surname, lineage, famc, birth_year, adult=False):
+        rng = self._random
+        # some die young, most live to between 40 and 95
+        death_year = birth_year + (rng.randint(0, 15) if not adult and rng.random() < 0.15 else rng.randint(40, 95))
+        return _Person(self._id('I'), sex, rng.choice(self.given_names[sex]), surname, lineage, famc, birth_year, death_year)
+
+    def _founder(self, sex=None, birth_year=None, adult=False):
+        self._lineages += 1
+        if sex is None:
+            sex = self._random.choice('MF')
+        if birth_year is None:
+            birth_year = self.start_year + self._random.randint(-20, 20)
+        return self._person(sex, self._random.choice(self.surnames), self._lineages, None, birth_year, adult)
+
+    def _children_count(self):
+        """Poisson distributed number of children."""
+        limit = math.exp(-self.fertility)
+        count = 0
+        product = self._random.random()
+        while product > limit:
+            count += 1
+            product *= self._random.random()
+        return count
+
+    def _spouse(self, person, by_lineage, married):
+        """Return someone of the same paternal line to marry, or None."""
+        candidates = by_lineage[person.lineage]
+        start = self._random.randrange(len(candidates))
+        for i in range(min(len(candidates), 20)):
+            other = candidates[(start + i) % len(candidates)]
+            if (other.sex != person.sex and other.famc != person.famc and other.id not in married and
+                    other.death_year - other.birth_year >= 18):
+                return other
+        return None
+
+    def _next_generation(self, generation):
+        """Marry off some of this generation; return the families, the people who married in, and the children."""
+        rng = self._random
+        by_lineage = {}
+        for person in generation:
+            by_lineage.setdefault(person.lineage, []).append(person)
+        order = list(generation)
+        rng.shuffle(order)
+        married = set()
+        families = []
+        outsiders = []
+        children = []
+        for person in order:
+            if person.id in married or person.death_year - person.birth_year < 18 or rng.random() >= self.marriage_rate:
+                continue
+            spouse = None
+            if rng.random() < self.pedigree_collapse:
+                spouse = self._spouse(person, by_lineage, married)
+            if spouse is None:
+                if self._counts['I'] >= self.individuals:
+                    continue
+                spouse = self._founder('F' if person.sex == 'M' else 'M', person.birth_year + rng.randint(-5, 5), adult=True)
+                outsiders.append(spouse)
+            married.add(person.id)
+            married.add(spouse.id)
+            husband, wife = (person, spouse) if person.sex == 'M' else (spouse, person)
+            family_id = self._id('F')
+            husband.fams.append(family_id)
+            wife.fams.append(family_id)
+            end = min(husband.death_year, wife.death_year)
+            year = min(max(husband.birth_year, wife.birth_year) + 18 + rng.randint(0, 12), end)
+            end = min(end, wife.birth_year + 45)
+            kids = []
+            for number in range(self._children_count()):
+                birth_year = year + 1 + 2 * number + rng.randint(0, 1)
+                if self._counts['I'] >= self.individuals or birth_year > min(end, self.present_year):
+                    break
+                kids.append(self._person(rng.choice('MF'), husband.surname, husband.lineage, family_id, birth_year))
+            children.extend(kids)
+            elements = [('HUSB', husband.id), ('WIFE', wife.id)]
+            if year <= self.present_year:
+                elements.append(('MARR', None, [('DATE', self._date(year)), ('PLAC', rng.choice(self.places))]))
+            elements.extend(('CHIL', kid.id) for kid in kids)
+            families.append({'id': family_id, 'tag': 'FAM', 'children': elements})
+        return families, outsiders, children
+
+    def _date(self, year):
+        return "{0} {1} {2}".format(self._random.randint(1, 28), self._random.choice(_months), year)
+
+    def _text(self, words):
+        return " ".join(self._random.choice(_words) for _ in range(words)).capitalize()
+
+    def _individual(self, person):
+        rng = self._random
+        elements = [('NAME', "{0} /{1}/".format(person.given, person.surname)), ('SEX', person.sex),
+                    ('BIRT', None, [('DATE', self._date(person.birth_year)), ('PLAC', rng.choice(self.places))])]
+        if person.death_year <= self.present_year:
+            elements.append(('DEAT', None, [('DATE', self._date(person.death_year))]))
+        if person.famc:
+            elements.append(('FAMC', person.famc))
+        elements.extend(('FAMS', family_id) for family_id in person.fams)
+        if self.notes and rng.random() < self.notes:
+            elements.append(('NOTE', self._text(8), [('CONT', self._text(10)) for _ in range(self.note_lines)]))
+        if self.sources and rng.random() < self.citations:
+            elements.append(self._citation())
+        return {'id': person.id, 'tag': 'INDI', 'children': elements}
+
+    def _citation(self):
+        """SOUR citation, `citation_depth` levels deep."""
+        rng = self._random
+        depth = self.citation_depth
+        citation = ('SOUR', "@S{0}@".format(rng.randint(1, self.sources)), [])
+        if depth >= 1:
+            citation[2].append(('PAGE', "p. {0}".format(rng.randint(1, 500))))
+        if depth >= 2:
+            data = ('DATA', None, [])
+            citation[2].append(data)
+            if depth >= 3:
+                text = ('TEXT', self._text(6), [])
+                data[2].append(text)
+                parent = text
+                for _ in range(depth - 3):
+                    note = ('NOTE', self._text(4), [])
+                    parent[2].append(note)
+                    parent = note
+        return citation
+
+    def _source(self, number):
+        return {'id': "@S{0}@".format(number), 'tag': 'SOUR',
+                'children': [('TITL', "{0} parish register, volume {1}".format(self._random.choice(self.places), number)),
+                             ('AUTH', "{0} parish".format(self._random.choice(self.surnames)))]}
+
+
+def generate(fileout, overwrite=False, **options):
+    """
+    Write a made up GEDCOM file, see :py:class:`Synthesizer` for the options.
+
+    :param fileout: filename or open binary file-like object
+    :param bool overwrite: overwrite `fileout` if it's a filename that exists
+    :returns: number of individuals, families and sources written
+    :rtype: dict
+    """
+    return Synthesizer(**options).write(fileout, overwrite=overwrite)
+
+
+def _names(text):
+    return [name.strip() for name in text.split(",") if name.strip()]
+
+
+def main(argv=None):
+    """Command line interface: ``python -m gedcom.synth output.ged --individuals 100000 --seed 1``."""
+    parser = argparse.ArgumentParser(prog="python -m gedcom.synth", description="Write a made up GEDCOM file.")
+    parser.add_argument("output", help="file to write, - for standard output")
+    parser.add_argument("--overwrite", action="store_true", help="overwrite the output file if it exists")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-n", "--individuals", type=int, default=1000)
+    parser.add_argument("--generations", type=int, help="maximum number of generations in a branch")
+    parser.add_argument("--founders", type=int, help="number of founders of a branch")
+    parser.add_argument("--fertility", type=float, default=2.5, help="average number of children per family")
+    parser.add_argument("--marriage-rate", type=float, default=0.8)
+    parser.add_argument("--pedigree-collapse", type=float, default=0.05,
+                        help="chance that a marriage is within the same paternal line")
+    parser.add_argument("--start-year", type=int, default=1600)
+    parser.add_argument("--present-year", type=int, default=2020)
+    parser.add_argument("--male-names", type=_names, help="comma separated given names")
+    parser.add_argument("--female-names", type=_names, help="comma separated given names")
+    parser.add_argument("--surnames", type=_names, help="comma separated surnames")
+    parser.add_argument("--places", type=_names, help="comma separated places")
+    parser.add_argument("--sources", type=int, default=10, help="number of SOUR records")
+    parser.add_argument("--citations", type=float, default=0.5, help="chance that an individual cites a source")
+    parser.add_argument("--citation-depth", type=int, default=3, help="levels below a source citation")
+    parser.add_argument("--notes", type=float, default=0.3, help="chance that an individual has a note")
+    parser.add_argument("--note-lines", type=int, default=2, help="CONT lines per note")
+    options = vars(parser.parse_args(argv))
+    output = options.pop("output")
+    overwrite = options.pop("overwrite")
+    male, female = options.pop("male_names"), options.pop("female_names")
+    if male or female:
+        options["given_names"] = {'M': male or default_given_names['M'], 'F': female or default_given_names['F']}
+    fileout = getattr(sys.stdout, "buffer", sys.stdout) if output == "-" else output
+    counts = generate(fileout, overwrite=overwrite, **options)
+    sys.stderr.write("{individuals} individuals, {families} families, {sources} sources\n".format(**counts))
+
+
+if __name__ == '__main__':
+    main()
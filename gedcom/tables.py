@@ -0,0 +1,146 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+from .event import event_tags, date_year
+from .records import iter_records, first_child, first_value, name_of
+
+# Columns and numpy types of every table. Record keys are integers, the 1
+# based position of the record, and 0 where there is no record. Missing
+# years are NaN.
+table_types = {
+    'individuals': [('key', 'i8'), ('xref', 'O'), ('given', 'O'), ('surname', 'O'), ('sex', 'O'),
+                    ('birth_year', 'f8'), ('death_year', 'f8')],
+    'families': [('key', 'i8'), ('xref', 'O'), ('husband', 'i8'), ('wife', 'i8'),
+                 ('marriage_year', 'f8'), ('children', 'i8')],
+    'children': [('family', 'i8'), ('child', 'i8'), ('position', 'i8')],
+    'events': [('record', 'i8'), ('tag', 'O'), ('date', 'O'), ('year', 'f8'), ('place', 'O')],
+}
+
+_nan = float('nan')
+
+
+def _year(element):
+    if element is None:
+        return _nan
+    year = date_year(first_value(element, 'DATE'))
+    return year if year is not None else _nan
+
+
+def table_columns(source):
+    """
+    Return the individuals, families, family children and events tables as columns of plain lists.
+
+    All tables are filled in one pass over the records. Pointers between
+    records are replaced by record keys, see :py:const:`table_types`.
+
+    :param source: :py:class:`GedcomFile`, iterable of records, or filename/file-like object/string of a GEDCOM file
+    :returns: dict of table name -> dict of column name -> list
+    :rtype: dict
+    """
+    columns = dict((table, dict((name, []) for name, _ in types)) for table, types in table_types.items())
+    individuals = columns['individuals']
+    families = columns['families']
+    children = columns['children']
+    events = columns['events']
+    keys = {}
+    # family columns that hold xrefs until every record has a key
+    unresolved = (families['husband'], families['wife'], children['child'])
+
+    for key, record in enumerate(iter_records(source), 1):
+        if record.id:
+            keys[record.id] = key
+        if record.tag == 'INDI':
+            given, surname = name_of(record)
+            individuals['key'].append(key)
+            individuals['xref'].append(record.id)
+            individuals['given'].append(given)
+            individuals['surname'].append(surname)
+            individuals['sex'].append(first_value(record, 'SEX'))
+            individuals['birth_year'].append(_year(first_child(record, 'BIRT')))
+            individuals['death_year'].append(_year(first_child(record, 'DEAT')))
+        elif record.tag == 'FAM':
+            families['key'].append(key)
+            families['xref'].append(record.id)
+            families['husband'].append(first_value(record, 'HUSB'))
+            families['wife'].append(first_value(record, 'WIFE'))
+            families['marriage_year'].append(_year(first_child(record, 'MARR')))
+            count = 0
+            for child in record.child_elements:
+                if child.tag == 'CHIL':
+                    children['family'].append(key)
+                    children['child'].append(child.value)
+                    children['position'].append(count)
+                    count += 1
+            families['children'].append(count)
+        else:
+            continue
+
+        for element in record.child_elements:
+            if element.tag in event_tags:
+                date = first_value(element, 'DATE')
+                year = date_year(date)
+                events['record'].append(key)
+                events['tag'].append(element.tag)
+                events['date'].append(date)
+                events['year'].append(year if year is not None else _nan)
+                events['place'].append(first_value(element, 'PLAC'))
+
+    for column in unresolved:
+        column[:] = [keys.get(xref, 0) if xref else 0 for xref in column]
+    return columns
+
+
+def to_arrays(source):
+    """
+    Return the tables of :py:func:`table_columns` as NumPy structured arrays.
+
+    :param source: see :py:func:`table_columns`
+    :returns: dict of table name -> numpy.ndarray
+    :rtype: dict
+    :raises ImportError: if numpy isn't installed
+    """
+    if numpy is None:
+        raise ImportError("numpy is needed for to_arrays")
+    arrays = {}
+    for table, columns in table_columns(source).items():
+        types = table_types[table]
+        array = numpy.empty(len(columns[types[0][0]]), dtype=types)
+        for name, _ in types:
+            array[name] = columns[name]
+        arrays[table] = array
+    return arrays
+
+
+def to_dataframes(source):
+    """
+    Return the tables of :py:func:`table_columns` as pandas DataFrames.
+
+    :param source: see :py:func:`table_columns`
+    :returns: dict of table name -> pandas.DataFrame
+    :rtype: dict
+    :raises ImportError: if pandas isn't installed
+    """
+    if pandas is None:
+        raise ImportError("pandas is needed for to_dataframes")
+    return dict((table, pandas.DataFrame(columns, columns=[name for name, _ in table_types[table]]))
+                for table, columns in table_columns(source).items())
+
+
+def to_tables(source):
+    """
+    Return the tables as pandas DataFrames if pandas is installed, otherwise as NumPy structured arrays.
+
+    :param source: see :py:func:`table_columns`
+    :rtype: dict
+    :raises ImportError: if neither is installed
+    """
+    if pandas is not None:
+        return to_dataframes(source)
+    return to_arrays(source)
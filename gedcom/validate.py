@@ -0,0 +1,724 @@
+import os
+import re
+import six
+from concurrent.futures import ProcessPoolExecutor
+
+from .gedcomfile import line_format, split_file, _range_lines
+from .ids import pointer_format
+
+# The GEDCOM 5.5.1 lineage-linked grammar. Each structure is a name followed
+# by one indented line per child tag: "TAG min:max [STRUCTURE] [value]".
+# "M" is no maximum, "-" is a structure without children, and the value is
+# one of the keys of value_formats (any text if left out). "+STRUCTURE"
+# includes all the children of another structure. Tags starting with "_"
+# are user defined and allowed anywhere.
+grammar = """
+FILE
+    HEAD 1:1 HEADER none
+    SUBM 0:M SUBMITTER_RECORD none
+    SUBN 0:1 SUBMISSION_RECORD none
+    FAM 0:M FAM_RECORD none
+    INDI 0:M INDIVIDUAL_RECORD none
+    OBJE 0:M MULTIMEDIA_RECORD none
+    NOTE 0:M NOTE_RECORD
+    REPO 0:M REPOSITORY_RECORD none
+    SOUR 0:M SOURCE_RECORD none
+    TRLR 1:1 - none
+
+TEXT
+    CONT 0:M -
+    CONC 0:M -
+
+HEADER
+    SOUR 1:1 HEADER_SOURCE
+    DEST 0:1 -
+    DATE 0:1 DATE_TIME date
+    SUBM 0:1 - pointer
+    SUBN 0:1 - pointer
+    FILE 0:1 -
+    COPR 0:1 TEXT
+    GEDC 1:1 GEDC none
+    CHAR 1:1 CHAR
+    LANG 0:1 -
+    PLAC 0:1 PLAC_FORM none
+    NOTE 0:1 TEXT
+
+HEADER_SOURCE
+    VERS 0:1 -
+    NAME 0:1 -
+    CORP 0:1 CORPORATION
+    DATA 0:1 HEADER_SOURCE_DATA
+
+CORPORATION
+    +ADDRESS
+
+HEADER_SOURCE_DATA
+    DATE 0:1 - date
+    COPR 0:1 TEXT
+
+DATE_TIME
+    TIME 0:1 -
+
+GEDC
+    VERS 1:1 -
+    FORM 1:1 -
+
+CHAR
+    VERS 0:1 -
+
+PLAC_FORM
+    FORM 1:1 -
+
+ADDRESS
+    ADDR 0:1 ADDRESS_LINES
+    PHON 0:3 -
+    EMAIL 0:3 -
+    FAX 0:3 -
+    WWW 0:3 -
+
+ADDRESS_LINES
+    CONT 0:M -
+    ADR1 0:1 -
+    ADR2 0:1 -
+    ADR3 0:1 -
+    CITY 0:1 -
+    STAE 0:1 -
+    POST 0:1 -
+    CTRY 0:1 -
+
+CHANGE_DATE
+    DATE 1:1 DATE_TIME date
+    NOTE 0:M NOTE_STRUCTURE
+
+RECORD_COMMON
+    REFN 0:M REFN
+    RIN 0:1 -
+    CHAN 0:1 CHANGE_DATE none
+    NOTE 0:M NOTE_STRUCTURE
+
+REFN
+    TYPE 0:1 -
+
+NOTE_STRUCTURE
+    +TEXT
+    SOUR 0:M SOURCE_CITATION
+
+NOTE_RECORD
+    +TEXT
+    REFN 0:M REFN
+    RIN 0:1 -
+    SOUR 0:M SOURCE_CITATION
+    CHAN 0:1 CHANGE_DATE none
+
+SOURCE_CITATION
+    +TEXT
+    PAGE 0:1 -
+    EVEN 0:1 CITATION_EVENT
+    DATA 0:1 CITATION_DATA none
+    QUAY 0:1 - quality
+    OBJE 0:M MULTIMEDIA_LINK
+    NOTE 0:M NOTE_STRUCTURE
+    TEXT 0:M TEXT
+
+CITATION_EVENT
+    ROLE 0:1 -
+
+CITATION_DATA
+    DATE 0:1 - date
+    TEXT 0:M TEXT
+
+MULTIMEDIA_LINK
+    FILE 0:M MULTIMEDIA_FILE
+    TITL 0:1 -
+    FORM 0:1 -
+
+MULTIMEDIA_FILE
+    FORM 0:1 MULTIMEDIA_FORMAT
+    TITL 0:1 -
+
+MULTIMEDIA_FORMAT
+    TYPE 0:1 -
+    MEDI 0:1 -
+
+MULTIMEDIA_RECORD
+    FILE 1:M MULTIMEDIA_FILE
+    SOUR 0:M SOURCE_CITATION
+    +RECORD_COMMON
+
+PLACE
+    FORM 0:1 -
+    FONE 0:M PLACE_VARIATION
+    ROMN 0:M PLACE_VARIATION
+    MAP 0:1 MAP none
+    NOTE 0:M NOTE_STRUCTURE
+
+PLACE_VARIATION
+    TYPE 1:1 -
+
+MAP
+    LATI 1:1 -
+    LONG 1:1 -
+
+EVENT_DETAIL
+    TYPE 0:1 -
+    DATE 0:1 - date
+    PLAC 0:1 PLACE
+    +ADDRESS
+    AGNC 0:1 -
+    RELI 0:1 -
+    CAUS 0:1 -
+    RESN 0:1 -
+    NOTE 0:M NOTE_STRUCTURE
+    SOUR 0:M SOURCE_CITATION
+    OBJE 0:M MULTIMEDIA_LINK
+
+INDIVIDUAL_EVENT
+    +EVENT_DETAIL
+    AGE 0:1 -
+
+CHILD_EVENT
+    +INDIVIDUAL_EVENT
+    FAMC 0:1 ADOPTION pointer
+
+ADOPTION
+    ADOP 0:1 -
+
+FAMILY_EVENT
+    +EVENT_DETAIL
+    HUSB 0:1 SPOUSE_AGE none
+    WIFE 0:1 SPOUSE_AGE none
+
+SPOUSE_AGE
+    AGE 1:1 -
+
+LDS_ORDINANCE
+    DATE 0:1 - date
+    TEMP 0:1 -
+    PLAC 0:1 -
+    STAT 0:1 DATE_STATUS
+    NOTE 0:M NOTE_STRUCTURE
+    SOUR 0:M SOURCE_CITATION
+
+DATE_STATUS
+    DATE 1:1 - date
+
+SEALING_CHILD
+    +LDS_ORDINANCE
+    FAMC 1:1 - pointer
+
+PERSONAL_NAME
+    NPFX 0:1 -
+    GIVN 0:1 -
+    NICK 0:1 -
+    SPFX 0:1 -
+    SURN 0:1 -
+    NSFX 0:1 -
+    TYPE 0:1 -
+    FONE 0:M NAME_VARIATION
+    ROMN 0:M NAME_VARIATION
+    NOTE 0:M NOTE_STRUCTURE
+    SOUR 0:M SOURCE_CITATION
+
+NAME_VARIATION
+    TYPE 1:1 -
+    NPFX 0:1 -
+    GIVN 0:1 -
+    NICK 0:1 -
+    SPFX 0:1 -
+    SURN 0:1 -
+    NSFX 0:1 -
+
+CHILD_TO_FAMILY
+    PEDI 0:1 -
+    STAT 0:1 -
+    NOTE 0:M NOTE_STRUCTURE
+
+SPOUSE_TO_FAMILY
+    NOTE 0:M NOTE_STRUCTURE
+
+ASSOCIATION
+    RELA 1:1 -
+    SOUR 0:M SOURCE_CITATION
+    NOTE 0:M NOTE_STRUCTURE
+
+INDIVIDUAL_RECORD
+    RESN 0:1 -
+    NAME 0:M PERSONAL_NAME
+    SEX 0:1 - sex
+    BIRT 0:M CHILD_EVENT
+    CHR 0:M CHILD_EVENT
+    ADOP 0:M CHILD_EVENT
+    DEAT 0:M INDIVIDUAL_EVENT
+    BURI 0:M INDIVIDUAL_EVENT
+    CREM 0:M INDIVIDUAL_EVENT
+    BAPM 0:M INDIVIDUAL_EVENT
+    BARM 0:M INDIVIDUAL_EVENT
+    BASM 0:M INDIVIDUAL_EVENT
+    BLES 0:M INDIVIDUAL_EVENT
+    CHRA 0:M INDIVIDUAL_EVENT
+    CONF 0:M INDIVIDUAL_EVENT
+    FCOM 0:M INDIVIDUAL_EVENT
+    ORDN 0:M INDIVIDUAL_EVENT
+    NATU 0:M INDIVIDUAL_EVENT
+    EMIG 0:M INDIVIDUAL_EVENT
+    IMMI 0:M INDIVIDUAL_EVENT
+    CENS 0:M INDIVIDUAL_EVENT
+    PROB 0:M INDIVIDUAL_EVENT
+    WILL 0:M INDIVIDUAL_EVENT
+    GRAD 0:M INDIVIDUAL_EVENT
+    RETI 0:M INDIVIDUAL_EVENT
+    EVEN 0:M INDIVIDUAL_EVENT
+    CAST 0:M INDIVIDUAL_EVENT
+    DSCR 0:M INDIVIDUAL_EVENT
+    EDUC 0:M INDIVIDUAL_EVENT
+    IDNO 0:M INDIVIDUAL_EVENT
+    NATI 0:M INDIVIDUAL_EVENT
+    NCHI 0:M INDIVIDUAL_EVENT
+    NMR 0:M INDIVIDUAL_EVENT
+    OCCU 0:M INDIVIDUAL_EVENT
+    PROP 0:M INDIVIDUAL_EVENT
+    RELI 0:M INDIVIDUAL_EVENT
+    RESI 0:M INDIVIDUAL_EVENT
+    SSN 0:M INDIVIDUAL_EVENT
+    TITL 0:M INDIVIDUAL_EVENT
+    FACT 0:M INDIVIDUAL_EVENT
+    BAPL 0:M LDS_ORDINANCE
+    CONL 0:M LDS_ORDINANCE
+    ENDL 0:M LDS_ORDINANCE
+    SLGC 0:M SEALING_CHILD
+    FAMC 0:M CHILD_TO_FAMILY pointer
+    FAMS 0:M SPOUSE_TO_FAMILY pointer
+    SUBM 0:M - pointer
+    ASSO 0:M ASSOCIATION pointer
+    ALIA 0:M - pointer
+    ANCI 0:M - pointer
+    DESI 0:M - pointer
+    RFN 0:1 -
+    AFN 0:1 -
+    SOUR 0:M SOURCE_CITATION
+    OBJE 0:M MULTIMEDIA_LINK
+    +RECORD_COMMON
+
+FAM_RECORD
+    RESN 0:1 -
+    ANUL 0:M FAMILY_EVENT
+    CENS 0:M FAMILY_EVENT
+    DIV 0:M FAMILY_EVENT
+    DIVF 0:M FAMILY_EVENT
+    ENGA 0:M FAMILY_EVENT
+    MARB 0:M FAMILY_EVENT
+    MARC 0:M FAMILY_EVENT
+    MARR 0:M FAMILY_EVENT
+    MARL 0:M FAMILY_EVENT
+    MARS 0:M FAMILY_EVENT
+    RESI 0:M FAMILY_EVENT
+    EVEN 0:M FAMILY_EVENT
+    HUSB 0:1 - pointer
+    WIFE 0:1 - pointer
+    CHIL 0:M - pointer
+    NCHI 0:1 -
+    SUBM 0:M - pointer
+    SLGS 0:M LDS_ORDINANCE
+    SOUR 0:M SOURCE_CITATION
+    OBJE 0:M MULTIMEDIA_LINK
+    +RECORD_COMMON
+
+REPOSITORY_RECORD
+    NAME 1:1 -
+    +ADDRESS
+    +RECORD_COMMON
+
+REPOSITORY_CITATION
+    NOTE 0:M NOTE_STRUCTURE
+    CALN 0:M CALL_NUMBER
+
+CALL_NUMBER
+    MEDI 0:1 -
+
+SOURCE_RECORD
+    DATA 0:1 SOURCE_DATA none
+    AUTH 0:1 TEXT
+    TITL 0:1 TEXT
+    ABBR 0:1 -
+    PUBL 0:1 TEXT
+    TEXT 0:1 TEXT
+    REPO 0:M REPOSITORY_CITATION pointer
+    OBJE 0:M MULTIMEDIA_LINK
+    +RECORD_COMMON
+
+SOURCE_DATA
+    EVEN 0:M SOURCE_DATA_EVENT
+    AGNC 0:1 -
+    NOTE 0:M NOTE_STRUCTURE
+
+SOURCE_DATA_EVENT
+    DATE 0:1 - date
+    PLAC 0:1 -
+
+SUBMITTER_RECORD
+    NAME 1:1 -
+    +ADDRESS
+    OBJE 0:M MULTIMEDIA_LINK
+    LANG 0:3 -
+    RFN 0:1 -
+    RIN 0:1 -
+    NOTE 0:M NOTE_STRUCTURE
+    CHAN 0:1 CHANGE_DATE none
+
+SUBMISSION_RECORD
+    SUBM 0:1 - pointer
+    FAMF 0:1 -
+    TEMP 0:1 -
+    ANCE 0:1 -
+    DESC 0:1 -
+    ORDI 0:1 -
+    RIN 0:1 -
+    NOTE 0:M NOTE_STRUCTURE
+    CHAN 0:1 CHANGE_DATE none
+"""
+
+_date = r"(?:@#D[A-Z ]+@ )?(?:(?:\d{1,2} )?(?:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC) )?\d{1,4}(?:/\d{2})?(?: B\.C\.)?"
+
+# Checks for the values of lines, by the name used in the grammar
+value_formats = {
+    'none': re.compile(r"^$"),
+    'pointer': pointer_format,
+    'sex': re.compile(r"^[MFU]$"),
+    'quality': re.compile(r"^[0-3]$"),
+    'date': re.compile(r"^(?:(?:(?:ABT|CAL|EST|BEF|AFT|FROM|TO|INT) )?{d}(?: TO {d})?(?: \(.*\))?|BET {d} AND {d}|\(.*\))$".format(d=_date),
+                       re.IGNORECASE),
+}
+
+# Longest line allowed by the standard, in characters
+max_line_length = 255
+
+# Records that must (not) have an xref
+records_without_xref = frozenset(['HEAD', 'TRLR'])
+
+
+def compile_grammar(text):
+    """
+    Compile a grammar like :py:const:`grammar` into a lookup table.
+
+    :param str text: grammar
+    :returns: dict of structure name -> dict of tag -> (min, max, child rules, required children, value regex),
+              max being None for no maximum, and required children a list of (tag, min)
+    :rtype: dict
+    """
+    lines = {}
+    name = None
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if not line[0].isspace():
+            name = line.strip()
+            lines[name] = []
+        else:
+            lines[name].append(line.split())
+
+    table = {'-': {}}
+
+    def build(name, seen=()):
+        rules = {}
+        for parts in lines[name]:
+            if parts[0].startswith("+"):
+                rules.update(build(parts[0][1:], seen + (name,)))
+                continue
+            tag, cardinality = parts[0], parts[1]
+            minimum, maximum = cardinality.split(":")
+            structure = parts[2] if len(parts) > 2 else '-'
+            if structure not in lines and structure != '-':
+                raise ValueError("Unknown structure {0} in {1}".format(structure, name))
+            value = value_formats[parts[3]] if len(parts) > 3 else None
+            rules[tag] = (int(minimum), None if maximum == 'M' else int(maximum), structure, value)
+        return rules
+
+    for name in lines:
+        table[name] = build(name)
+    required = dict((name, [(tag, rule[0]) for tag, rule in sorted(rules.items()) if rule[0]])
+                    for name, rules in table.items())
+    # point at the rule dicts themselves, so checking doesn't need to look them up by name
+    for rules in table.values():
+        for tag, (minimum, maximum, structure, value) in list(rules.items()):
+            rules[tag] = (minimum, maximum, table[structure], required[structure], value)
+    return table
+
+
+_table = None
+
+
+def grammar_table():
+    """Return the compiled :py:const:`grammar`, compiling it the first time."""
+    global _table
+    if _table is None:
+        _table = compile_grammar(grammar)
+    return _table
+
+
+class Problem(object):
+    """Something wrong on a line of a GEDCOM file."""
+
+    def __init__(self, linenum, message):
+        """
+        Create a problem.
+
+        :param int linenum: line number (1 based) of the line in the file
+        :param str message: what's wrong
+        """
+        self.linenum = linenum
+        self.message = message
+
+    def __repr__(self):
+        """Short summary, for debugging purposes."""
+        return "Problem({0!r}, {1!r})".format(self.linenum, self.message)
+
+    def __str__(self):
+        """Return the problem as ``line <number>: <message>``."""
+        return "line {0}: {1}".format(self.linenum, self.message)
+
+    def __eq__(self, other):
+        """Return True if `other` is a problem with the same line number and message."""
+        return isinstance(other, Problem) and (self.linenum, self.message) == (other.linenum, other.message)
+
+    def __ne__(self, other):
+        """Return True if `other` isn't the same problem."""
+        return not self == other
+
+
+class Validator(object):
+    """
+    Checks GEDCOM lines against the grammar, one line at a time.
+
+    Only the path from the current line up to its record is kept, so
+    memory use doesn't depend on the size of the file. Pointers aren't
+    checked against the records they point to, see :py:meth:`GedcomFile.link`
+    for that.
+    """
+
+    def __init__(self, table=None, start_of_file=True, end_of_file=True, offset=0, trailer=None):
+        """
+        Create a validator.
+
+        :param dict table: *optional* compiled grammar, defaults to :py:func:`grammar_table`
+        :param bool start_of_file: the lines start at the start of the file, so the first record must be the HEAD
+        :param bool end_of_file: the lines go on to the end of the file, so the number of HEAD's, TRLR's etc. can be checked
+        :param int offset: *optional* number of lines in the file before the first line fed
+        :param int trailer: *optional* line number of a TRLR before the first line fed
+        """
+        self.table = table or grammar_table()
+        self.start_of_file = start_of_file
+        self.whole_file = start_of_file and end_of_file
+        file_rules = self.table['FILE']
+        required = [(tag, rule[0]) for tag, rule in sorted(file_rules.items()) if rule[0]] if self.whole_file else []
+        # (tag, rules for the children, required children, tag -> count of children, line number)
+        # for the current line and its parents
+        self.stack = [('', file_rules, required, {}, 0)]
+        self.problems = []
+        self.lines = offset
+        self.records = 0
+        self.trailer = trailer
+        # tag -> line numbers of the first records with that tag, up to one more than are allowed
+        self.record_lines = {}
+
+    def feed(self, line):
+        """
+        Check the next line.
+
+        :param str line: line of the file, with or without the line ending
+        :returns: number of problems found so far
+        :rtype: int
+        """
+        self.lines += 1
+        linenum = self.lines
+        problems = self.problems
+        line = line.rstrip("\r\n")
+        if linenum == 1:
+            line = line.lstrip("\ufeff")
+        if not line.strip():
+            return len(problems)
+        if len(line) > max_line_length:
+            problems.append(Problem(linenum, "Line is longer than {0} characters".format(max_line_length)))
+        match = line_format.match(line.strip())
+        if match is None:
+            problems.append(Problem(linenum, "Not a GEDCOM line"))
+            return len(problems)
+
+        level, pointer, tag, value = match.group('level', 'id', 'tag', 'value')
+        level = int(level)
+        stack = self.stack
+        if level >= len(stack):
+            problems.append(Problem(linenum, "Level {0} {1} is more than one below its parent".format(level, tag)))
+            return len(problems)
+        while len(stack) > level + 1:
+            self._close(stack.pop())
+
+        parent_tag, rules, _, counts, _ = stack[-1]
+        if level == 0:
+            if self.trailer is not None:
+                problems.append(Problem(linenum, "{0} after TRLR on line {1}".format(tag, self.trailer)))
+            if tag == 'TRLR':
+                self.trailer = linenum
+            if tag == 'HEAD' and (self.records > 0 or not self.start_of_file):
+                problems.append(Problem(linenum, "HEAD is not the first record"))
+            elif tag != 'HEAD' and self.records == 0 and self.start_of_file:
+                problems.append(Problem(linenum, "File does not start with HEAD"))
+            self.records += 1
+            if (tag in records_without_xref) == bool(pointer) and tag in rules:
+                problems.append(Problem(linenum, "{0} record {1} an xref".format(
+                    tag, "cannot have" if pointer else "must have")))
+
+        if rules is None or tag.startswith("_"):
+            # inside a user defined or unknown structure
+            stack.append((tag, None, None, None, linenum))
+            return len(problems)
+
+        rule = rules.get(tag)
+        if rule is None:
+            problems.append(Problem(linenum, "{0} is not allowed in {1}".format(tag, parent_tag or "a file")))
+            stack.append((tag, None, None, None, linenum))
+            return len(problems)
+
+        minimum, maximum, child_rules, required, value_format = rule
+        count = counts[tag] = counts.get(tag, 0) + 1
+        if level == 0 and maximum is not None and count <= maximum + 1:
+            self.record_lines.setdefault(tag, []).append(linenum)
+        if maximum is not None and count == maximum + 1 and (level > 0 or self.whole_file):
+            problems.append(Problem(linenum, "More than {0} {1} in {2}".format(maximum, tag, parent_tag or "a file")))
+        if value_format is not None and not value_format.match(value or ''):
+            problems.append(Problem(linenum, "Invalid value {0!r} for {1}".format(value, tag)))
+        stack.append((tag, child_rules, required, {}, linenum))
+        return len(problems)
+
+    def _close(self, frame):
+        """Check that a structure that has ended has all its required children."""
+        tag, rules, required, counts, linenum = frame
+        if required:
+            for child_tag, minimum in required:
+                if counts.get(child_tag, 0) < minimum:
+                    self.problems.append(Problem(linenum, "{0} is missing {1}".format(tag or "File", child_tag)))
+
+    def close(self, finished=True):
+        """
+        Finish checking, once all lines have been fed.
+
+        :param bool finished: all the lines were fed, unset if checking was stopped early
+        :returns: all the problems found, in line order
+        :rtype: list of :py:class:`Problem`
+        """
+        while len(self.stack) > 1:
+            self._close(self.stack.pop())
+        if finished:
+            self._close(self.stack[0])
+        self.problems.sort(key=lambda problem: problem.linenum)
+        return self.problems
+
+
+def _lines(obj):
+    """Lines of a filename, string of contents, file-like object or other iterable of lines."""
+    if isinstance(obj, six.string_types):
+        # Sanity check, presumes anything > 1KB could not be a filename
+        if len(obj) <= 1024 and os.path.exists(obj):
+            with open(obj, 'r', encoding='utf-8') as fp:
+                yield from fp
+        else:
+            yield from obj.split("\n")
+    else:
+        for line in obj:
+            yield line.decode('utf-8') if isinstance(line, bytes) else line
+
+
+def validate(obj, max_problems=None):
+    """
+    Check a GEDCOM file against the 5.5.1 grammar, reading it a line at a time.
+
+    :param obj: filename, string contents, open file-like object, or iterable of lines (e.g. :py:meth:`GedcomFile.gedcom_lines`)
+    :param int max_problems: *optional* stop reading after finding this many problems
+    :returns: the problems found, an empty list if the file is valid
+    :rtype: list of :py:class:`Problem`
+    """
+    validator = Validator()
+    finished = True
+    for line in _lines(obj):
+        if validator.feed(line) >= (max_problems or float('inf')):
+            finished = False
+            break
+    return validator.close(finished)[:max_problems]
+
+
+def _validate_range(args):
+    filename, start, end, max_problems, offset, trailer = args
+    validator = Validator(start_of_file=(start == 0), end_of_file=False, offset=offset, trailer=trailer)
+    finished = True
+    with open(filename, "rb") as fp:
+        for line in _range_lines(fp, start, end):
+            if validator.feed(line) >= (max_problems or float('inf')):
+                finished = False
+                break
+    problems = validator.close(finished)
+    root_counts = validator.stack[0][3]
+    return problems, validator.lines - offset, finished, root_counts, validator.record_lines, validator.trailer
+
+
+def validate_parallel(filename, processes=None, max_problems=None):
+    """
+    Check a GEDCOM file like :py:func:`validate`, with a part of the file checked in each process.
+
+    :param str filename: GEDCOM file
+    :param int processes: *optional* number of processes, defaults to the number of CPUs
+    :param int max_problems: *optional* number of problems after which each process stops, then the parts after it and the checks on the whole file are skipped
+    :returns: the problems found, in line order
+    :rtype: list of :py:class:`Problem`
+    """
+    processes = processes or os.cpu_count() or 1
+    ranges = split_file(filename, processes)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        tasks = [(filename, start, end, max_problems, 0, None) for start, end in ranges]
+        results = list(executor.map(_validate_range, tasks))
+
+        # the parts after a TRLR are checked again, now that the line they start
+        # on and the TRLR before them are known, so each record is reported
+        offset = 0
+        trailer = None
+        again = {}
+        for i, (part, lines, part_finished, counts, part_record_lines, part_trailer) in enumerate(results):
+            if not part_finished:
+                break
+            if trailer is not None:
+                again[i] = tasks[i] = tasks[i][:4] + (offset, trailer)
+            if part_trailer is not None:
+                trailer = part_trailer + offset
+            offset += lines
+        for i, result in zip(again, executor.map(_validate_range, again.values())):
+            results[i] = result
+
+    problems = []
+    root_counts = {}
+    record_lines = {}
+    offset = 0
+    finished = True
+    for (part, lines, part_finished, counts, part_record_lines, part_trailer), task in zip(results, tasks):
+        if not finished:
+            # the line numbers of the parts after one that stopped early aren't known
+            break
+        # the parts checked again already have the line numbers in the file
+        shift = offset - task[4]
+        for problem in part:
+            problems.append(Problem(problem.linenum + shift, problem.message))
+        for tag, count in counts.items():
+            root_counts[tag] = root_counts.get(tag, 0) + count
+        for tag, linenums in part_record_lines.items():
+            record_lines.setdefault(tag, []).extend(linenum + shift for linenum in linenums)
+        offset += lines
+        finished = part_finished
+
+    # the checks on the whole file that each part can't do alone, unless some of it wasn't read
+    file_rules = grammar_table()['FILE'] if finished else {}
+    for tag, (minimum, maximum, child_rules, required, value_format) in sorted(file_rules.items()):
+        count = root_counts.get(tag, 0)
+        if count < minimum:
+            problems.append(Problem(0, "File is missing {0}".format(tag)))
+        elif maximum is not None and count > maximum:
+            # on the first record too many, like validate()
+            problems.append(Problem(record_lines[tag][maximum], "More than {0} {1} in a file".format(maximum, tag)))
+    problems.sort(key=lambda problem: problem.linenum)
+    return problems[:max_problems] if max_problems else problems
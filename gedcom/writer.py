@@ -0,0 +1,175 @@
+import bisect
+import six
+
+from .element import Element
+from .ids import IdAllocator, record_prefixes, split_id
+from .gedcomfile import check_output, default_header, write_chunk_size
+
+
+def _fields(node):
+    """Return (id, tag, value, children) of an Element, dict or (tag, value[, children]) tuple."""
+    if isinstance(node, Element):
+        return node.id, node.tag, node.value, node.child_elements
+    elif isinstance(node, dict):
+        return node.get('id'), node['tag'], node.get('value'), node.get('children', ())
+    elif len(node) == 2:
+        return None, node[0], node[1], ()
+    elif len(node) == 3:
+        return None, node[0], node[1], node[2]
+    raise TypeError("Cannot write {0!r} as a GEDCOM element".format(node))
+
+
+class GedcomWriter(object):
+    """
+    Writes a GEDCOM file one record at a time, without holding the tree in memory.
+
+    Use it as a context manager. The HEAD is written when it's opened, and
+    TRLR when it's closed, unless that's because of an exception, so an
+    unfinished file doesn't look complete::
+
+        with GedcomWriter("out.ged") as writer:
+            writer.write(('INDI', None, [('NAME', 'Bob /Cox/'), ('SEX', 'M')]))
+
+    Records can be :py:class:`Element`'s, dicts with `tag`, `id`, `value` and
+    `children` keys, or ``(tag, value)``/``(tag, value, children)`` tuples,
+    nested the same way. Records without an id get one assigned, like
+    :py:meth:`GedcomFile.add_element`, above the highest number used so far,
+    so they never clash with the ids written before. A record with an
+    explicit id that has already been written is rejected; for that the
+    explicit ids are kept, so memory grows with the number of records that
+    come with their own id, but not with the ones that are given one.
+    """
+
+    def __init__(self, fileout, overwrite=False, header=None, chunk_size=None):
+        """
+        Create a writer.
+
+        :param fileout: Filename or open binary file-like object to write to.
+        :param bool overwrite: overwrite `fileout` if it's a filename that exists
+        :param header: *optional* HEAD record to write, defaults to the one :py:meth:`GedcomFile.ensure_header_trailer` adds
+        :param int chunk_size: number of lines buffered before they are written out
+        :raises FileExistsError: if the filename exists and `overwrite` isn't set
+        """
+        if isinstance(fileout, six.string_types):
+            check_output(fileout, overwrite)
+            self.filename = fileout
+            self.fileout = None
+        else:
+            self.filename = None
+            self.fileout = fileout
+        self.header = header
+        self.chunk_size = chunk_size or write_chunk_size
+        self.ids = IdAllocator()
+        self.records_written = 0
+        # ids of the records that came with one
+        self._explicit_ids = set()
+        # prefix -> [first, last] runs of the numbers handed out, in order
+        self._allocated = {}
+        self.closed = False
+        self._buffer = []
+
+    def __enter__(self):
+        """Open the file and write the HEAD record."""
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Write TRLR (unless there was an exception) and close the file."""
+        self.close(finished=exc_type is None)
+
+    def open(self):
+        """Open the file (if given a filename) and write the HEAD record."""
+        if self.fileout is None:
+            self.fileout = open(self.filename, "wb")
+        self._write_node(*_fields(self.header if self.header is not None else default_header()))
+        return self
+
+    def write(self, record):
+        """
+        Write one level 0 record.
+
+        :param record: :py:class:`Element`, dict or tuple
+        :returns: id/pointer of the record, which is assigned if it didn't have one
+        :rtype: str
+        :raises ValueError: if the record has an id that has already been written
+        """
+        pointer, tag, value, children = _fields(record)
+        if pointer is None:
+            if tag not in record_prefixes:
+                raise TypeError("Cannot assign an id to a {0} record".format(tag))
+            prefix = record_prefixes[tag]
+            pointer = self.ids.allocate(prefix)
+            self._add_allocated(prefix, self.ids.counters[prefix])
+            if isinstance(record, Element):
+                record.id = pointer
+        elif pointer in self._explicit_ids or self._was_allocated(pointer):
+            raise ValueError("A record with id {0} has already been written".format(pointer))
+        else:
+            self._explicit_ids.add(pointer)
+            self.ids.seen(pointer)
+        self._write_node(pointer, tag, value, children)
+        self.records_written += 1
+        return pointer
+
+    def write_records(self, records):
+        """
+        Write all these records.
+
+        :param records: iterable of records, see :py:meth:`write`
+        :returns: list of the ids of the records
+        :rtype: list
+        """
+        return [self.write(record) for record in records]
+
+    def _add_allocated(self, prefix, number):
+        runs = self._allocated.setdefault(prefix, [])
+        if runs and runs[-1][1] == number - 1:
+            runs[-1][1] = number
+        else:
+            runs.append([number, number])
+
+    def _was_allocated(self, pointer):
+        """Return True if `pointer` is one of the ids handed out by :py:meth:`write`."""
+        prefix, number = split_id(pointer)
+        runs = self._allocated.get(prefix)
+        if not runs or number is None or pointer != "@{0}{1}@".format(prefix, number):
+            return False
+        index = bisect.bisect_right(runs, [number, float('inf')]) - 1
+        return index >= 0 and runs[index][0] <= number <= runs[index][1]
+
+    def _write_node(self, pointer, tag, value, children):
+        buffer = self._buffer
+        append = buffer.append
+        append("0" + (" " + pointer if pointer else "") + " " + tag + (" " + value if value else ""))
+        stack = [(child, 1) for child in reversed(children)]
+        while stack:
+            node, level = stack.pop()
+            pointer, tag, value, children = _fields(node)
+            append(str(level) + (" " + pointer if pointer else "") + " " + tag + (" " + value if value else ""))
+            if children:
+                stack.extend((child, level + 1) for child in reversed(children))
+        if len(buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write out all buffered lines."""
+        if self._buffer:
+            self._buffer.append('')
+            self.fileout.write("\n".join(self._buffer).encode("utf8"))
+            del self._buffer[:]
+        if hasattr(self.fileout, 'flush'):
+            self.fileout.flush()
+
+    def close(self, finished=True):
+        """
+        Write the TRLR, flush, and close the file if this writer opened it.
+
+        :param bool finished: *optional* unset to leave out the TRLR, e.g. because writing failed part of the way through
+        """
+        if self.closed:
+            return
+        if finished:
+            self._buffer.append("0 TRLR")
+        self.flush()
+        if self.filename is not None:
+            self.fileout.close()
+        self.closed = True
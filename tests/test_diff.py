@@ -0,0 +1,47 @@
+import unittest
+import gedcom
+from gedcom.diff import diff, element_changes, record_hash
+from test_gedcom import GEDCOM_FILE
+
+
+class DiffTestCase(unittest.TestCase):
+
+    def testSame(self):
+        # Reordering records isn't a change
+        old = gedcom.parse_string(GEDCOM_FILE)
+        new = gedcom.parse_string(GEDCOM_FILE)
+        new.root_elements[1], new.root_elements[3] = new.root_elements[3], new.root_elements[1]
+        self.assertFalse(diff(old, new))
+        self.assertEqual(record_hash(old['@I1@']), record_hash(new['@I1@']))
+
+    def testDiff(self):
+        old = gedcom.parse_string(GEDCOM_FILE)
+        new = gedcom.parse_string(GEDCOM_FILE)
+        new.root_elements.remove(new['@I2@'])
+        new['@I1@']['NAME'][0].value = 'Robert /Cocks/'
+        new['@I1@'].add_child_element(new.element('OCCU', value='Farmer'))
+        new['@I1@'].child_elements.remove(new['@I1@']['SEX'])
+        new.individual()
+
+        result = diff(old, new)
+        self.assertEqual([r.id for r in result.added], ['@I4@'])
+        self.assertEqual([r.id for r in result.removed], ['@I2@'])
+        self.assertEqual([c.key for c in result.changed], ['@I1@'])
+        changes = [(c.kind, c.path) for c in result.changed[0].changes]
+        self.assertEqual(changes, [('removed', (('SEX', 0),)), ('added', (('OCCU', 0),)), ('changed', (('NAME', 0),))])
+
+        # The same, from the text of the files
+        result = diff(GEDCOM_FILE, new.gedcom_lines_as_string())
+        self.assertEqual([r.id for r in result.removed], ['@I2@'])
+        self.assertEqual(result.changed[0].old.name, ('Robert', 'Cox'))
+
+    def testElementChanges(self):
+        old = gedcom.parse_string(GEDCOM_FILE)['@I1@']
+        new = gedcom.parse_string(GEDCOM_FILE.replace("2 DATE 11 FEB 2006", "2 DATE 12 FEB 2006", 1))['@I1@']
+        change, = element_changes(old, new)
+        self.assertEqual((change.kind, change.path, change.old.value, change.new.value),
+                         ('changed', (('CHAN', 0), ('DATE', 0)), '11 FEB 2006', '12 FEB 2006'))
+
+
+if __name__ == '__main__':
+    unittest.main()
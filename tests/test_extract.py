@@ -0,0 +1,92 @@
+import os
+import unittest
+import gedcom
+import six
+from gedcom import synth
+
+
+class ExtractTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ged = gedcom.parse(os.path.join(os.path.dirname(__file__), "test.ged"))
+
+    def testAncestors(self):
+        excerpt = self.ged.extract([self.ged['@I1@']], depth=2)
+        self.assertEqual([r.id for r in excerpt.root_elements],
+                         [None, '@I1@', '@I4580@', '@I4584@', '@I4587@', '@I4586@', '@F1609@', '@F1611@', '@SUBM@', None])
+        # Records are shared unless a pointer had to be left out
+        self.assertTrue(self.ged['@I1@'] in excerpt.root_elements)
+        self.assertFalse(self.ged['@F1609@'] in excerpt.root_elements)
+
+        self.assertEqual(excerpt.link().dangling, [])
+        self.assertEqual(excerpt['@I1@'].father.id, '@I4580@')
+        family = excerpt['@F1609@']
+        self.assertEqual([c.value for c in family.get_list('CHIL')], ['@I1@'])
+        self.assertEqual(len(self.ged['@F1609@'].get_list('CHIL')), 2)
+
+        # but copied before they are changed, in either file
+        excerpt['@I1@']['NAME'].value = 'X /Y/'
+        self.assertNotEqual(self.ged['@I1@'].name, ('X', 'Y'))
+        self.ged['@I4580@']['SEX'].value = 'F'
+        self.assertEqual(excerpt['@I4580@']['SEX'].value, 'M')
+
+        everyone = self.ged.extract(['@I1@'])
+        self.assertEqual(len(list(everyone.individuals)), 13)
+
+    def testLookups(self):
+        excerpt = self.ged.extract(['@I1@'], depth=1)
+        # relatives are looked up in the excerpt, not in the file it came from
+        mother = excerpt['@I1@'].mother
+        self.assertTrue(mother is excerpt['@I4584@'])
+        self.assertEqual(mother.parents, [])
+        self.assertEqual(len(self.ged['@I4584@'].parents), 2)
+
+    def testDescendants(self):
+        excerpt = self.ged.extract(['@I4580@'], include='descendants', depth=1)
+        self.assertEqual(sorted(i.id for i in excerpt.individuals), ['@I1@', '@I4580@', '@I4584@', '@I4585@'])
+        self.assertTrue(self.ged['@F1609@'] in excerpt.root_elements)
+
+        both = self.ged.extract(['@I4584@'], include='both', depth=1)
+        self.assertEqual(sorted(i.id for i in both.individuals), ['@I1@', '@I4580@', '@I4584@', '@I4585@', '@I4586@', '@I4587@'])
+
+    def testPedigreeCollapse(self):
+        # @E@ marries her uncle @C@, so she is reached as a spouse before she is reached as a child
+        ged = gedcom.parse_string("\n".join([
+            "0 HEAD", "0 @A@ INDI", "1 FAMS @F1@", "0 @C@ INDI", "1 FAMC @F1@", "1 FAMS @F3@",
+            "0 @D@ INDI", "1 FAMC @F1@", "1 FAMS @F2@", "0 @E@ INDI", "1 FAMC @F2@", "1 FAMS @F3@", "1 FAMS @F4@",
+            "0 @G@ INDI", "1 FAMC @F3@", "0 @H@ INDI", "1 FAMS @F4@", "0 @K@ INDI", "1 FAMC @F4@",
+            "0 @F1@ FAM", "1 HUSB @A@", "1 CHIL @C@", "1 CHIL @D@", "0 @F2@ FAM", "1 HUSB @D@", "1 CHIL @E@",
+            "0 @F3@ FAM", "1 HUSB @C@", "1 WIFE @E@", "1 CHIL @G@", "0 @F4@ FAM", "1 HUSB @H@", "1 WIFE @E@", "1 CHIL @K@",
+            "0 TRLR"]))
+        excerpt = ged.extract(['@A@'], include='descendants')
+        self.assertEqual(sorted(i.id for i in excerpt.individuals), ['@A@', '@C@', '@D@', '@E@', '@G@', '@H@', '@K@'])
+        self.assertEqual(sorted(f.id for f in excerpt.families), ['@F1@', '@F2@', '@F3@', '@F4@'])
+
+        # everyone in a made up tree where every marriage that can be is within the family
+        output = six.BytesIO()
+        synth.generate(output, seed=1, individuals=300, founders=2, pedigree_collapse=1)
+        ged = gedcom.parse_string(output.getvalue().decode("utf8"))
+        founder = next(ged.individuals)
+        expected = set([founder.id])
+        descendants = set([founder.id])
+        stack = [founder]
+        while stack:
+            for fams in stack.pop().get_list('FAMS'):
+                family = ged[fams.value]
+                expected.update(member.value for member in family.get_list('HUSB') + family.get_list('WIFE'))
+                for child in family.get_list('CHIL'):
+                    expected.add(child.value)
+                    if child.value not in descendants:
+                        descendants.add(child.value)
+                        stack.append(ged[child.value])
+        excerpt = ged.extract([founder], include='descendants')
+        self.assertEqual(set(i.id for i in excerpt.individuals), expected)
+        self.assertEqual(excerpt.link().dangling, [])
+
+    def testErrors(self):
+        self.assertRaises(ValueError, self.ged.extract, ['@I1@'], include='cousins')
+        self.assertRaises(KeyError, self.ged.extract, ['@I999@'])
+
+
+if __name__ == '__main__':
+    unittest.main()
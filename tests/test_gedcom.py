@@ -1,7 +1,11 @@
+import concurrent.futures
+import sys
 import unittest
 import gedcom
 import six
 import tempfile
+import os
+import shutil
 from os import remove
 
 # Sample GEDCOM file from Wikipedia
@@ -117,8 +121,8 @@ class GedComTestCase(unittest.TestCase):
         self.assertEqual(family.tag, 'FAM')
         self.assertEqual(family.level, 0)
 
-        self.assertEqual(gedcomfile.gedcom_lines_as_string(), v('0 HEAD\n1 SOUR\n2 NAME gedcompy\n2 VERS {version}\n1 CHAR UTF-8\n1 GEDC\n2 VERS 5.5\n2 FORM LINEAGE-LINKED\n0 @I1@ INDI\n1 SEX M\n0 @F2@ FAM\n0 TRLR'))
-        self.assertEqual(repr(gedcomfile), v("GedcomFile(\nElement(0, 'HEAD', [Element(1, 'SOUR', [Name(2, 'NAME', 'gedcompy'), Element(2, 'VERS', '{version}')]), Element(1, 'CHAR', 'UTF-8'), Element(1, 'GEDC', [Element(2, 'VERS', '5.5'), Element(2, 'FORM', 'LINEAGE-LINKED')])]),\nIndividual(0, 'INDI', '@I1@', [Sex(1, 'SEX', 'M')]),\nFamily(0, 'FAM', '@F2@'),\nElement(0, 'TRLR'))"))
+        self.assertEqual(gedcomfile.gedcom_lines_as_string(), v('0 HEAD\n1 SOUR\n2 NAME gedcompy\n2 VERS {version}\n1 CHAR UTF-8\n1 GEDC\n2 VERS 5.5\n2 FORM LINEAGE-LINKED\n0 @I1@ INDI\n1 SEX M\n0 @F1@ FAM\n0 TRLR'))
+        self.assertEqual(repr(gedcomfile), v("GedcomFile(\nElement(0, 'HEAD', [Element(1, 'SOUR', [Name(2, 'NAME', 'gedcompy'), Element(2, 'VERS', '{version}')]), Element(1, 'CHAR', 'UTF-8'), Element(1, 'GEDC', [Element(2, 'VERS', '5.5'), Element(2, 'FORM', 'LINEAGE-LINKED')])]),\nIndividual(0, 'INDI', '@I1@', [Sex(1, 'SEX', 'M')]),\nFamily(0, 'FAM', '@F1@'),\nElement(0, 'TRLR'))"))
 
     def testCanOnlyAddIndividualOrFamilyToFile(self):
         gedcomfile = gedcom.GedcomFile()
@@ -166,6 +170,15 @@ class GedComTestCase(unittest.TestCase):
         gedcomfile.add_element(element1)
         self.assertEqual(element1.id, '@I2@')
 
+    def testIdsArePerPrefix(self):
+        gedcomfile = gedcom.parse_string("0 HEAD\n0 @I41@ INDI\n0 @S7@ SOUR\n0 TRLR")
+        individual, family, source, note = gedcomfile.add_elements([gedcom.Individual(), gedcom.Family(), gedcom.Element(tag="SOUR"), gedcom.Note()])
+        self.assertEqual((individual.id, family.id, source.id, note.id), ('@I42@', '@F1@', '@S8@', '@N1@'))
+        self.assertEqual(gedcomfile.record("REPO").id, '@R1@')
+        self.assertEqual(gedcomfile['@S8@'], source)
+        self.assertEqual([el.tag for el in gedcomfile.root_elements], ['HEAD', 'INDI', 'SOUR', 'INDI', 'FAM', 'SOUR', 'NOTE', 'REPO', 'TRLR'])
+        self.assertRaises(TypeError, gedcomfile.add_elements, [gedcom.Element(tag="TITL")])
+
     def testCanAutoDetectInputFP(self):
         fp = six.StringIO(GEDCOM_FILE)
         parsed = gedcom.parse(fp)
@@ -197,7 +210,7 @@ class GedComTestCase(unittest.TestCase):
         outputfile.seek(0,0)
         
         self.assertEqual(outputfile.read(), GEDCOM_FILE.encode("utf8"))
-        self.assertRaises(Exception, gedcomfile.save, (outputfilename))
+        self.assertRaises(FileExistsError, gedcomfile.save, (outputfilename))
         outputfile.close()
         
         gedcomfile.save(outputfilename)
@@ -212,6 +225,22 @@ class GedComTestCase(unittest.TestCase):
         individual = gedcom.Individual(level='foo')
         self.assertRaises(Exception, individual.set_levels_downward)
 
+    def testLevelsComeFromTree(self):
+        gedcomfile = gedcom.GedcomFile()
+        individual = gedcomfile.individual()
+        birth = gedcomfile.element("BIRT")
+        birth.add_child_element(gedcomfile.element("DATE", value="1980"))
+        self.assertEqual(birth['DATE'].level, None)
+        individual.add_child_element(birth)
+        self.assertEqual((birth.level, birth['DATE'].level), (1, 2))
+        self.assertEqual(gedcomfile.wrong_levels(), [])
+
+        birth['DATE'].level = 7
+        self.assertEqual(gedcomfile.wrong_levels(), [birth['DATE']])
+        self.assertEqual(list(individual.gedcom_lines()), ['0 @I1@ INDI', '1 BIRT', '2 DATE 1980'])
+        gedcomfile.ensure_levels()
+        self.assertEqual(gedcomfile.wrong_levels(), [])
+
     def testNote(self):
         gedcomfile = gedcom.parse_string("0 HEAD\n0 @I1@ INDI\n1 NAME\n2 GIVN Bob\n2 SURN Cox\n1 NOTE foo\n0 TRLR")
         self.assertEqual(list(gedcomfile.individuals)[0].note, 'foo')
@@ -284,9 +313,374 @@ class GedComTestCase(unittest.TestCase):
         gedcomfile = gedcom.parse_string("0 HEAD\n0 @I1@ INDI\n1 NAME Bob /Russel\n0 TRLR")
         self.assertRaises(Exception, lambda : list(gedcomfile.individuals)[0].name)
 
+    def testLink(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE + "0 @I4@ INDI\n1 FAMC @F9@\n0 TRLR")
+        report = gedcomfile.link()
+        self.assertEqual(report.dangling, [gedcomfile['@I4@']['FAMC']])
+        self.assertEqual(report.unused, [gedcomfile['@I4@']])
+        self.assertEqual(report.linked, 6)
+
+        bobby_jo = gedcomfile['@I3@']
+        self.assertTrue(isinstance(bobby_jo['FAMC'].value, gedcom.Pointer))
+        self.assertEqual(bobby_jo['FAMC'].value, '@F1@')
+        self.assertTrue(bobby_jo['FAMC'].value.target is gedcomfile['@F1@'])
+        self.assertEqual(bobby_jo.parents, [gedcomfile['@I1@'], gedcomfile['@I2@']])
+        self.assertFalse(bobby_jo.dirty)
+        self.assertTrue(gedcomfile.gedcom_lines_as_string().startswith(GEDCOM_FILE[:-len("0 TRLR\n")]))
+
+    def testContentHash(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        other = gedcom.parse_string(GEDCOM_FILE)
+        bob = gedcomfile['@I1@']
+        self.assertEqual(bob.content_hash, other['@I1@'].content_hash)
+        self.assertNotEqual(bob.content_hash, gedcomfile['@I2@'].content_hash)
+
+        before = bob.content_hash
+        name = bob['NAME'][0]
+        name_hash = name.content_hash
+        sex_hash = bob['SEX'].content_hash
+        name.value = 'Bob /Cocks/'
+        self.assertNotEqual(name.content_hash, name_hash)
+        self.assertNotEqual(bob.content_hash, before)
+        self.assertEqual(bob['SEX'].content_hash, sex_hash)
+        # a second change to an element that is already dirty
+        bob['SEX'].value = 'F'
+        self.assertNotEqual(bob['SEX'].content_hash, sex_hash)
+        name.value = 'Robert /Cox/'
+        bob['SEX'].value = 'M'
+        self.assertEqual(bob.content_hash, before)
+
+    def testLinkedHash(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        bobby_jo = gedcomfile['@I3@']
+        family, spouses = bobby_jo.linked_hash(depth=1), bobby_jo.linked_hash(depth=2)
+        self.assertNotEqual(family, bobby_jo.content_hash)
+        gedcomfile['@I1@']['SEX'].value = 'F'
+        self.assertEqual(bobby_jo.linked_hash(depth=1), family)
+        self.assertNotEqual(bobby_jo.linked_hash(depth=2), spouses)
+
     def testDashInID(self):
         gedcomfile = gedcom.parse_string("0 HEAD\n0 @I1-123@ INDI\n1 NAME\n2 GIVN Bob\n0 TRLR")
         self.assertEqual(list(gedcomfile.individuals)[0].name, ('Bob', None))
 
+
+class BatchTestCase(unittest.TestCase):
+
+    def testBatch(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        bob = gedcomfile['@I1@']
+        before = bob.content_hash
+        with gedcomfile.batch():
+            person = gedcomfile.individual()
+            note = gedcomfile.element("NOTE", value="checked")
+            bob.add_child_element(note)
+            note.add_child_element(gedcomfile.element("CONT", value="twice"))
+            bob['SEX'].value = 'F'
+            # added records can be looked up, but the rest waits for the end
+            self.assertTrue(gedcomfile[person.id] is person)
+            self.assertFalse(person in gedcomfile.root_elements)
+            self.assertFalse(bob.dirty)
+            self.assertEqual(note.level, None)
+
+        self.assertEqual(gedcomfile.root_elements[-2], person)
+        self.assertEqual(gedcomfile.root_elements[-1].tag, 'TRLR')
+        self.assertTrue(bob.dirty and note.dirty)
+        self.assertEqual((note.level, note['CONT'].level), (1, 2))
+        self.assertNotEqual(bob.content_hash, before)
+        self.assertEqual(gedcomfile.wrong_levels(), [])
+
+    def testRollback(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        bob = gedcomfile['@I1@']
+        before = bob.content_hash
+        try:
+            with gedcomfile.batch():
+                person = gedcomfile.individual()
+                bob.add_child_element(gedcomfile.element("NOTE", value="checked"))
+                bob['SEX'].value = 'F'
+                raise ValueError()
+        except ValueError:
+            pass
+
+        self.assertEqual(gedcomfile.gedcom_lines_as_string(), GEDCOM_FILE.rstrip("\n"))
+        self.assertEqual(gedcomfile[person.id], None)
+        self.assertEqual(person.id, None)
+        self.assertFalse(bob.dirty)
+        self.assertEqual(bob.content_hash, before)
+        self.assertEqual(gedcomfile.individual().id, '@I4@')
+
+
+class CloneTestCase(unittest.TestCase):
+
+    def testClone(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        original = list(gedcomfile.root_elements)
+        clone = gedcomfile.clone()
+        self.assertTrue(clone.root_elements is gedcomfile.root_elements)
+
+        # The clone gets its own copy of a record when it hands it out
+        bob = clone['@I1@']
+        self.assertFalse(bob is gedcomfile['@I1@'])
+        self.assertTrue(clone['@I1@'] is bob)
+        self.assertTrue(bob.gedcom_file is clone)
+        self.assertTrue(clone.mutable(gedcomfile['@I1@']['SEX']) is bob['SEX'])
+        self.assertTrue(clone.mutable(bob) is bob)
+        bob['SEX'].value = 'F'
+        self.assertTrue(bob.dirty)
+        # the other records are still shared
+        self.assertTrue(clone.root_elements[original.index(gedcomfile['@I2@'])] is gedcomfile['@I2@'])
+        self.assertEqual(gedcomfile['@I1@']['SEX'].value, 'M')
+        self.assertEqual(clone.gedcom_lines_as_string(), GEDCOM_FILE.replace("1 SEX M", "1 SEX F", 1).rstrip("\n"))
+        self.assertEqual(gedcomfile.gedcom_lines_as_string(), GEDCOM_FILE.rstrip("\n"))
+
+        # The original can be changed too, the clone keeps the record as it was
+        gedcomfile['@I2@']['NAME'].value = 'Jo /Para/'
+        self.assertEqual(clone['@I2@']['NAME'].value, 'Joann /Para/')
+        self.assertEqual(gedcomfile['@I2@']['NAME'].value, 'Jo /Para/')
+
+        # New records
+        bob.add_child_element(clone.element("NOTE", value="what if"))
+        person = clone.individual()
+        person.add_child_element(clone.element("SEX", value="M"))
+        self.assertEqual(len(list(clone.individuals)), 4)
+        self.assertEqual(len(list(gedcomfile.individuals)), 3)
+        self.assertEqual(gedcomfile['@I4@'], None)
+
+        self.assertRaises(ValueError, clone.mutable, gedcom.parse_string(GEDCOM_FILE)['@I2@']['SEX'])
+
+    def testLookups(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        gedcomfile.link()
+        clone = gedcomfile.clone()
+        father = clone.individual()
+        clone['@F1@']['HUSB'].value = father.id
+        # pointers are looked up in the file the record was got from
+        self.assertTrue(clone['@I3@'].parents[0] is father)
+        self.assertTrue(gedcomfile['@I3@'].father is gedcomfile['@I1@'])
+        self.assertEqual([p.id for p in clone['@I3@'].parents], [father.id, '@I2@'])
+
+        # clones of clones
+        second = clone.clone()
+        second['@F1@']['WIFE'].value = '@I1@'
+        self.assertEqual([p.id for p in second['@I3@'].parents], [father.id, '@I1@'])
+        self.assertEqual([p.id for p in clone['@I3@'].parents], [father.id, '@I2@'])
+        self.assertEqual([p.id for p in gedcomfile['@I3@'].parents], ['@I1@', '@I2@'])
+
+    def testLevels(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        clone = gedcomfile.clone()
+        gedcomfile['@I1@']['SEX'].level = 5
+        clone.ensure_levels()
+        self.assertEqual(clone['@I1@']['SEX'].level, 1)
+        self.assertEqual(gedcomfile['@I1@']['SEX'].level, 5)
+
+
+class FreezeTestCase(unittest.TestCase):
+
+    def testParentsSameWhenFrozen(self):
+        # @F1@ only has a father, and the mother @I9@ of @F2@ isn't in the file
+        text = GEDCOM_FILE.replace("1 WIFE @I2@\n", "").replace("0 TRLR", "\n".join([
+            "0 @I4@ INDI", "1 FAMC @F2@", "0 @F2@ FAM", "1 HUSB @I1@", "1 WIFE @I9@", "1 CHIL @I4@", "0 TRLR"]))
+        gedcomfile = gedcom.parse_string(text)
+        frozen = gedcom.parse_string(text).freeze()
+        for individual in ('@I3@', '@I4@'):
+            self.assertEqual([p and p.id for p in frozen[individual].parents], [p and p.id for p in gedcomfile[individual].parents])
+        self.assertEqual([p and p.id for p in frozen['@I3@'].parents], ['@I1@'])
+        self.assertEqual([p and p.id for p in frozen['@I4@'].parents], ['@I1@', None])
+        self.assertEqual([p.id for p in frozen['@I4@'].kinship.parents], ['@I1@'])
+
+    def testFreeze(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        self.assertTrue(gedcomfile.freeze() is gedcomfile)
+        bob = gedcomfile['@I1@']
+        self.assertTrue(isinstance(gedcomfile.root_elements, tuple))
+        self.assertTrue(isinstance(bob.child_elements, tuple))
+        self.assertEqual(bob['SEX'].value, 'M')
+        self.assertEqual(len(bob['NAME']), 3)
+        self.assertTrue('CHAN' in bob)
+        self.assertEqual(bob.get_list('DEAT'), [])
+        self.assertEqual([p.id for p in gedcomfile['@I3@'].parents], ['@I1@', '@I2@'])
+        self.assertEqual([c.id for c in bob.kinship.children], ['@I3@'])
+        self.assertEqual([s.id for s in bob.kinship.spouses], ['@I2@'])
+        self.assertEqual(len(list(gedcomfile.individuals)), 3)
+        self.assertEqual(gedcomfile.gedcom_lines_as_string(), GEDCOM_FILE.rstrip("\n"))
+
+        self.assertRaises(TypeError, setattr, bob['SEX'], 'value', 'F')
+        self.assertRaises(TypeError, bob.add_child_element, gedcomfile.element("NOTE"))
+        self.assertRaises(TypeError, gedcomfile.individual)
+        self.assertRaises(TypeError, gedcomfile.mutable, bob)
+        self.assertFalse(hasattr(bob.child_elements, 'append'))
+        with self.assertRaises(TypeError):
+            gedcomfile.pointers['@I9@'] = bob
+
+        # A clone can be changed
+        clone = gedcomfile.clone()
+        clone.mutable(clone['@I1@']['SEX']).value = 'F'
+        clone.individual()
+        self.assertEqual(clone['@I1@']['SEX'].value, 'F')
+        self.assertEqual(bob['SEX'].value, 'M')
+        self.assertEqual(len(list(gedcomfile.individuals)), 3)
+
+    def testTagIndex(self):
+        limit = gedcom.gedcomfile.frozen_index_children
+        gedcom.gedcomfile.frozen_index_children = 0
+        try:
+            bob = gedcom.parse_string(GEDCOM_FILE).freeze()['@I1@']
+        finally:
+            gedcom.gedcomfile.frozen_index_children = limit
+        self.assertEqual([n.value for n in bob.get_list('NAME')], ['Robert /Cox/', 'Bob /Cox/', None])
+        self.assertEqual(bob['SEX'].value, 'M')
+        self.assertEqual(bob['DEAT'], None)
+        self.assertTrue('FAMS' in bob)
+        self.assertFalse('FAMC' in bob)
+        self.assertEqual(bob.name, ('Robert', 'Cox'))
+
+    def testThreads(self):
+        filename = os.path.join(os.path.dirname(__file__), "test.ged")
+        expected = gedcom.parse_filename(filename)
+        gedcomfile = gedcom.parse_filename(filename).freeze()
+        ids = [i.id for i in expected.individuals]
+        answers = dict((i.id, ([p.id for p in i.parents], i.name, i.content_hash)) for i in expected.individuals)
+        text = expected.gedcom_lines_as_string()
+
+        def read(n):
+            problems = []
+            for individual_id in ids[n % len(ids):] + ids[:n % len(ids)]:
+                individual = gedcomfile[individual_id]
+                answer = ([p.id for p in individual.parents], individual.name, individual.content_hash)
+                if answer != answers[individual_id]:
+                    problems.append(individual_id)
+                individual.linked_hash(depth=2)
+                try:
+                    individual.add_child_element(gedcomfile.element("NOTE"))
+                except TypeError:
+                    pass
+                else:
+                    problems.append("changed")
+            if n % 10 == 0 and gedcomfile.gedcom_lines_as_string() != text:
+                problems.append("text")
+            return problems
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(read, range(200)))
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual([problem for problems in results for problem in problems], [])
+        self.assertEqual(gedcomfile.gedcom_lines_as_string(), text)
+
+
+class IncrementalSaveTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, "source.ged")
+        # Odd (but valid) formatting that a full re-serialisation wouldn't keep
+        with open(self.filename, "wb") as fp:
+            fp.write(GEDCOM_FILE.replace("1 NAME Joann /Para/", "1 NAME Joann /Para/  ").replace("\n", "\r\n").encode("utf8"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def read(self, filename):
+        with open(filename, "rb") as fp:
+            return fp.read().decode("utf8")
+
+    def testDirtyTracking(self):
+        gedcomfile = gedcom.parse_filename(self.filename)
+        bob = gedcomfile['@I1@']
+        self.assertFalse(any(el.dirty for el in gedcomfile.root_elements))
+        bob['SEX'].value = 'F'
+        self.assertTrue(bob['SEX'].dirty)
+        self.assertTrue(bob.dirty)
+        self.assertFalse(bob['CHAN'].dirty)
+        self.assertFalse(gedcomfile['@I2@'].dirty)
+        gedcomfile['@I2@']['CHAN'].add_child_element(gedcomfile.element("NOTE", value="x"))
+        self.assertTrue(gedcomfile['@I2@'].dirty)
+        bob.mark_clean()
+        self.assertFalse(bob['SEX'].dirty)
+
+    def testUnchangedRecordsAreCopied(self):
+        gedcomfile = gedcom.parse_filename(self.filename)
+        self.assertEqual(gedcomfile.source_span(gedcomfile['@I1@'])[0], len(GEDCOM_FILE.split("0 @I1@")[0].replace("\n", "\r\n")))
+        gedcomfile['@I3@']['SEX'].value = 'F'
+        output = os.path.join(self.tmpdir, "output.ged")
+        gedcomfile.save(output)
+        expected = self.read(self.filename).replace("1 NAME Bobby Jo /Cox/\r\n1 SEX M", "1 NAME Bobby Jo /Cox/\r\n1 SEX F")
+        self.assertEqual(self.read(output), expected)
+
+        # Saved file becomes the source, and can be saved over
+        self.assertEqual(gedcomfile.source_filename, output)
+        self.assertFalse(gedcomfile['@I3@'].dirty)
+        gedcomfile['@I2@']['SEX'].value = 'M'
+        gedcomfile.save(output, overwrite=True)
+        self.assertEqual(self.read(output), expected.replace("1 NAME Joann /Para/  \r\n1 SEX F", "1 NAME Joann /Para/\r\n1 SEX M"))
+        self.assertEqual(gedcom.parse_filename(output)['@I2@'].sex, 'M')
+
+    def testClonesSaveSeparately(self):
+        gedcomfile = gedcom.parse_filename(self.filename)
+        original = self.read(self.filename)
+        # changed before the clone was made, so the changed record is shared
+        gedcomfile['@I2@']['SEX'].value = 'M'
+        expected = original.replace("1 NAME Joann /Para/  \r\n1 SEX F", "1 NAME Joann /Para/\r\n1 SEX M")
+        clone = gedcomfile.clone()
+        clone['@I1@']['SEX'].value = 'F'
+        output = os.path.join(self.tmpdir, "clone.ged")
+        clone.save(output)
+        self.assertEqual(self.read(output), expected.replace("1 SEX M", "1 SEX F", 1))
+        # saving the clone doesn't change where (or whether) the original's records are
+        output = os.path.join(self.tmpdir, "original.ged")
+        gedcomfile.save(output)
+        self.assertEqual(self.read(output), expected)
+        gedcomfile['@I3@']['SEX'].value = 'F'
+        gedcomfile.save(output, overwrite=True)
+        self.assertEqual(self.read(output), expected.replace("1 NAME Bobby Jo /Cox/\r\n1 SEX M", "1 NAME Bobby Jo /Cox/\r\n1 SEX F"))
+
+    def testChangedSourceIsNotCopied(self):
+        gedcomfile = gedcom.parse_filename(self.filename)
+        with open(self.filename, "ab") as fp:
+            fp.write(b"garbage")
+        outputfile = tempfile.TemporaryFile()
+        gedcomfile.save(outputfile)
+        outputfile.seek(0)
+        self.assertEqual(outputfile.read(), GEDCOM_FILE.encode("utf8"))
+
+
+class WriteLinesTestCase(unittest.TestCase):
+
+    def testGedcomLines(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        self.assertEqual("\n".join(gedcomfile.gedcom_lines()), GEDCOM_FILE.strip())
+        # deep trees are walked depth first, children in order
+        element = gedcomfile['@I1@']
+        for level in range(2, 200):
+            child = gedcomfile.element("_DEEP", value=str(level))
+            element.add_child_element(child)
+            element = child
+        lines = list(gedcomfile['@I1@'].gedcom_lines())
+        self.assertEqual(lines[:4], ['0 @I1@ INDI', '1 NAME Robert /Cox/', '1 NAME Bob /Cox/', '2 TYPE aka'])
+        self.assertEqual(lines[11:14], ['2 DATE 11 FEB 2006', '1 _DEEP 2', '2 _DEEP 3'])
+        self.assertEqual(lines[-1], '198 _DEEP 199')
+        self.assertEqual(len(lines), 12 + 198)
+
+    def testNumericValue(self):
+        element = gedcom.Element(level=0, tag="_CNT", value=42)
+        element.add_child_element(gedcom.Element(tag="_ZERO", value=0))
+        self.assertEqual(list(element.gedcom_lines()), ['0 _CNT 42', '1 _ZERO 0'])
+
+    def testWriteLines(self):
+        lines = GEDCOM_FILE.strip().split("\n") + ["0 NOTE caf\u00e9"]
+        expected = ("\n".join(lines) + "\n").encode("utf8")
+        for chunk_size in (None, 1, 2, 7, len(lines), len(lines) + 1):
+            output = six.BytesIO()
+            gedcom.gedcomfile.write_lines(iter(lines), output, chunk_size=chunk_size)
+            self.assertEqual(output.getvalue(), expected)
+        output = six.BytesIO()
+        gedcom.gedcomfile.write_lines([], output)
+        self.assertEqual(output.getvalue(), b"")
+
+
 if __name__ == '__main__':
     unittest.main()
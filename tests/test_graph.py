@@ -0,0 +1,68 @@
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import gedcom
+from gedcom.graph import SharedGraph, graph_columns
+from test_gedcom import GEDCOM_FILE
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), "test.ged")
+
+
+def _ancestors(arguments):
+    graph, xref = arguments
+    try:
+        return sorted(graph.ancestors(xref))
+    finally:
+        graph.close()
+
+
+class SharedGraphTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.gedcomfile = gedcom.parse_filename(TEST_FILE)
+        self.graph = self.gedcomfile.share_graph()
+
+    def tearDown(self):
+        self.graph.close()
+
+    def testColumns(self):
+        arrays = graph_columns(GEDCOM_FILE)
+        self.assertEqual(list(arrays['parents']), [0, 1])
+        self.assertEqual(list(arrays['parent_offsets']), [0, 0, 0, 2])
+        self.assertEqual(list(arrays['sex']), [1, 2, 1])
+        self.assertEqual(bytes(arrays['ids']), b"@I1@@I2@@I3@")
+
+    def testRelations(self):
+        graph = self.graph
+        self.assertEqual(len(graph), len(list(self.gedcomfile.individuals)))
+        for individual in self.gedcomfile.individuals:
+            self.assertEqual(graph.xref(graph.index(individual.id)), individual.id)
+            self.assertEqual(graph.related(individual.id, 'parents'), [p.id for p in individual.parents])
+            self.assertEqual(graph.related(individual.id, 'children'), [c.id for c in individual.kinship.children])
+            self.assertEqual(graph.related(individual.id, 'spouses'), [s.id for s in individual.kinship.spouses])
+        self.assertRaises(KeyError, graph.index, '@I999@')
+
+    def testTraversals(self):
+        graph = self.graph
+        self.assertEqual(graph.ancestors('@I1@', depth=1), {'@I4580@': 1, '@I4584@': 1})
+        ancestors = graph.ancestors('@I1@')
+        self.assertEqual((len(ancestors), ancestors['@I4586@'], ancestors['@I4596@']), (12, 2, 5))
+        self.assertTrue(all(graph.descendants(xref)['@I1@'] == generation for xref, generation in ancestors.items()))
+        self.assertEqual(graph.descendants('@I4584@'), {'@I1@': 1, '@I4585@': 1})
+        self.assertEqual(graph.connection('@I1@', '@I4585@'), ['@I1@', '@I4580@', '@I4585@'])
+        self.assertEqual(graph.connection('@I4580@', '@I4584@'), ['@I4580@', '@I1@', '@I4584@'])
+        self.assertEqual(graph.connection('@I4580@', '@I4584@', spouses=True), ['@I4580@', '@I4584@'])
+        self.assertEqual(graph.connection('@I1@', '@I1@'), ['@I1@'])
+
+    def testProcesses(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(_ancestors, [(self.graph, '@I1@'), (self.graph, '@I4580@')]))
+        self.assertEqual(results, [sorted(self.graph.ancestors('@I1@')), sorted(self.graph.ancestors('@I4580@'))])
+
+        other = SharedGraph(self.graph.name)
+        self.assertEqual(other.related('@I1@', 'parents'), self.graph.related('@I1@', 'parents'))
+        other.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
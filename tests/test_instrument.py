@@ -0,0 +1,85 @@
+import os
+import unittest
+import gedcom
+import gedcom.gedcomfile
+from gedcom import instrument
+from gedcom.element import Element
+from gedcom.gedcomfile import GedcomFile
+
+TEST_FILE = os.path.join(os.path.dirname(__file__), "test.ged")
+
+
+class InstrumentTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        instrument.disable()
+
+    def testParse(self):
+        instrument.enable()
+        gedcomfile = gedcom.parse_filename(TEST_FILE)
+        gedcomfile.link()
+        results = instrument.results()
+        self.assertEqual(results['parse']['count'], 1)
+        self.assertEqual(results['parse']['lines'], 271)
+        for phase in ('read', 'tokenize', 'build'):
+            self.assertGreater(results['parse'][phase], 0)
+        self.assertAlmostEqual(results['parse']['total'],
+                               results['parse']['read'] + results['parse']['tokenize'] + results['parse']['build'])
+        self.assertEqual(results['link']['count'], 1)
+        # source positions still work through the timed lines
+        expected = gedcom.parse_filename(TEST_FILE)
+        self.assertEqual(gedcomfile.source_span(gedcomfile['@I1@']), expected.source_span(expected['@I1@']))
+
+    def testLookups(self):
+        gedcomfile = gedcom.parse_filename(TEST_FILE)
+        with instrument.instrumented():
+            individual = gedcomfile['@I1@']
+            gedcomfile['@MISSING@']
+            individual['NAME']
+            'DEAT' in individual
+            individual.get_list('NOTE')
+            results = instrument.results()
+        lookups = results['lookups']
+        self.assertEqual(lookups['GedcomFile.__getitem__'], {'calls': 2, 'hits': 1, 'misses': 1})
+        self.assertEqual(lookups['Element.__getitem__'], {'calls': 1, 'hits': 1, 'misses': 0})
+        self.assertEqual(lookups['Element.__contains__'], {'calls': 1, 'hits': 0, 'misses': 1})
+        self.assertEqual(lookups['Element.get_list']['calls'], 1)
+
+    def testConnection(self):
+        events = []
+
+        def hook(event, data):
+            events.append((event, data))
+
+        gedcomfile = gedcom.parse_filename(TEST_FILE)
+        instrument.add_hook(hook)
+        try:
+            instrument.enable()
+            path = gedcom.connection(gedcomfile['@I1@'], gedcomfile['@I4584@'])
+            results = instrument.disable()
+        finally:
+            instrument.remove_hook(hook)
+        self.assertTrue(path)
+        self.assertEqual(results['connection']['calls'], 1)
+        self.assertGreater(results['connection']['expansions'], 0)
+        self.assertEqual([event for event, _ in events], ['connection'])
+        self.assertEqual(events[0][1]['expansions'], results['connection']['expansions'])
+
+    def testDisable(self):
+        getitem = GedcomFile.__dict__['__getitem__']
+        get_list = Element.__dict__['get_list']
+        line_format = gedcom.gedcomfile.line_format
+        connection = gedcom.connection
+        instrument.enable()
+        self.assertIsNot(GedcomFile.__dict__['__getitem__'], getitem)
+        self.assertIsNotNone(instrument.disable())
+        self.assertIs(GedcomFile.__dict__['__getitem__'], getitem)
+        self.assertIs(Element.__dict__['get_list'], get_list)
+        self.assertIs(gedcom.gedcomfile.line_format, line_format)
+        self.assertIs(gedcom.connection, connection)
+        self.assertIsNone(instrument.disable())
+        self.assertIsNone(instrument.results())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import gedcom
+from gedcom.jsonio import record_to_dict, dump_ndjson, dump_json, iter_ndjson, parse_ndjson, parse_json
+from test_gedcom import GEDCOM_FILE
+
+
+class IterparseTestCase(unittest.TestCase):
+
+    def testIterparse(self):
+        records = list(gedcom.iterparse(io.StringIO(GEDCOM_FILE)))
+        self.assertEqual([r.tag for r in records], ['HEAD', 'INDI', 'INDI', 'INDI', 'FAM', 'TRLR'])
+        self.assertEqual(records[1].name, ('Robert', 'Cox'))
+        self.assertEqual([r.id for r in gedcom.iterparse(GEDCOM_FILE)], [r.id for r in records])
+
+
+class JsonTestCase(unittest.TestCase):
+
+    def testRecordToDictKeepsRepeatedTags(self):
+        gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+        data = record_to_dict(gedcomfile['@I1@'])
+        self.assertEqual(data['id'], '@I1@')
+        self.assertEqual([c['tag'] for c in data['children']], ['NAME', 'NAME', 'NAME', 'SEX', 'FAMS', 'CHAN'])
+        self.assertEqual(data['children'][2], {'tag': 'NAME', 'children': [{'tag': 'GIVN', 'value': 'Rob'}, {'tag': 'SURN', 'value': 'Cox'}, {'tag': 'TYPE', 'value': 'aka'}]})
+
+    def testNdjsonRoundTrip(self):
+        output = io.BytesIO()
+        self.assertEqual(dump_ndjson(io.StringIO(GEDCOM_FILE), output), 5)
+        lines = output.getvalue().decode("utf8").splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[4])['tag'], 'FAM')
+
+        records = list(iter_ndjson(io.BytesIO(output.getvalue())))
+        self.assertEqual(records[3].name, ('Bobby Jo', 'Cox'))
+
+        gedcomfile = parse_ndjson(io.BytesIO(output.getvalue()))
+        self.assertEqual(gedcomfile.gedcom_lines_as_string() + "\n", GEDCOM_FILE)
+        self.assertEqual(gedcomfile['@I3@'].father, gedcomfile['@I1@'])
+
+    def testJsonRoundTrip(self):
+        output = io.BytesIO()
+        self.assertEqual(dump_json(gedcom.parse_string(GEDCOM_FILE), output), 5)
+        self.assertEqual(len(json.loads(output.getvalue().decode("utf8"))), 5)
+        gedcomfile = parse_json(io.StringIO(output.getvalue().decode("utf8")))
+        self.assertEqual(gedcomfile.gedcom_lines_as_string() + "\n", GEDCOM_FILE)
+
+        empty = io.BytesIO()
+        self.assertEqual(dump_json([], empty), 0)
+        self.assertEqual(json.loads(empty.getvalue().decode("utf8")), [])
+
+
+    def testWriteToFilename(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, "tree.ndjson")
+            self.assertEqual(dump_ndjson(GEDCOM_FILE, filename), 5)
+            self.assertRaises(FileExistsError, dump_ndjson, GEDCOM_FILE, filename)
+            self.assertEqual(dump_json(GEDCOM_FILE, filename, overwrite=True), 5)
+            with open(filename, "rb") as fp:
+                self.assertEqual(len(json.loads(fp.read().decode("utf8"))), 5)
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    unittest.main()
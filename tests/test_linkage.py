@@ -0,0 +1,79 @@
+import unittest
+import gedcom
+from gedcom.linkage import soundex, find_duplicates, score, blocking_key, individual_features
+
+DUPLICATES_FILE = """0 HEAD
+0 @I1@ INDI
+1 NAME Robert /Cox/
+1 SEX M
+1 BIRT
+2 DATE 12 MAR 1851
+2 PLAC London
+1 FAMC @F1@
+0 @I2@ INDI
+1 NAME Robert /Cocks/
+1 SEX M
+1 BIRT
+2 DATE ABT 1851
+2 PLAC London
+0 @I3@ INDI
+1 NAME Joann /Cox/
+1 SEX F
+1 BIRT
+2 DATE 1853
+0 @I4@ INDI
+1 NAME Robert /Cox/
+1 SEX M
+1 BIRT
+2 DATE 1920
+0 @I5@ INDI
+1 NAME William /Cox/
+1 SEX M
+1 FAMS @F1@
+0 @F1@ FAM
+1 HUSB @I5@
+1 CHIL @I1@
+0 TRLR
+"""
+
+
+class LinkageTestCase(unittest.TestCase):
+
+    def testSoundex(self):
+        self.assertEqual(soundex("Robert"), "R163")
+        self.assertEqual(soundex("Rupert"), "R163")
+        self.assertEqual(soundex("Ashcraft"), "A261")
+        self.assertEqual(soundex("Tymczak"), "T522")
+        self.assertEqual(soundex("Pfister"), "P236")
+        self.assertEqual(soundex("Cox"), soundex("Cocks"))
+        self.assertEqual(soundex(None), "")
+
+    def testBlockingKey(self):
+        gedcomfile = gedcom.parse_string(DUPLICATES_FILE)
+        features = individual_features(gedcomfile['@I1@'])
+        self.assertEqual(features['parents'], frozenset(['william cox']))
+        self.assertEqual(blocking_key(features), ('C200', 185, 'M'))
+
+    def testScore(self):
+        gedcomfile = gedcom.parse_string(DUPLICATES_FILE)
+        self.assertGreater(score(gedcomfile['@I1@'], gedcomfile['@I2@']), 0.8)
+        self.assertEqual(score(gedcomfile['@I1@'], gedcomfile['@I3@']), 0.0)
+        self.assertLess(score(gedcomfile['@I1@'], gedcomfile['@I4@']), 0.8)
+
+    def testFindDuplicates(self):
+        gedcomfile = gedcom.parse_string(DUPLICATES_FILE)
+        duplicates = find_duplicates(gedcomfile)
+        self.assertEqual([(a.id, b.id) for a, b, value in duplicates], [('@I1@', '@I2@')])
+
+    def testFindDuplicatesInProcessPool(self):
+        gedcomfile = gedcom.parse_string(DUPLICATES_FILE)
+        self.assertEqual(find_duplicates(gedcomfile, processes=2), find_duplicates(gedcomfile))
+
+    def testLargeBlocksUseWindow(self):
+        gedcomfile = gedcom.parse_string(DUPLICATES_FILE)
+        duplicates = find_duplicates(gedcomfile, key=lambda f: f['sex'], max_block_size=1)
+        self.assertEqual([(a.id, b.id) for a, b, value in duplicates], [('@I1@', '@I2@')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import unittest
+import gedcom
+from test_gedcom import GEDCOM_FILE
+
+
+class MemoryReportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.gedcomfile = gedcom.parse_string(GEDCOM_FILE)
+
+    def testReport(self):
+        report = self.gedcomfile.memory_report(biggest=2)
+        totals = report.totals
+        self.assertEqual(totals['elements'], sum(counts['elements'] for counts in report.tags.values()))
+        self.assertEqual(totals['total'], totals['objects'] + totals['values'] + totals['children'])
+        self.assertEqual(totals['total'], sum(counts['total'] for counts in report.records.values()))
+        self.assertEqual(totals['total'], sum(counts['total'] for counts in report.tags.values()))
+        self.assertEqual(report.records['INDI']['records'], 3)
+        self.assertEqual(report.records['FAM']['records'], 1)
+        self.assertEqual(report.tags['NAME']['elements'], 5)
+        self.assertEqual(report.tags['TRLR']['values'], 0)
+        self.assertGreater(totals['index'], 0)
+
+        self.assertEqual(len(report.biggest), 2)
+        self.assertGreaterEqual(report.biggest[0][0], report.biggest[1][0])
+        total, name, tag = report.biggest[0]
+        self.assertLessEqual(total, report.records[tag]['total'])
+        self.assertIn('MemoryReport(total=', repr(report))
+
+    def testDuplicates(self):
+        # '11 FEB 2006' is parsed into a new string every time
+        self.gedcomfile.link()
+        report = self.gedcomfile.memory_report()
+        self.assertGreater(report.duplicates['strings'], 0)
+        self.assertGreater(report.duplicates['bytes'], 0)
+        # freeze() interns them, and shared strings are counted once
+        frozen = self.gedcomfile.freeze().memory_report()
+        self.assertLess(frozen.duplicates['copies'], report.duplicates['copies'])
+        self.assertLess(frozen.totals['values'], report.totals['values'])
+
+    def testCopiesCountedOnce(self):
+        gedcomfile = gedcom.GedcomFile()
+        record = gedcomfile.individual()
+        copies = ["".join(["Lon", "don"]) for _ in range(3)]
+        # the second copy is used twice, but is still only one extra string
+        for value in copies[:2] + copies[1:]:
+            record.add_child_element(gedcomfile.element("PLAC", value=value))
+        duplicates = gedcomfile.memory_report().duplicates
+        self.assertEqual(duplicates['strings'], 1)
+        self.assertEqual(duplicates['copies'], 2)
+        self.assertEqual(duplicates['bytes'], 2 * sys.getsizeof(copies[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+import unittest
+import gedcom
+from gedcom.merge import merge, merge_files, translation_table, remap_line
+
+FIRST_FILE = """0 HEAD
+1 SOUR first
+0 @I1@ INDI
+1 NAME Robert /Cox/
+1 FAMS @F1@
+0 @I2@ INDI
+1 NAME Joann /Para/
+1 FAMS @F1@
+0 @F1@ FAM
+1 HUSB @I1@
+1 WIFE @I2@
+0 TRLR
+"""
+
+SECOND_FILE = """0 HEAD
+1 SOUR second
+0 @I1@ INDI
+1 NAME Bobby Jo /Cox/
+1 FAMC @F1@
+0 @I7@ INDI
+1 NAME Anne /Smith/
+1 FAMS @F1@
+0 @F1@ FAM
+1 WIFE @I7@
+1 CHIL @I1@
+0 TRLR
+"""
+
+MERGED_FILE = """0 HEAD
+1 SOUR first
+0 @I1@ INDI
+1 NAME Robert /Cox/
+1 FAMS @F1@
+0 @I2@ INDI
+1 NAME Joann /Para/
+1 FAMS @F1@
+0 @F1@ FAM
+1 HUSB @I1@
+1 WIFE @I2@
+0 @I8@ INDI
+1 NAME Bobby Jo /Cox/
+1 FAMC @F2@
+0 @I7@ INDI
+1 NAME Anne /Smith/
+1 FAMS @F2@
+0 @F2@ FAM
+1 WIFE @I7@
+1 CHIL @I8@
+0 TRLR
+"""
+
+
+class MergeTestCase(unittest.TestCase):
+
+    def testTranslationTable(self):
+        self.assertEqual(translation_table(['@I1@', '@I2@', '@F1@'], ['@I1@', '@I7@', '@F1@']), {'@I1@': '@I8@', '@F1@': '@F2@'})
+        self.assertEqual(translation_table(['@SUBM@'], ['@SUBM@']), {'@SUBM@': '@SUBM1@'})
+
+    def testRemapLine(self):
+        table = {'@I1@': '@I8@'}
+        self.assertEqual(remap_line("0 @I1@ INDI", table), "0 @I8@ INDI")
+        self.assertEqual(remap_line("1 CHIL @I1@", table), "1 CHIL @I8@")
+        self.assertEqual(remap_line("1 CHIL @I2@", table), "1 CHIL @I2@")
+        self.assertEqual(remap_line("1 NOTE email@example.com", table), "1 NOTE email@example.com")
+
+    def testMerge(self):
+        first = gedcom.parse_string(FIRST_FILE)
+        second = gedcom.parse_string(SECOND_FILE)
+        table = merge(first, second)
+        self.assertEqual(table, {'@I1@': '@I8@', '@F1@': '@F2@'})
+        self.assertEqual(first.gedcom_lines_as_string() + "\n", MERGED_FILE)
+        self.assertEqual(first['@I8@'].parents, [first['@I7@']])
+        self.assertEqual(first['@I8@'].gedcom_file, first)
+
+    def testMergeFiles(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filenames = []
+            for name, contents in (('first.ged', FIRST_FILE), ('second.ged', SECOND_FILE)):
+                filenames.append(os.path.join(tmpdir, name))
+                with open(filenames[-1], 'w') as fp:
+                    fp.write(contents)
+            output = os.path.join(tmpdir, 'merged.ged')
+            merge_files(filenames[0], filenames[1], output)
+            with open(output) as fp:
+                self.assertEqual(fp.read(), MERGED_FILE)
+            self.assertRaises(FileExistsError, merge_files, filenames[0], filenames[1], output)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def testNestedIds(self):
+        # an id below the records collides like a record id does
+        first_file = FIRST_FILE.replace("1 FAMS @F1@\n0 @I2@", "1 FAMS @F1@\n1 @A1@ ASSO @I2@\n0 @I2@")
+        second_file = SECOND_FILE.replace("1 FAMC @F1@\n", "1 FAMC @F1@\n1 @A1@ ASSO @I7@\n")
+        merged_file = MERGED_FILE.replace("1 FAMS @F1@\n0 @I2@", "1 FAMS @F1@\n1 @A1@ ASSO @I2@\n0 @I2@").replace(
+            "1 FAMC @F2@\n", "1 FAMC @F2@\n1 @A2@ ASSO @I7@\n")
+        first = gedcom.parse_string(first_file)
+        table = merge(first, gedcom.parse_string(second_file))
+        self.assertEqual(table, {'@I1@': '@I8@', '@F1@': '@F2@', '@A1@': '@A2@'})
+        self.assertEqual(first.gedcom_lines_as_string() + "\n", merged_file)
+        self.assertEqual(first['@A1@'].value, '@I2@')
+        self.assertEqual(first['@A2@'].value, '@I7@')
+        self.assertEqual(first['@A2@'].parent_id, '@I8@')
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filenames = []
+            for name, contents in (('first.ged', first_file), ('second.ged', second_file)):
+                filenames.append(os.path.join(tmpdir, name))
+                with open(filenames[-1], 'w') as fp:
+                    fp.write(contents)
+            output = os.path.join(tmpdir, 'merged.ged')
+            self.assertEqual(merge_files(filenames[0], filenames[1], output), table)
+            with open(output) as fp:
+                self.assertEqual(fp.read(), merged_file)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def testMergeAndSave(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            files = []
+            # a record that the merge doesn't change
+            note = "0 @N1@ NOTE kept as is\n"
+            second = SECOND_FILE.replace("0 TRLR", note + "0 TRLR")
+            for name, contents in (('first.ged', FIRST_FILE), ('second.ged', second)):
+                filename = os.path.join(tmpdir, name)
+                with open(filename, 'w') as fp:
+                    fp.write(contents)
+                files.append(gedcom.parse_filename(filename))
+            merge(files[0], files[1])
+            # the records of the second file aren't at their offsets in the first one
+            output = os.path.join(tmpdir, 'merged.ged')
+            files[0].save(output)
+            with open(output) as fp:
+                self.assertEqual(fp.read(), MERGED_FILE.replace("0 TRLR", note + "0 TRLR"))
+            self.assertEqual(files[0].source_span(files[0]['@N1@']), (len(MERGED_FILE) - len("0 TRLR\n"), len(MERGED_FILE) - len("0 TRLR\n") + len(note)))
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import gedcom
+from gedcom.sqlite import SqliteGedcomFile
+from test_gedcom import GEDCOM_FILE
+
+
+class SqliteExportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "tree.sqlite")
+        self.gedcomfile = gedcom.parse_string(GEDCOM_FILE.replace("1 MARR\n", "1 MARR\n2 DATE ABT 1975\n2 PLAC London\n"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def testExport(self):
+        counts = self.gedcomfile.to_sqlite(self.path)
+        self.assertEqual(counts['records'], 6)
+        self.assertEqual(counts['elements'], 42)
+        self.assertRaises(FileExistsError, self.gedcomfile.to_sqlite, self.path)
+
+        db = sqlite3.connect(self.path)
+        self.assertEqual(db.execute("SELECT record_key, xref, given, surname, sex FROM individuals ORDER BY record_key").fetchall(),
+                         [(2, '@I1@', 'Robert', 'Cox', 'M'), (3, '@I2@', 'Joann', 'Para', 'F'), (4, '@I3@', 'Bobby Jo', 'Cox', 'M')])
+        self.assertEqual(db.execute("SELECT * FROM families").fetchall(), [(5, '@F1@', 2, 3)])
+        self.assertEqual(db.execute("SELECT * FROM family_members").fetchall(), [(5, 2, 'HUSB'), (5, 3, 'WIFE'), (5, 4, 'CHIL')])
+        self.assertEqual(db.execute("SELECT record_key, tag, date, year, place FROM events").fetchall(), [(5, 'MARR', 'ABT 1975', 1975, 'London')])
+
+        # The tree can be rebuilt from the elements table
+        rows = db.execute("SELECT e.level, e.xref, e.tag, e.value FROM elements e JOIN elements p ON e.parent_key = p.element_key "
+                          "WHERE p.xref = '@I1@' ORDER BY e.position").fetchall()
+        self.assertEqual(rows[0], (1, None, 'NAME', 'Robert /Cox/'))
+        self.assertEqual(len(rows), 6)
+        db.close()
+
+        self.gedcomfile.to_sqlite(self.path, overwrite=True)
+
+
+class SqliteGedcomFileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "tree.sqlite")
+        gedcom.parse_string(GEDCOM_FILE).to_sqlite(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def testRead(self):
+        with SqliteGedcomFile(self.path, cache_size=2) as gedcomfile:
+            self.assertEqual([i.id for i in gedcomfile.individuals], ['@I1@', '@I2@', '@I3@'])
+            self.assertEqual([f.id for f in gedcomfile.families], ['@F1@'])
+            bobby = gedcomfile['@I3@']
+            self.assertEqual(bobby.name, ('Bobby Jo', 'Cox'))
+            self.assertEqual(bobby.father.name, ('Robert', 'Cox'))
+            self.assertEqual(bobby.mother.name, ('Joann', 'Para'))
+            self.assertEqual(gedcomfile['@I4@'], None)
+            self.assertTrue(len(gedcomfile._cache) <= 2)
+            self.assertEqual(len(gedcomfile.root_elements), 6)
+            self.assertEqual(gedcomfile.root_elements[-1].tag, 'TRLR')
+            self.assertEqual(gedcomfile.gedcom_lines_as_string(), gedcom.parse_string(GEDCOM_FILE).gedcom_lines_as_string())
+
+    def testWrite(self):
+        with SqliteGedcomFile(self.path, cache_size=1) as gedcomfile:
+            gedcomfile['@I1@']['NAME'][0].value = 'Bob /Cocks/'
+            person = gedcomfile.individual()
+            person.add_child_element(gedcomfile.element("NAME", value="Jane /Doe/"))
+            self.assertEqual(person.id, '@I4@')
+            # Changed records aren't dropped from the cache before they are written
+            list(gedcomfile.individuals)
+            self.assertEqual(gedcomfile['@I1@'].name, ('Bob', 'Cocks'))
+            self.assertEqual(gedcomfile.flush(), 2)
+
+        with SqliteGedcomFile(self.path) as gedcomfile:
+            self.assertEqual(gedcomfile['@I1@'].name, ('Bob', 'Cocks'))
+            self.assertEqual(gedcomfile['@I4@'].name, ('Jane', 'Doe'))
+            self.assertEqual([r.tag for r in gedcomfile.root_elements], ['HEAD', 'INDI', 'INDI', 'INDI', 'FAM', 'INDI', 'TRLR'])
+            self.assertEqual(gedcomfile.connection.execute("SELECT surname FROM individuals WHERE xref = '@I4@'").fetchone(), ('Doe',))
+
+            filename = os.path.join(self.tmpdir, "tree.ged")
+            gedcomfile.save(filename)
+            self.assertEqual(len(list(gedcom.parse_filename(filename).individuals)), 4)
+            self.assertRaises(FileExistsError, gedcomfile.save, filename)
+
+    def testHeldRecords(self):
+        with SqliteGedcomFile(self.path, cache_size=1) as gedcomfile:
+            robert = gedcomfile['@I1@']
+            list(gedcomfile.individuals)
+            self.assertFalse(robert._record_key in gedcomfile._cache)
+            # a record that is still in use is the same object when it's looked up again
+            self.assertTrue(gedcomfile['@I1@'] is robert)
+            list(gedcomfile.families)
+            robert['NAME'][0].value = 'Bob /Cocks/'
+            self.assertEqual(gedcomfile['@I3@'].father.name, ('Bob', 'Cocks'))
+            list(gedcomfile.root_elements)
+            self.assertEqual(gedcomfile.flush(), 1)
+
+        with SqliteGedcomFile(self.path) as gedcomfile:
+            self.assertEqual(gedcomfile['@I1@'].name, ('Bob', 'Cocks'))
+
+    def testFailedFlush(self):
+        with SqliteGedcomFile(self.path) as gedcomfile:
+            person = gedcomfile.individual()
+            person.add_child_element(gedcomfile.element("NAME", value="Jane /Doe/"))
+            broken = gedcomfile.element("NOTE", value="no tag")
+            broken.tag = None
+            gedcomfile['@I1@'].add_child_element(broken)
+            self.assertRaises(sqlite3.IntegrityError, gedcomfile.flush)
+            # the new record is still there, and can be written once the change that failed is undone
+            self.assertEqual(gedcomfile['@I4@'], person)
+            gedcomfile['@I1@'].child_elements.remove(broken)
+            self.assertEqual(gedcomfile.flush(), 2)
+
+        with SqliteGedcomFile(self.path) as gedcomfile:
+            self.assertEqual(gedcomfile['@I4@'].name, ('Jane', 'Doe'))
+            self.assertEqual(len(gedcomfile['@I1@'].get_list('NOTE')), 0)
+
+    def testInsert(self):
+        with SqliteGedcomFile(self.path, cache_size=1) as gedcomfile:
+            note = gedcomfile.element("NOTE", level=0, id="@N1@", value="in the middle")
+            gedcomfile.root_elements.insert(2, note)
+            gedcomfile.root_elements.insert(-1, gedcomfile.element("NOTE", level=0, id="@N2@", value="before TRLR"))
+            self.assertEqual([r.id or r.tag for r in gedcomfile.root_elements],
+                             ['HEAD', '@I1@', '@N1@', '@I2@', '@I3@', '@F1@', '@N2@', 'TRLR'])
+
+        with SqliteGedcomFile(self.path) as gedcomfile:
+            self.assertEqual(gedcomfile.root_elements[2].value, 'in the middle')
+            self.assertEqual(len(gedcomfile.root_elements), 8)
+
+    def testClone(self):
+        with SqliteGedcomFile(self.path, cache_size=1) as gedcomfile:
+            gedcomfile['@I1@']['NAME'][0].value = 'Bob /Cocks/'
+            copy = gedcomfile.clone()
+            self.assertEqual(copy['@I1@'].name, ('Bob', 'Cocks'))
+            self.assertEqual(copy['@I3@'].father, copy['@I1@'])
+            copy['@I2@']['SEX'].value = 'M'
+            self.assertEqual(gedcomfile['@I2@']['SEX'].value, 'F')
+
+            frozen = gedcomfile.freeze()
+            self.assertFalse(frozen is gedcomfile)
+            self.assertEqual(frozen['@I2@']['SEX'].value, 'F')
+            self.assertEqual(frozen['@I1@'].name, ('Bob', 'Cocks'))
+            self.assertRaises(TypeError, setattr, frozen['@I1@']['SEX'], 'value', 'F')
+
+    def testEmpty(self):
+        with SqliteGedcomFile(os.path.join(self.tmpdir, "new.sqlite")) as gedcomfile:
+            gedcomfile.individual()
+            self.assertEqual([r.tag for r in gedcomfile.root_elements], ['INDI'])
+            expected = gedcom.GedcomFile()
+            expected.individual()
+            self.assertEqual(gedcomfile.gedcom_lines_as_string(), expected.gedcom_lines_as_string())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import unittest
+import gedcom
+from gedcom import stats
+from test_gedcom import GEDCOM_FILE
+
+FILE = GEDCOM_FILE.replace("1 SEX M\n1 FAMS", "1 SEX M\n1 BIRT\n2 DATE 1940\n1 DEAT\n2 DATE 2001\n1 FAMS").replace(
+    "1 MARR\n", "1 MARR\n2 DATE ABT 1975\n")
+
+
+class StatisticsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, "tree.ged")
+        with open(self.filename, "w") as fp:
+            fp.write(FILE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def testCompute(self):
+        result = stats.compute(gedcom.parse_string(FILE))
+        self.assertEqual(result['lifespans'], {'count': 1, 'mean': 61, 'min': 61, 'max': 61, 'ages': {61: 1}})
+        self.assertEqual(result['children_per_family'], {'families': 1, 'children': 1, 'mean': 1, 'histogram': {1: 1}})
+        self.assertEqual(result['surnames'], {'Cox': 2, 'Para': 1})
+        self.assertEqual(result['events_per_decade'], {'BIRT': {1940: 1}, 'DEAT': {2000: 1}, 'MARR': {1970: 1}})
+        self.assertEqual(result['sex_ratio'], {'counts': {'M': 2, 'F': 1}, 'ratio': 2})
+
+        self.assertEqual(stats.compute(self.filename, names=['surnames']), {'surnames': {'Cox': 2, 'Para': 1}})
+        self.assertRaises(KeyError, stats.Statistics, ['nope'])
+
+    def testMerge(self):
+        records = list(gedcom.iterparse(FILE))
+        first = stats.Statistics().add_records(records[:3])
+        second = stats.Statistics().add_records(records[3:])
+        self.assertEqual(first.merge(second).result(), stats.compute(records))
+
+    def testSplitFile(self):
+        ranges = gedcom.split_file(self.filename, 4)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], os.path.getsize(self.filename))
+        records = [record for start, end in ranges for record in gedcom.iterparse_range(self.filename, start, end)]
+        self.assertEqual([r.tag for r in records], [r.tag for r in gedcom.iterparse(self.filename)])
+
+    def testParallel(self):
+        self.assertEqual(stats.compute_parallel(self.filename, processes=2), stats.compute(self.filename))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import gedcom
+from gedcom import synth
+from gedcom.validate import validate
+
+
+def _generate(**options):
+    output = io.BytesIO()
+    counts = synth.generate(output, **options)
+    return counts, output.getvalue().decode("utf8")
+
+
+class SynthTestCase(unittest.TestCase):
+
+    def testGenerate(self):
+        counts, text = _generate(seed=3, individuals=500)
+        self.assertEqual(counts['individuals'], 500)
+        self.assertEqual(validate(text), [])
+        gedcomfile = gedcom.parse_string(text)
+        self.assertEqual(len(list(gedcomfile.individuals)), 500)
+        self.assertEqual(len(list(gedcomfile.families)), counts['families'])
+        self.assertEqual(gedcomfile.link().dangling, [])
+        self.assertTrue(any(individual.parents for individual in gedcomfile.individuals))
+
+        # the same seed gives the same file
+        self.assertEqual(_generate(seed=3, individuals=500)[1], text)
+        self.assertNotEqual(_generate(seed=4, individuals=500)[1], text)
+
+    def testOptions(self):
+        counts, text = _generate(individuals=50, generations=1, sources=0, surnames=['Cox'])
+        gedcomfile = gedcom.parse_string(text)
+        self.assertEqual(counts['families'], 0)
+        self.assertEqual(set(individual.name[1] for individual in gedcomfile.individuals), set(['Cox']))
+
+        def in_tree_marriages(text):
+            gedcomfile = gedcom.parse_string(text)
+            return sum(1 for family in gedcomfile.families
+                       if all(partner.as_individual().parents for partner in family.partners))
+        self.assertEqual(in_tree_marriages(_generate(individuals=300, pedigree_collapse=0)[1]), 0)
+        self.assertTrue(in_tree_marriages(_generate(individuals=300, pedigree_collapse=1)[1]) > 0)
+
+        _, text = _generate(individuals=20, citations=1, citation_depth=5, notes=1, note_lines=3)
+        individual = next(gedcom.parse_string(text).individuals)
+        self.assertEqual(individual['SOUR']['DATA']['TEXT']['NOTE']['NOTE'].level, 5)
+        self.assertEqual(len(individual['NOTE'].get_list('CONT')), 3)
+
+    def testMain(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, "synth.ged")
+            synth.main([filename, "--individuals", "30", "--seed", "2", "--surnames", "Cox, Para"])
+            self.assertEqual(len(list(gedcom.parse_filename(filename).individuals)), 30)
+            self.assertRaises(Exception, synth.main, [filename])
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import math
+import unittest
+import gedcom
+from gedcom import tables
+from test_gedcom import GEDCOM_FILE
+
+
+class TablesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.gedcomfile = gedcom.parse_string(GEDCOM_FILE.replace("1 MARR\n", "1 MARR\n2 DATE ABT 1975\n2 PLAC London\n"))
+
+    def testColumns(self):
+        columns = tables.table_columns(self.gedcomfile)
+        individuals = columns['individuals']
+        self.assertEqual(individuals['key'], [2, 3, 4])
+        self.assertEqual(individuals['surname'], ['Cox', 'Para', 'Cox'])
+        self.assertEqual(individuals['sex'], ['M', 'F', 'M'])
+        self.assertTrue(math.isnan(individuals['birth_year'][0]))
+
+        self.assertEqual(columns['families'], {'key': [5], 'xref': ['@F1@'], 'husband': [2], 'wife': [3],
+                                               'marriage_year': [1975], 'children': [1]})
+        self.assertEqual(columns['children'], {'family': [5], 'child': [4], 'position': [0]})
+        self.assertEqual(columns['events'], {'record': [5], 'tag': ['MARR'], 'date': ['ABT 1975'],
+                                             'year': [1975], 'place': ['London']})
+
+    def testStreamed(self):
+        self.assertEqual(tables.table_columns(GEDCOM_FILE)['children']['child'], [4])
+
+    @unittest.skipIf(tables.numpy is None, "numpy isn't installed")
+    def testArrays(self):
+        arrays = tables.to_arrays(self.gedcomfile)
+        self.assertEqual(list(arrays['individuals']['key']), [2, 3, 4])
+        self.assertEqual(arrays['families']['husband'][0], 2)
+        self.assertEqual(arrays['events']['year'][0], 1975)
+
+    @unittest.skipIf(tables.pandas is None, "pandas isn't installed")
+    def testDataFrames(self):
+        frames = tables.to_dataframes(self.gedcomfile)
+        self.assertEqual(list(frames['individuals']['surname']), ['Cox', 'Para', 'Cox'])
+        self.assertEqual(len(frames['children']), 1)
+
+    @unittest.skipIf(tables.numpy is not None, "numpy is installed")
+    def testNoNumpy(self):
+        self.assertRaises(ImportError, tables.to_arrays, self.gedcomfile)
+
+
+if __name__ == '__main__':
+    unittest.main()
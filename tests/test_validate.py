@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+import gedcom
+from gedcom.validate import Problem, validate, validate_parallel, compile_grammar
+from test_gedcom import GEDCOM_FILE
+
+BAD_RECORDS = """0 @I1@ INDI
+1 NAME Bob /Cox/
+3 DATE 1900
+1 BIRT
+2 DATE sometime
+1 HUSB @I2@
+1 _CUSTOM anything
+2 _MORE goes
+0 @F1@ FAM
+1 HUSB @I1@
+1 HUSB @I3@
+0 INDI
+"""
+
+
+class ValidateTestCase(unittest.TestCase):
+
+    def testValid(self):
+        gedcomfile = gedcom.GedcomFile()
+        person = gedcomfile.individual()
+        person.add_child_element(gedcomfile.element("SEX", value="M"))
+        self.assertEqual(validate(gedcomfile.gedcom_lines()), [])
+        self.assertEqual(validate(os.path.join(os.path.dirname(__file__), "test.ged")), [])
+
+    def testProblems(self):
+        self.assertEqual(validate(GEDCOM_FILE), [Problem(8, 'GEDC is missing FORM')])
+        self.assertEqual(validate(BAD_RECORDS), [
+            Problem(0, 'File is missing HEAD'),
+            Problem(0, 'File is missing TRLR'),
+            Problem(1, 'File does not start with HEAD'),
+            Problem(3, 'Level 3 DATE is more than one below its parent'),
+            Problem(5, "Invalid value 'sometime' for DATE"),
+            Problem(6, 'HUSB is not allowed in INDI'),
+            Problem(11, 'More than 1 HUSB in FAM'),
+            Problem(12, 'INDI record must have an xref'),
+        ])
+        self.assertEqual(validate(BAD_RECORDS, max_problems=2),
+                         [Problem(1, 'File does not start with HEAD'), Problem(3, 'Level 3 DATE is more than one below its parent')])
+        self.assertEqual(str(Problem(3, 'Oops')), "line 3: Oops")
+
+    def testGrammar(self):
+        table = compile_grammar("FILE\n    HEAD 1:1 HEAD\n\nHEAD\n    +TEXT\n\nTEXT\n    CONT 0:M -\n")
+        self.assertEqual(table['FILE']['HEAD'][:2], (1, 1))
+        self.assertTrue('CONT' in table['HEAD'])
+        self.assertRaises(ValueError, compile_grammar, "FILE\n    HEAD 1:1 NOPE\n")
+
+    def testParallel(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, "tree.ged")
+            with open(filename, "w") as fp:
+                fp.write(BAD_RECORDS * 20 + GEDCOM_FILE)
+            problems = validate(filename)
+            self.assertEqual(len(problems), 103)
+            self.assertEqual(validate_parallel(filename, processes=3), problems)
+            for max_problems in (3, 10, 50):
+                self.assertEqual(validate_parallel(filename, processes=3, max_problems=max_problems),
+                                 validate(filename, max_problems=max_problems))
+
+            # a second HEAD and TRLR are reported on their lines, like validate() does
+            with open(filename, "w") as fp:
+                fp.write(GEDCOM_FILE + BAD_RECORDS * 20 + GEDCOM_FILE)
+            problems = validate(filename)
+            second_head = GEDCOM_FILE.count("\n") + BAD_RECORDS.count("\n") * 20 + 1
+            self.assertTrue(Problem(second_head, 'More than 1 HEAD in a file') in problems)
+            for processes in (2, 3):
+                self.assertEqual(validate_parallel(filename, processes=processes), problems)
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    unittest.main()
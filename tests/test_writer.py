@@ -0,0 +1,88 @@
+import io
+import os
+import tempfile
+import unittest
+import gedcom
+from gedcom.writer import GedcomWriter
+
+
+def v(string):
+    return string.format(version=gedcom.__version__)
+
+
+HEADER = '0 HEAD\n1 SOUR\n2 NAME gedcompy\n2 VERS {version}\n1 CHAR UTF-8\n1 GEDC\n2 VERS 5.5\n2 FORM LINEAGE-LINKED\n'
+
+
+class GedcomWriterTestCase(unittest.TestCase):
+
+    def testEmpty(self):
+        output = io.BytesIO()
+        with GedcomWriter(output):
+            pass
+        self.assertEqual(output.getvalue().decode("utf8"), v(HEADER + '0 TRLR\n'))
+        self.assertEqual(output.getvalue().decode("utf8"), gedcom.GedcomFile().gedcom_lines_as_string() + "\n")
+
+    def testWriteRecords(self):
+        output = io.BytesIO()
+        with GedcomWriter(output) as writer:
+            individual = gedcom.Individual()
+            individual.add_child_element(gedcom.Element(tag="SEX", value="M"))
+            self.assertEqual(writer.write(individual), '@I1@')
+            self.assertEqual(individual.id, '@I1@')
+            self.assertEqual(writer.write(('INDI', None, [('NAME', 'Joann /Para/'), ('BIRT', None, [('DATE', '1980')])])), '@I2@')
+            self.assertEqual(writer.write({'tag': 'INDI', 'id': '@I7@', 'children': [{'tag': 'SEX', 'value': 'F'}]}), '@I7@')
+            self.assertEqual(writer.write_records([('FAM', None, [('HUSB', '@I1@'), ('WIFE', '@I2@')]), ('INDI', None)]), ['@F1@', '@I8@'])
+            self.assertRaises(TypeError, writer.write, ('TITL', 'no id'))
+        self.assertEqual(writer.records_written, 5)
+        self.assertEqual(output.getvalue().decode("utf8"), v(HEADER + '0 @I1@ INDI\n1 SEX M\n0 @I2@ INDI\n1 NAME Joann /Para/\n1 BIRT\n2 DATE 1980\n'
+                                                              '0 @I7@ INDI\n1 SEX F\n0 @F1@ FAM\n1 HUSB @I1@\n1 WIFE @I2@\n0 @I8@ INDI\n0 TRLR\n'))
+
+    def testTakenIds(self):
+        output = io.BytesIO()
+        with GedcomWriter(output) as writer:
+            self.assertEqual(writer.write(('INDI', None)), '@I1@')
+            self.assertRaises(ValueError, writer.write, {'tag': 'INDI', 'id': '@I1@'})
+            self.assertEqual(writer.write({'tag': 'FAM', 'id': '@F2@'}), '@F2@')
+            self.assertRaises(ValueError, writer.write, {'tag': 'FAM', 'id': '@F2@'})
+            self.assertEqual(writer.write(('FAM', None)), '@F3@')
+            self.assertEqual(writer.write({'tag': 'INDI', 'id': '@I5@'}), '@I5@')
+            self.assertEqual(writer.write(('INDI', None)), '@I6@')
+            # never handed out, so it's free
+            self.assertEqual(writer.write({'tag': 'INDI', 'id': '@I3@'}), '@I3@')
+            self.assertRaises(ValueError, writer.write, {'tag': 'INDI', 'id': '@I6@'})
+            # only the explicit ids are kept, not every id written
+            writer.write_records(('INDI', None) for _ in range(1000))
+            self.assertEqual(len(writer._explicit_ids), 3)
+            self.assertEqual(writer._allocated['I'], [[1, 1], [6, 1006]])
+        self.assertEqual(writer.records_written, 1006)
+
+    def testNoTrailerAfterError(self):
+        output = io.BytesIO()
+        with self.assertRaises(KeyError):
+            with GedcomWriter(output) as writer:
+                writer.write(('INDI', None, [('NAME', 'Bob /Cox/')]))
+                raise KeyError("oops")
+        self.assertTrue(writer.closed)
+        self.assertEqual(output.getvalue().decode("utf8"), v(HEADER + '0 @I1@ INDI\n1 NAME Bob /Cox/\n'))
+
+    def testFlushesAsItGoes(self):
+        output = io.BytesIO()
+        with GedcomWriter(output, chunk_size=2) as writer:
+            writer.write(('INDI', None, [('NAME', 'Joann /Para/')]))
+            self.assertTrue(output.getvalue().decode("utf8").endswith('0 @I1@ INDI\n1 NAME Joann /Para/\n'))
+
+    def testWriteToFilename(self):
+        outputfile = tempfile.NamedTemporaryFile(delete=False)
+        outputfile.close()
+        try:
+            self.assertRaises(FileExistsError, GedcomWriter, outputfile.name)
+            with GedcomWriter(outputfile.name, overwrite=True) as writer:
+                writer.write(('INDI', None, [('NAME', 'Bob /Cox/')]))
+            parsed = gedcom.parse_filename(outputfile.name)
+            self.assertEqual(parsed['@I1@'].name, ('Bob', 'Cox'))
+        finally:
+            os.remove(outputfile.name)
+
+
+if __name__ == '__main__':
+    unittest.main()